@@ -0,0 +1,104 @@
+"""add LISTEN/NOTIFY triggers for recurring reservation changes
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b4c5d6e7f8'
+down_revision: Union[str, None] = 'f2a3b4c5d6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Series writes go out on 'reservas_changes' with the payload of single
+    # reservations ('id' is NULL and 'serie_id' is set), so the availability
+    # index of other workers and the SSE streams see them. The range covers
+    # the whole series; a NULL end invalidates every day of the room.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_series_reservas_change()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            operacao TEXT;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                operacao := 'create';
+            ELSIF NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN
+                operacao := 'delete';
+            ELSE
+                operacao := 'update';
+            END IF;
+
+            PERFORM pg_notify('reservas_changes', json_build_object(
+                'op', operacao,
+                'id', NULL,
+                'serie_id', NEW.id,
+                'sala_id', NEW.sala_id,
+                'local_id', NEW.local_id,
+                'old_sala_id', CASE WHEN TG_OP = 'UPDATE' THEN OLD.sala_id END,
+                'old_local_id', CASE WHEN TG_OP = 'UPDATE' THEN OLD.local_id END,
+                'data_inicio', NEW.data_inicio,
+                'data_fim', NEW.data_fim_serie,
+                'old_data_inicio', CASE WHEN TG_OP = 'UPDATE' THEN OLD.data_inicio END,
+                'old_data_fim', CASE WHEN TG_OP = 'UPDATE' THEN OLD.data_fim_serie END,
+                'change_seq', NULL
+            )::text);
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER notify_series_reservas_change AFTER INSERT OR UPDATE ON series_reservas
+        FOR EACH ROW EXECUTE FUNCTION notify_series_reservas_change();
+    """)
+
+    # An exception frees its original occurrence (or its previous times, when it
+    # is replaced) and, when rescheduled, occupies the new times
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_series_excecoes_change()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            serie series_reservas%ROWTYPE;
+            duracao INTERVAL;
+        BEGIN
+            SELECT * INTO serie FROM series_reservas WHERE id = NEW.serie_id;
+            duracao := serie.data_fim - serie.data_inicio;
+
+            PERFORM pg_notify('reservas_changes', json_build_object(
+                'op', 'update',
+                'id', NULL,
+                'serie_id', NEW.serie_id,
+                'sala_id', serie.sala_id,
+                'local_id', serie.local_id,
+                'old_sala_id', serie.sala_id,
+                'old_local_id', serie.local_id,
+                'data_inicio', COALESCE(NEW.data_inicio, NEW.data_original),
+                'data_fim', COALESCE(NEW.data_fim, NEW.data_original + duracao),
+                'old_data_inicio', CASE WHEN TG_OP = 'UPDATE'
+                    THEN COALESCE(OLD.data_inicio, OLD.data_original) ELSE NEW.data_original END,
+                'old_data_fim', CASE WHEN TG_OP = 'UPDATE'
+                    THEN COALESCE(OLD.data_fim, OLD.data_original + duracao) ELSE NEW.data_original + duracao END,
+                'change_seq', NULL
+            )::text);
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER notify_series_excecoes_change AFTER INSERT OR UPDATE ON series_excecoes
+        FOR EACH ROW EXECUTE FUNCTION notify_series_excecoes_change();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS notify_series_excecoes_change ON series_excecoes;")
+    op.execute("DROP FUNCTION IF EXISTS notify_series_excecoes_change();")
+    op.execute("DROP TRIGGER IF EXISTS notify_series_reservas_change ON series_reservas;")
+    op.execute("DROP FUNCTION IF EXISTS notify_series_reservas_change();")
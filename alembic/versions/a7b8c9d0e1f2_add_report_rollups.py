@@ -0,0 +1,162 @@
+"""add ocupacao_horaria and cafe_diario report rollups
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create rollup tables
+    op.create_table(
+        'ocupacao_horaria',
+        sa.Column('sala_id', sa.Integer(), nullable=False),
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('hora', sa.SmallInteger(), nullable=False),
+        sa.Column('segundos_reservados', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['sala_id'], ['salas.id'], ),
+        sa.PrimaryKeyConstraint('sala_id', 'dia', 'hora')
+    )
+    op.create_index('idx_ocupacao_horaria_dia', 'ocupacao_horaria', ['dia'], unique=False)
+
+    op.create_table(
+        'cafe_diario',
+        sa.Column('local_id', sa.Integer(), nullable=False),
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('reservas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('quantidade_cafe', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['local_id'], ['locais.id'], ),
+        sa.PrimaryKeyConstraint('local_id', 'dia')
+    )
+    op.create_index('idx_cafe_diario_dia', 'cafe_diario', ['dia'], unique=False)
+
+    # Adds (sinal = 1) or removes (sinal = -1) the contribution of one reservation
+    op.execute("""
+        CREATE OR REPLACE FUNCTION relatorios_aplicar_reserva(
+            p_sala_id INTEGER,
+            p_local_id INTEGER,
+            p_inicio TIMESTAMPTZ,
+            p_fim TIMESTAMPTZ,
+            p_cafe BOOLEAN,
+            p_quantidade_cafe INTEGER,
+            p_sinal INTEGER
+        )
+        RETURNS VOID AS $$
+        DECLARE
+            inicio_utc TIMESTAMP := p_inicio AT TIME ZONE 'UTC';
+            fim_utc TIMESTAMP := p_fim AT TIME ZONE 'UTC';
+        BEGIN
+            IF fim_utc <= inicio_utc THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO ocupacao_horaria (sala_id, dia, hora, segundos_reservados)
+            SELECT
+                p_sala_id,
+                hora::date,
+                EXTRACT(HOUR FROM hora)::smallint,
+                p_sinal * EXTRACT(EPOCH FROM LEAST(hora + INTERVAL '1 hour', fim_utc) - GREATEST(hora, inicio_utc))::bigint
+            FROM generate_series(date_trunc('hour', inicio_utc), fim_utc - INTERVAL '1 microsecond', INTERVAL '1 hour') AS hora
+            ON CONFLICT (sala_id, dia, hora) DO UPDATE
+                SET segundos_reservados = ocupacao_horaria.segundos_reservados + EXCLUDED.segundos_reservados;
+
+            IF p_cafe THEN
+                INSERT INTO cafe_diario (local_id, dia, reservas, quantidade_cafe)
+                VALUES (p_local_id, inicio_utc::date, p_sinal, p_sinal * COALESCE(p_quantidade_cafe, 0))
+                ON CONFLICT (local_id, dia) DO UPDATE
+                    SET reservas = cafe_diario.reservas + EXCLUDED.reservas,
+                        quantidade_cafe = cafe_diario.quantidade_cafe + EXCLUDED.quantidade_cafe;
+            END IF;
+        END;
+        $$ language 'plpgsql';
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION relatorios_reservas_change()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' AND OLD.deleted_at IS NULL THEN
+                PERFORM relatorios_aplicar_reserva(
+                    OLD.sala_id, OLD.local_id, OLD.data_inicio, OLD.data_fim, OLD.cafe, OLD.quantidade_cafe, -1
+                );
+            END IF;
+            IF TG_OP <> 'DELETE' AND NEW.deleted_at IS NULL THEN
+                PERFORM relatorios_aplicar_reserva(
+                    NEW.sala_id, NEW.local_id, NEW.data_inicio, NEW.data_fim, NEW.cafe, NEW.quantidade_cafe, 1
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    # Updates that do not touch the aggregated columns skip the trigger entirely
+    op.execute("""
+        CREATE TRIGGER relatorios_reservas_change AFTER INSERT OR DELETE ON reservas
+        FOR EACH ROW EXECUTE FUNCTION relatorios_reservas_change();
+    """)
+    op.execute("""
+        CREATE TRIGGER relatorios_reservas_update AFTER UPDATE OF
+            sala_id, local_id, data_inicio, data_fim, cafe, quantidade_cafe, deleted_at
+        ON reservas
+        FOR EACH ROW EXECUTE FUNCTION relatorios_reservas_change();
+    """)
+
+    # Full rebuild from reservas (also used by `python -m app.services.reports rebuild`)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION relatorios_rebuild()
+        RETURNS VOID AS $$
+        BEGIN
+            LOCK TABLE reservas IN SHARE MODE;
+            TRUNCATE ocupacao_horaria, cafe_diario;
+
+            INSERT INTO ocupacao_horaria (sala_id, dia, hora, segundos_reservados)
+            SELECT
+                r.sala_id,
+                hora::date,
+                EXTRACT(HOUR FROM hora)::smallint,
+                SUM(EXTRACT(EPOCH FROM
+                    LEAST(hora + INTERVAL '1 hour', r.data_fim AT TIME ZONE 'UTC')
+                    - GREATEST(hora, r.data_inicio AT TIME ZONE 'UTC')
+                ))::bigint
+            FROM reservas r
+            CROSS JOIN LATERAL generate_series(
+                date_trunc('hour', r.data_inicio AT TIME ZONE 'UTC'),
+                (r.data_fim AT TIME ZONE 'UTC') - INTERVAL '1 microsecond',
+                INTERVAL '1 hour'
+            ) AS hora
+            WHERE r.deleted_at IS NULL AND r.data_fim > r.data_inicio
+            GROUP BY 1, 2, 3;
+
+            INSERT INTO cafe_diario (local_id, dia, reservas, quantidade_cafe)
+            SELECT local_id, (data_inicio AT TIME ZONE 'UTC')::date, COUNT(*), COALESCE(SUM(quantidade_cafe), 0)
+            FROM reservas
+            WHERE deleted_at IS NULL AND cafe AND data_fim > data_inicio
+            GROUP BY 1, 2;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("SELECT relatorios_rebuild();")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS relatorios_reservas_update ON reservas;")
+    op.execute("DROP TRIGGER IF EXISTS relatorios_reservas_change ON reservas;")
+    op.execute("DROP FUNCTION IF EXISTS relatorios_rebuild();")
+    op.execute("DROP FUNCTION IF EXISTS relatorios_reservas_change();")
+    op.execute("DROP FUNCTION IF EXISTS relatorios_aplicar_reserva(INTEGER, INTEGER, TIMESTAMPTZ, TIMESTAMPTZ, BOOLEAN, INTEGER, INTEGER);")
+    op.drop_index('idx_cafe_diario_dia', table_name='cafe_diario')
+    op.drop_table('cafe_diario')
+    op.drop_index('idx_ocupacao_horaria_dia', table_name='ocupacao_horaria')
+    op.drop_table('ocupacao_horaria')
@@ -0,0 +1,65 @@
+"""skip change_seq and NOTIFY when only participantes_count changes
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c5d6e7f8a9'
+down_revision: Union[str, None] = 'a3b4c5d6e7f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# True when the update changes something besides the participant counter (and the
+# columns maintained by the triggers themselves: updated_at, change_seq)
+CHANGED_BESIDES_COUNT = """
+    (to_jsonb(OLD) - 'participantes_count' - 'updated_at' - 'change_seq')
+    IS DISTINCT FROM
+    (to_jsonb(NEW) - 'participantes_count' - 'updated_at' - 'change_seq')
+"""
+
+
+def upgrade() -> None:
+    # The participantes_count statement triggers update reservas on every
+    # participant change; those updates neither enter the changes feed nor
+    # wake the SSE streams and other workers' availability indexes
+    op.execute("DROP TRIGGER IF EXISTS update_reservas_change_seq ON reservas;")
+    op.execute(f"""
+        CREATE TRIGGER update_reservas_change_seq BEFORE UPDATE ON reservas
+        FOR EACH ROW WHEN ({CHANGED_BESIDES_COUNT})
+        EXECUTE FUNCTION update_reservas_change_seq();
+    """)
+
+    # WHEN cannot reference OLD on INSERT: one trigger per operation
+    op.execute("DROP TRIGGER IF EXISTS notify_reservas_change ON reservas;")
+    op.execute("""
+        CREATE TRIGGER notify_reservas_change AFTER INSERT ON reservas
+        FOR EACH ROW EXECUTE FUNCTION notify_reservas_change();
+    """)
+    op.execute(f"""
+        CREATE TRIGGER notify_reservas_update AFTER UPDATE ON reservas
+        FOR EACH ROW WHEN ({CHANGED_BESIDES_COUNT})
+        EXECUTE FUNCTION notify_reservas_change();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS notify_reservas_update ON reservas;")
+    op.execute("DROP TRIGGER IF EXISTS notify_reservas_change ON reservas;")
+    op.execute("""
+        CREATE TRIGGER notify_reservas_change AFTER INSERT OR UPDATE ON reservas
+        FOR EACH ROW EXECUTE FUNCTION notify_reservas_change();
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS update_reservas_change_seq ON reservas;")
+    op.execute("""
+        CREATE TRIGGER update_reservas_change_seq BEFORE UPDATE ON reservas
+        FOR EACH ROW EXECUTE FUNCTION update_reservas_change_seq();
+    """)
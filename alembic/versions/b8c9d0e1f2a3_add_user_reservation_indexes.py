@@ -0,0 +1,38 @@
+"""add indexes for listing a user's reservations (creator and participant)
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Reservations created by a user, in start order
+    op.create_index(
+        'idx_reserva_criado_por_data',
+        'reservas',
+        ['criado_por_email', 'data_inicio'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    # Reservations a user participates in; supersedes idx_participante_usuario
+    op.create_index('idx_participante_usuario_reserva', 'participantes', ['usuario_id', 'reserva_id'], unique=False)
+    op.drop_index('idx_participante_usuario', table_name='participantes')
+
+
+def downgrade() -> None:
+    op.create_index('idx_participante_usuario', 'participantes', ['usuario_id'], unique=False)
+    op.drop_index('idx_participante_usuario_reserva', table_name='participantes')
+    op.drop_index('idx_reserva_criado_por_data', table_name='reservas')
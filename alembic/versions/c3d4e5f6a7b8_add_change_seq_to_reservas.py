@@ -0,0 +1,54 @@
+"""add change_seq to reservas for incremental sync
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6a7b8'
+down_revision: Union[str, None] = 'b2c3d4e5f6a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Monotonic change counter shared by all reservation writes
+    op.execute("CREATE SEQUENCE IF NOT EXISTS reservas_change_seq;")
+
+    # Existing rows receive a value from the sequence (volatile default is evaluated per row)
+    op.add_column(
+        'reservas',
+        sa.Column('change_seq', sa.BigInteger(), server_default=sa.text("nextval('reservas_change_seq')"), nullable=False)
+    )
+    op.execute("ALTER SEQUENCE reservas_change_seq OWNED BY reservas.change_seq;")
+    op.create_index('idx_reserva_change_seq', 'reservas', ['change_seq'], unique=False)
+
+    # Bump change_seq on every update (including soft delete via deleted_at)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_reservas_change_seq()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.change_seq = nextval('reservas_change_seq');
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER update_reservas_change_seq BEFORE UPDATE ON reservas
+        FOR EACH ROW EXECUTE FUNCTION update_reservas_change_seq();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS update_reservas_change_seq ON reservas;")
+    op.execute("DROP FUNCTION IF EXISTS update_reservas_change_seq();")
+    op.drop_index('idx_reserva_change_seq', table_name='reservas')
+    op.drop_column('reservas', 'change_seq')
+    op.execute("DROP SEQUENCE IF EXISTS reservas_change_seq;")
@@ -0,0 +1,40 @@
+"""bump change_seq again when only participantes_count changes
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d6e7f8a9b0'
+down_revision: Union[str, None] = 'b4c5d6e7f8a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # participantes_count is part of the changes feed items, so count updates must
+    # enter the feed; only the NOTIFY (notify_reservas_update) keeps skipping them
+    op.execute("DROP TRIGGER IF EXISTS update_reservas_change_seq ON reservas;")
+    op.execute("""
+        CREATE TRIGGER update_reservas_change_seq BEFORE UPDATE ON reservas
+        FOR EACH ROW EXECUTE FUNCTION update_reservas_change_seq();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS update_reservas_change_seq ON reservas;")
+    op.execute("""
+        CREATE TRIGGER update_reservas_change_seq BEFORE UPDATE ON reservas
+        FOR EACH ROW WHEN (
+            (to_jsonb(OLD) - 'participantes_count' - 'updated_at' - 'change_seq')
+            IS DISTINCT FROM
+            (to_jsonb(NEW) - 'participantes_count' - 'updated_at' - 'change_seq')
+        )
+        EXECUTE FUNCTION update_reservas_change_seq();
+    """)
@@ -0,0 +1,49 @@
+"""add unique partial indexes on participantes (bulk insert ON CONFLICT DO NOTHING)
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Remove duplicates that the application-level checks may have let through
+    # (concurrent requests), keeping the oldest row
+    op.execute("""
+        DELETE FROM participantes p
+        USING participantes d
+        WHERE p.reserva_id = d.reserva_id
+          AND p.id > d.id
+          AND (p.usuario_id = d.usuario_id OR p.nome_manual = d.nome_manual);
+    """)
+    op.create_index(
+        'idx_participante_reserva_usuario_unico',
+        'participantes',
+        ['reserva_id', 'usuario_id'],
+        unique=True,
+        postgresql_where=sa.text('usuario_id IS NOT NULL')
+    )
+    op.create_index(
+        'idx_participante_reserva_nome_unico',
+        'participantes',
+        ['reserva_id', 'nome_manual'],
+        unique=True,
+        postgresql_where=sa.text('nome_manual IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_participante_reserva_nome_unico', table_name='participantes')
+    op.drop_index('idx_participante_reserva_usuario_unico', table_name='participantes')
@@ -0,0 +1,73 @@
+"""add participantes_count to reservas, maintained by statement-level triggers
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('reservas', sa.Column('participantes_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE reservas r
+        SET participantes_count = p.total
+        FROM (SELECT reserva_id, COUNT(*) AS total FROM participantes GROUP BY reserva_id) p
+        WHERE r.id = p.reserva_id;
+    """)
+
+    # Statement-level triggers: a multi-row INSERT/DELETE updates each
+    # reservation once, with the number of rows it gained or lost
+    op.execute("""
+        CREATE OR REPLACE FUNCTION participantes_count_insert()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE reservas r
+            SET participantes_count = r.participantes_count + n.total
+            FROM (SELECT reserva_id, COUNT(*) AS total FROM novos GROUP BY reserva_id) n
+            WHERE r.id = n.reserva_id;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION participantes_count_delete()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE reservas r
+            SET participantes_count = GREATEST(r.participantes_count - n.total, 0)
+            FROM (SELECT reserva_id, COUNT(*) AS total FROM removidos GROUP BY reserva_id) n
+            WHERE r.id = n.reserva_id;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER participantes_count_insert AFTER INSERT ON participantes
+        REFERENCING NEW TABLE AS novos
+        FOR EACH STATEMENT EXECUTE FUNCTION participantes_count_insert();
+    """)
+    op.execute("""
+        CREATE TRIGGER participantes_count_delete AFTER DELETE ON participantes
+        REFERENCING OLD TABLE AS removidos
+        FOR EACH STATEMENT EXECUTE FUNCTION participantes_count_delete();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS participantes_count_delete ON participantes;")
+    op.execute("DROP TRIGGER IF EXISTS participantes_count_insert ON participantes;")
+    op.execute("DROP FUNCTION IF EXISTS participantes_count_delete();")
+    op.execute("DROP FUNCTION IF EXISTS participantes_count_insert();")
+    op.drop_column('reservas', 'participantes_count')
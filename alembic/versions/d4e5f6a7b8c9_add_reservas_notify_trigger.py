@@ -0,0 +1,63 @@
+"""add LISTEN/NOTIFY trigger for reservation changes
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, None] = 'c3d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Publish every reservation write on the 'reservas_changes' channel
+    # (consumed by the SSE availability streams)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_reservas_change()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            operacao TEXT;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                operacao := 'create';
+            ELSIF NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN
+                operacao := 'delete';
+            ELSE
+                operacao := 'update';
+            END IF;
+
+            PERFORM pg_notify('reservas_changes', json_build_object(
+                'op', operacao,
+                'id', NEW.id,
+                'sala_id', NEW.sala_id,
+                'local_id', NEW.local_id,
+                'old_sala_id', CASE WHEN TG_OP = 'UPDATE' THEN OLD.sala_id END,
+                'old_local_id', CASE WHEN TG_OP = 'UPDATE' THEN OLD.local_id END,
+                'data_inicio', NEW.data_inicio,
+                'data_fim', NEW.data_fim,
+                'old_data_inicio', CASE WHEN TG_OP = 'UPDATE' THEN OLD.data_inicio END,
+                'old_data_fim', CASE WHEN TG_OP = 'UPDATE' THEN OLD.data_fim END,
+                'change_seq', NEW.change_seq
+            )::text);
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER notify_reservas_change AFTER INSERT OR UPDATE ON reservas
+        FOR EACH ROW EXECUTE FUNCTION notify_reservas_change();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS notify_reservas_change ON reservas;")
+    op.execute("DROP FUNCTION IF EXISTS notify_reservas_change();")
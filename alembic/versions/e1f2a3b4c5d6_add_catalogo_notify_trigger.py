@@ -0,0 +1,49 @@
+"""add LISTEN/NOTIFY trigger for location and room changes
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f2a3b4c5d6'
+down_revision: Union[str, None] = 'd0e1f2a3b4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Publish location/room writes on the 'catalogo_changes' channel so every
+    # worker drops its in-process catalog cache (one notification per statement)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_catalogo_change()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM pg_notify('catalogo_changes', json_build_object(
+                'op', lower(TG_OP),
+                'tabela', TG_TABLE_NAME
+            )::text);
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER notify_locais_change AFTER INSERT OR UPDATE OR DELETE ON locais
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_catalogo_change();
+    """)
+    op.execute("""
+        CREATE TRIGGER notify_salas_change AFTER INSERT OR UPDATE OR DELETE ON salas
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_catalogo_change();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS notify_salas_change ON salas;")
+    op.execute("DROP TRIGGER IF EXISTS notify_locais_change ON locais;")
+    op.execute("DROP FUNCTION IF EXISTS notify_catalogo_change();")
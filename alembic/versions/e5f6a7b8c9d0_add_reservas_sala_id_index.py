@@ -0,0 +1,34 @@
+"""add index on reservas(sala_id, data_inicio, data_fim) for active rows
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Range queries for conflict detection filter by sala_id (the existing
+    # idx_reserva_sala_datas index covers the denormalized room name only)
+    op.create_index(
+        'idx_reserva_sala_id_datas',
+        'reservas',
+        ['sala_id', 'data_inicio', 'data_fim'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_reserva_sala_id_datas', table_name='reservas')
@@ -0,0 +1,60 @@
+"""make change_seq safe for incremental sync (in-flight lower bounds)
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a3b4c5d6e7'
+down_revision: Union[str, None] = 'e1f2a3b4c5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # change_seq is drawn when the row is written, not when the transaction commits,
+    # so a change can become visible after changes with higher values. Before its
+    # first draw, a transaction holds a shared advisory lock whose key carries a
+    # lower bound of every value it will draw (the sequence's last value); the
+    # changes feed only returns rows below the lowest bound still held
+    # (crud.list_reservas_changes). Key: namespace 0x525356 in the high 24 bits.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_reservas_change_seq()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF COALESCE(current_setting('reservas.change_seq_locked', true), '') = '' THEN
+                PERFORM pg_advisory_xact_lock_shared(
+                    (5395286::bigint << 40)
+                    | COALESCE(pg_sequence_last_value('reservas_change_seq'), 0)
+                );
+                PERFORM set_config('reservas.change_seq_locked', 'on', true);
+            END IF;
+            NEW.change_seq = nextval('reservas_change_seq');
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+    """)
+    # Inserts draw through the trigger too (the column default runs before the lock)
+    op.execute("""
+        CREATE TRIGGER insert_reservas_change_seq BEFORE INSERT ON reservas
+        FOR EACH ROW EXECUTE FUNCTION update_reservas_change_seq();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS insert_reservas_change_seq ON reservas;")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_reservas_change_seq()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.change_seq = nextval('reservas_change_seq');
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+    """)
@@ -0,0 +1,87 @@
+"""add series_reservas and series_excecoes tables (recurring reservations)
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create series_reservas table
+    op.create_table(
+        'series_reservas',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('local_id', sa.Integer(), nullable=False),
+        sa.Column('sala_id', sa.Integer(), nullable=False),
+        sa.Column('local', sa.String(length=100), nullable=False),
+        sa.Column('sala', sa.String(length=100), nullable=False),
+        sa.Column('rrule', sa.String(length=500), nullable=False),
+        sa.Column('data_inicio', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('data_fim', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('data_fim_serie', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('responsavel', sa.String(length=150), nullable=False),
+        sa.Column('cafe', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('quantidade_cafe', sa.Integer(), nullable=True),
+        sa.Column('descricao', sa.Text(), nullable=True),
+        sa.Column('criado_por_email', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['local_id'], ['locais.id'], ),
+        sa.ForeignKeyConstraint(['sala_id'], ['salas.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_series_reservas_id'), 'series_reservas', ['id'], unique=False)
+    op.create_index(
+        'idx_serie_sala_datas',
+        'series_reservas',
+        ['sala_id', 'data_inicio', 'data_fim_serie'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+    # Create series_excecoes table (per-occurrence cancellations and reschedules)
+    op.create_table(
+        'series_excecoes',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('serie_id', sa.Integer(), nullable=False),
+        sa.Column('data_original', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('cancelada', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('data_inicio', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('data_fim', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['serie_id'], ['series_reservas.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_series_excecoes_id'), 'series_excecoes', ['id'], unique=False)
+    op.create_index('idx_excecao_serie_data', 'series_excecoes', ['serie_id', 'data_original'], unique=True)
+
+    # Create trigger to update updated_at in series_reservas
+    op.execute("""
+        CREATE TRIGGER update_series_reservas_updated_at BEFORE UPDATE ON series_reservas
+        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS update_series_reservas_updated_at ON series_reservas;")
+
+    op.drop_index('idx_excecao_serie_data', table_name='series_excecoes')
+    op.drop_index(op.f('ix_series_excecoes_id'), table_name='series_excecoes')
+    op.drop_table('series_excecoes')
+
+    op.drop_index('idx_serie_sala_datas', table_name='series_reservas')
+    op.drop_index(op.f('ix_series_reservas_id'), table_name='series_reservas')
+    op.drop_table('series_reservas')
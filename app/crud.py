@@ -1,8 +1,37 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from datetime import datetime, timezone
-from typing import Optional, List
+from sqlalchemy.orm import Session, noload, selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy import and_, or_, func, inspect, literal, select, insert, text, tuple_, union, union_all, update
+from bisect import bisect_left
+import heapq
+import os
+from collections import defaultdict
+from datetime import date, datetime, timezone, timedelta
+from functools import lru_cache
+from typing import Callable, Optional, List, Dict, Tuple, Union
 from . import models, schemas
+from .services import pipeline, recurrence
+from .services.availability import slot_index
+from .services.catalog import catalog_cache
+
+
+# ========== Row-based reads ==========
+
+@lru_cache(maxsize=None)
+def output_columns(model, schema, fields: Optional[Tuple[str, ...]] = None) -> tuple:
+    """
+    Mapped columns of `model` that are output fields of `schema` (restricted to
+    `fields` for sparse fieldsets), in schema order.
+    Read-only lists select just these columns with Core select() and return
+    SQLAlchemy Row objects (compact named tuples) instead of ORM entities, so no
+    identity map, change tracking or relationship loaders are involved.
+    """
+    columns = inspect(model).columns
+    return tuple(
+        getattr(model, name)
+        for name in schema.model_fields
+        if name in columns and (fields is None or name in fields)
+    )
 
 
 # ========== Location CRUD ==========
@@ -12,6 +41,7 @@ def create_local(db: Session, local: schemas.LocalCreate) -> models.Local:
     db_local = models.Local(**local.model_dump())
     db.add(db_local)
     db.commit()
+    catalog_cache.invalidate()
     db.refresh(db_local)
     return db_local
 
@@ -32,16 +62,16 @@ def get_local_by_id_with_deleted(db: Session, local_id: int) -> Optional[models.
 def list_locais(
     db: Session,
     skip: int = 0,
-    limit: int = 100,
+    limit: Optional[int] = 100,
     ativo: Optional[bool] = None
-) -> List[models.Local]:
-    """Lists locations with optional filters."""
-    query = db.query(models.Local).filter(models.Local.deleted_at.is_(None))
+) -> List[Row]:
+    """Lists locations with optional filters (rows with the LocalOut columns; limit=None for all)."""
+    query = select(*output_columns(models.Local, schemas.LocalOut)).where(models.Local.deleted_at.is_(None))
     
     if ativo is not None:
-        query = query.filter(models.Local.ativo == ativo)
+        query = query.where(models.Local.ativo == ativo)
     
-    return query.order_by(models.Local.nome).offset(skip).limit(limit).all()
+    return db.execute(query.order_by(models.Local.nome).offset(skip).limit(limit)).all()
 
 
 def count_locais(db: Session, ativo: Optional[bool] = None) -> int:
@@ -63,19 +93,33 @@ def update_local(db: Session, local_id: int, local_update: schemas.LocalUpdate)
         setattr(db_local, field, value)
     
     db.commit()
+    catalog_cache.invalidate()
     db.refresh(db_local)
     return db_local
 
 
-def delete_local(db: Session, local_id: int) -> bool:
-    """Soft delete of a location."""
-    db_local = get_local_by_id(db, local_id)
-    if not db_local:
-        return False
+def delete_local(db: Session, local_id: int, cancelar_reservas_futuras: bool = False) -> Optional[Dict[str, int]]:
+    """
+    Soft delete of a location, cascading to its rooms (and, optionally, to their
+    future reservations and series). Returns the counts of stamped rows, or None if not found.
+    """
+    now = datetime.now(timezone.utc)
+    locais = db.execute(
+        update(models.Local)
+        .where(models.Local.id == local_id, models.Local.deleted_at.is_(None))
+        .values(deleted_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if locais.rowcount == 0:
+        db.rollback()
+        return None
     
-    db_local.deleted_at = datetime.now(timezone.utc)
+    salas = _soft_delete_salas(db, models.Sala.local_id == local_id, now, cancelar_reservas_futuras)
     db.commit()
-    return True
+    catalog_cache.invalidate()
+    for sala_id in salas["sala_ids"]:
+        slot_index.invalidate(sala_id)
+    return {"salas": len(salas["sala_ids"]), "reservas": salas["reservas"], "series": salas["series"]}
 
 
 # ========== Room CRUD ==========
@@ -99,6 +143,7 @@ def create_sala(db: Session, sala: schemas.SalaCreate) -> models.Sala:
     db_sala = models.Sala(**sala.model_dump())
     db.add(db_sala)
     db.commit()
+    catalog_cache.invalidate()
     db.refresh(db_sala)
     return db_sala
 
@@ -119,24 +164,24 @@ def get_sala_by_id_with_deleted(db: Session, sala_id: int) -> Optional[models.Sa
 def list_salas(
     db: Session,
     skip: int = 0,
-    limit: int = 100,
+    limit: Optional[int] = 100,
     local_id: Optional[int] = None,
     ativo: Optional[bool] = None,
     capacidade_minima: Optional[int] = None
-) -> List[models.Sala]:
-    """Lists rooms with optional filters."""
-    query = db.query(models.Sala).filter(models.Sala.deleted_at.is_(None))
+) -> List[Row]:
+    """Lists rooms with optional filters (rows with the SalaOut columns; limit=None for all)."""
+    query = select(*output_columns(models.Sala, schemas.SalaOut)).where(models.Sala.deleted_at.is_(None))
     
     if local_id is not None:
-        query = query.filter(models.Sala.local_id == local_id)
+        query = query.where(models.Sala.local_id == local_id)
     
     if ativo is not None:
-        query = query.filter(models.Sala.ativo == ativo)
+        query = query.where(models.Sala.ativo == ativo)
     
     if capacidade_minima is not None:
-        query = query.filter(models.Sala.capacidade >= capacidade_minima)
+        query = query.where(models.Sala.capacidade >= capacidade_minima)
     
-    return query.order_by(models.Sala.nome).offset(skip).limit(limit).all()
+    return db.execute(query.order_by(models.Sala.nome).offset(skip).limit(limit)).all()
 
 
 def count_salas(
@@ -186,29 +231,146 @@ def update_sala(db: Session, sala_id: int, sala_update: schemas.SalaUpdate) -> O
         setattr(db_sala, field, value)
     
     db.commit()
+    catalog_cache.invalidate()
     db.refresh(db_sala)
     return db_sala
 
 
-def delete_sala(db: Session, sala_id: int) -> bool:
-    """Soft delete of a room."""
-    db_sala = get_sala_by_id(db, sala_id)
-    if not db_sala:
-        return False
+def _soft_delete_salas(db: Session, condition, now: datetime, cancelar_reservas_futuras: bool = False) -> dict:
+    """
+    Stamps deleted_at on the non-deleted rooms matching condition and, optionally,
+    on their reservations starting from now on and their recurring series (see
+    _encerrar_series): set-based UPDATEs inside the caller's transaction (which
+    commits). Ongoing reservations are kept.
+    Returns {"sala_ids": [...], "reservas": count, "series": count}.
+    """
+    sala_ids = db.execute(
+        update(models.Sala)
+        .where(condition, models.Sala.deleted_at.is_(None))
+        .values(deleted_at=now)
+        .returning(models.Sala.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    
+    reservas = series = 0
+    if sala_ids and cancelar_reservas_futuras:
+        reservas = db.execute(
+            update(models.Reserva)
+            .where(
+                models.Reserva.sala_id.in_(sala_ids),
+                models.Reserva.data_inicio >= now,
+                models.Reserva.deleted_at.is_(None)
+            )
+            .values(deleted_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        series = _encerrar_series(db, sala_ids, now)
+    return {"sala_ids": sala_ids, "reservas": reservas, "series": series}
+
+
+def _encerrar_series(db: Session, sala_ids: List[int], now: datetime) -> int:
+    """
+    Ends the recurring series of the rooms at now, like their single reservations:
+    series not started yet are soft-deleted; ongoing ones keep their past
+    occurrences, with the RRULE bounded by UNTIL=now (replacing COUNT/UNTIL),
+    data_fim_serie set to now and their future rescheduled occurrences cancelled.
+    Ongoing series whose rule leaves no room for the UNTIL part in the column are
+    soft-deleted too. Returns the number of series.
+    """
+    series = models.SerieReserva.__table__
+    ativas = and_(series.c.sala_id.in_(sala_ids), series.c.deleted_at.is_(None))
+    em_andamento = and_(
+        series.c.data_inicio < now,
+        or_(series.c.data_fim_serie.is_(None), series.c.data_fim_serie > now)
+    )
+    # Occurrences are expanded from the RRULE, so data_fim_serie alone would not end the series
+    rrule = (
+        func.regexp_replace(series.c.rrule, ";?(COUNT|UNTIL)=[^;]*", "", "gi", type_=series.c.rrule.type)
+        + f";UNTIL={now.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}"
+    )
+    cabe = func.length(rrule) <= series.c.rrule.type.length
+    
+    excluidas = db.execute(
+        update(series)
+        .where(ativas, or_(series.c.data_inicio >= now, and_(em_andamento, ~cabe)))
+        .values(deleted_at=now)
+    ).rowcount
+    
+    encerradas = db.execute(
+        update(series)
+        .where(ativas, em_andamento, cabe)
+        .values(rrule=rrule, data_fim_serie=now)
+        .returning(series.c.id)
+    ).scalars().all()
+    
+    if encerradas:
+        excecoes = models.SerieExcecao.__table__
+        db.execute(
+            update(excecoes)
+            .where(
+                excecoes.c.serie_id.in_(encerradas),
+                excecoes.c.cancelada.is_(False),
+                excecoes.c.data_inicio >= now
+            )
+            .values(cancelada=True, data_inicio=None, data_fim=None)
+        )
+    return excluidas + len(encerradas)
+
+
+def delete_sala(db: Session, sala_id: int, cancelar_reservas_futuras: bool = False) -> Optional[Dict[str, int]]:
+    """
+    Soft delete of a room and, optionally, of its future reservations and series.
+    Returns the counts of stamped rows, or None if not found.
+    """
+    salas = _soft_delete_salas(db, models.Sala.id == sala_id, datetime.now(timezone.utc), cancelar_reservas_futuras)
+    if not salas["sala_ids"]:
+        db.rollback()
+        return None
     
-    db_sala.deleted_at = datetime.now(timezone.utc)
     db.commit()
-    return True
+    catalog_cache.invalidate()
+    slot_index.invalidate(sala_id)
+    return {"salas": 1, "reservas": salas["reservas"], "series": salas["series"]}
 
 
 # ========== Reservation CRUD ==========
 
+# Serialize writes per room with pg_advisory_xact_lock(sala_id) taken before the
+# conflict check (Postgres only); writes to different rooms are not affected
+SALA_ADVISORY_LOCKS = os.getenv("SALA_ADVISORY_LOCKS", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# Free-interval suggestions returned with time conflicts
+MAX_SUGESTOES_HORARIO = 5
+JANELA_SUGESTOES = timedelta(days=7)
+
+
+class ConflitoHorarioError(ValueError):
+    """Time conflict, carrying the conflicting reservations and nearby free intervals."""
+
+    def __init__(self, message: str, conflitos: List[dict], sugestoes: List[dict]):
+        super().__init__(message)
+        self.conflitos = conflitos
+        self.sugestoes = sugestoes
+
+def lock_salas(db: Session, sala_ids) -> None:
+    """
+    Takes the transaction-scoped advisory lock of each room, in ascending order so
+    that writers locking several rooms cannot deadlock. The locks are released on
+    commit or rollback. No-op unless SALA_ADVISORY_LOCKS is on and the database is Postgres.
+    """
+    if not SALA_ADVISORY_LOCKS or db.get_bind().dialect.name != "postgresql":
+        return
+    for sala_id in sorted(set(sala_ids)):
+        db.execute(select(func.pg_advisory_xact_lock(sala_id)))
+
+
 def check_time_conflict(
     db: Session,
     sala_id: int,
     data_inicio: datetime,
     data_fim: datetime,
-    exclude_reserva_id: Optional[int] = None
+    exclude_reserva_id: Optional[int] = None,
+    exclude_ocorrencia: Optional[Tuple[int, datetime]] = None
 ) -> bool:
     """
     Checks time conflict for a room.
@@ -217,6 +379,8 @@ def check_time_conflict(
     - new_data_fim > existing_data_inicio
     - and they are for the same room
     
+    Occurrences of recurring reservations (series) in the room are also checked;
+    exclude_ocorrencia is a (serie_id, data_original) pair to ignore.
     Adjacent times (e.g., 10:00-11:00 and 11:00-12:00) are allowed.
     Returns True if there's a conflict, False otherwise.
     """
@@ -235,18 +399,140 @@ def check_time_conflict(
             models.Reserva.data_fim > data_inicio
         )
     ).first()
+    if conflicts is not None:
+        return True
+    
+    for ocorrencia in list_serie_ocorrencias(db, data_inicio, data_fim, sala_id=sala_id):
+        if exclude_ocorrencia == (ocorrencia["serie_id"], ocorrencia["data_original"]):
+            continue
+        return True
+    
+    return False
+
+
+def _ocupacao_por_sala(
+    db: Session,
+    sala_ids: List[int],
+    inicio: datetime,
+    fim: datetime,
+    exclude_reserva_id: Optional[int] = None
+) -> Dict[int, List[dict]]:
+    """
+    Busy intervals per room in [inicio, fim): reservations come from one ordered
+    range query, series occurrences are expanded on top of it.
+    """
+    query = db.query(
+        models.Reserva.id, models.Reserva.sala_id, models.Reserva.data_inicio, models.Reserva.data_fim
+    ).filter(
+        models.Reserva.sala_id.in_(sala_ids),
+        models.Reserva.deleted_at.is_(None),
+        models.Reserva.data_inicio < fim,
+        models.Reserva.data_fim > inicio
+    )
+    if exclude_reserva_id:
+        query = query.filter(models.Reserva.id != exclude_reserva_id)
+    
+    ocupacao: Dict[int, List[dict]] = defaultdict(list)
+    for row in query.order_by(models.Reserva.sala_id, models.Reserva.data_inicio):
+        ocupacao[row.sala_id].append({
+            "reserva_id": row.id, "serie_id": None, "data_inicio": row.data_inicio, "data_fim": row.data_fim
+        })
+    for ocorrencia in list_serie_ocorrencias(db, inicio, fim, sala_ids=sala_ids):
+        ocupacao[ocorrencia["sala_id"]].append({
+            "reserva_id": None,
+            "serie_id": ocorrencia["serie_id"],
+            "data_inicio": ocorrencia["data_inicio"],
+            "data_fim": ocorrencia["data_fim"]
+        })
+    return ocupacao
+
+
+def find_free_slots(
+    db: Session,
+    sala_ids: List[int],
+    data_inicio: datetime,
+    data_fim: datetime,
+    exclude_reserva_id: Optional[int] = None,
+    limit: int = MAX_SUGESTOES_HORARIO
+) -> List[dict]:
+    """
+    Finds the free intervals with the requested duration closest to the requested
+    start, in any of the given rooms (gap scan over the merged busy intervals).
+    """
+    duracao = data_fim - data_inicio
+    janela_inicio = max(datetime.now(timezone.utc), data_inicio - JANELA_SUGESTOES)
+    janela_fim = data_fim + JANELA_SUGESTOES
+    ocupacao = _ocupacao_por_sala(db, sala_ids, janela_inicio, janela_fim, exclude_reserva_id)
+    
+    candidatos = []
+    for sala_id in sala_ids:
+        busy = _merge_intervals([(item["data_inicio"], item["data_fim"]) for item in ocupacao.get(sala_id, [])])
+        gaps = []
+        cursor = janela_inicio
+        for busy_inicio, busy_fim in busy:
+            if busy_inicio > cursor:
+                gaps.append((cursor, busy_inicio))
+            cursor = max(cursor, busy_fim)
+        gaps.append((cursor, janela_fim))
+        
+        # Nearest placement inside each gap long enough for the reservation
+        for gap_inicio, gap_fim in gaps:
+            if gap_fim - gap_inicio < duracao:
+                continue
+            inicio = min(max(data_inicio, gap_inicio), gap_fim - duracao)
+            candidatos.append((abs(inicio - data_inicio), sala_id, inicio))
+    
+    candidatos.sort()
+    return [
+        {"sala_id": sala_id, "data_inicio": inicio, "data_fim": inicio + duracao}
+        for _, sala_id, inicio in candidatos[:limit]
+    ]
+
+
+def _conflito_horario(
+    db: Session,
+    sala_id: int,
+    local_id: int,
+    data_inicio: datetime,
+    data_fim: datetime,
+    exclude_reserva_id: Optional[int] = None,
+    sugerir_outras_salas: bool = False
+) -> ConflitoHorarioError:
+    """Builds the conflict error with the conflicting reservations and free-interval suggestions."""
+    conflitos = _ocupacao_por_sala(db, [sala_id], data_inicio, data_fim, exclude_reserva_id).get(sala_id, [])
+    
+    sala_ids = [sala_id]
+    if sugerir_outras_salas:
+        sala_ids += [
+            row.id for row in db.query(models.Sala.id).filter(
+                models.Sala.local_id == local_id,
+                models.Sala.id != sala_id,
+                models.Sala.ativo.is_(True),
+                models.Sala.deleted_at.is_(None)
+            )
+        ]
+    sugestoes = find_free_slots(db, sala_ids, data_inicio, data_fim, exclude_reserva_id)
     
-    return conflicts is not None
+    return ConflitoHorarioError(
+        "Conflito de horário: já existe uma reserva para esta sala neste intervalo",
+        conflitos=conflitos,
+        sugestoes=sugestoes
+    )
 
 
-def create_reserva(db: Session, reserva: schemas.ReservaCreate, criado_por_email: str) -> models.Reserva:
+def create_reserva(
+    db: Session,
+    reserva: schemas.ReservaCreate,
+    criado_por_email: str,
+    sugerir_outras_salas: bool = False
+) -> models.Reserva:
     """Creates a new reservation."""
-    # Validate that location and room exist and are active
-    local = get_local_by_id(db, reserva.local_id)
+    # Validate that location and room exist and are active (from the catalog cache)
+    local = catalog_cache.get_local(db, reserva.local_id)
     if not local:
         raise ValueError("Local não encontrado ou inativo")
     
-    sala = get_sala_by_id(db, reserva.sala_id)
+    sala = catalog_cache.get_sala(db, reserva.sala_id)
     if not sala:
         raise ValueError("Sala não encontrada ou inativa")
     
@@ -259,14 +545,18 @@ def create_reserva(db: Session, reserva: schemas.ReservaCreate, criado_por_email
     if reserva.data_inicio < now:
         raise ValueError("Não é permitido criar reservas no passado")
     
-    # Validate time conflict
+    # Validate time conflict (holding the room lock until commit, when enabled)
+    lock_salas(db, [reserva.sala_id])
     if check_time_conflict(
         db=db,
         sala_id=reserva.sala_id,
         data_inicio=reserva.data_inicio,
         data_fim=reserva.data_fim
     ):
-        raise ValueError("Conflito de horário: já existe uma reserva para esta sala neste intervalo")
+        raise _conflito_horario(
+            db, reserva.sala_id, reserva.local_id, reserva.data_inicio, reserva.data_fim,
+            sugerir_outras_salas=sugerir_outras_salas
+        )
     
     # Create reservation (denormalized fields will be filled)
     db_reserva = models.Reserva(
@@ -285,59 +575,304 @@ def create_reserva(db: Session, reserva: schemas.ReservaCreate, criado_por_email
     db.add(db_reserva)
     db.commit()
     db.refresh(db_reserva)
+    slot_index.invalidate(db_reserva.sala_id, db_reserva.data_inicio, db_reserva.data_fim)
     return db_reserva
 
 
-def get_reserva_by_id(db: Session, reserva_id: int) -> Optional[models.Reserva]:
+def _find_db_conflicts(
+    db: Session,
+    sala_id: int,
+    intervals: List[Tuple[int, datetime, datetime]]
+) -> List[int]:
+    """
+    Checks (index, data_inicio, data_fim) intervals of one room against the database
+    with a single range query. Returns the indexes that conflict.
+    """
+    window_inicio = min(inicio for _, inicio, _ in intervals)
+    window_fim = max(fim for _, _, fim in intervals)
+    existing = db.query(models.Reserva.data_inicio, models.Reserva.data_fim).filter(
+        models.Reserva.sala_id == sala_id,
+        models.Reserva.deleted_at.is_(None),
+        models.Reserva.data_inicio < window_fim,
+        models.Reserva.data_fim > window_inicio
+    ).order_by(models.Reserva.data_inicio).all()
+    existing = [(row.data_inicio, row.data_fim) for row in existing]
+    existing += [
+        (ocorrencia["data_inicio"], ocorrencia["data_fim"])
+        for ocorrencia in list_serie_ocorrencias(db, window_inicio, window_fim, sala_id=sala_id)
+    ]
+    if not existing:
+        return []
+    existing.sort()
+    
+    # Sorted starts + running max of ends: an interval conflicts if any existing
+    # reservation starting before its end finishes after its start
+    starts = [inicio for inicio, _ in existing]
+    max_ends = []
+    current_max = None
+    for _, fim in existing:
+        current_max = fim if current_max is None else max(current_max, fim)
+        max_ends.append(current_max)
+    
+    conflicts = []
+    for index, inicio, fim in intervals:
+        position = bisect_left(starts, fim)
+        if position > 0 and max_ends[position - 1] > inicio:
+            conflicts.append(index)
+    return conflicts
+
+
+def create_reservas_bulk(
+    db: Session,
+    reservas: List[schemas.ReservaCreate],
+    criado_por_email: str,
+    atomic: bool = True
+) -> List[dict]:
+    """
+    Creates many reservations at once.
+    Locations and rooms are validated against the catalog cache, conflicts against the database
+    are checked with one range query per room and conflicts inside the batch with a
+    sort-and-sweep per room. Valid rows are written with a single multi-row INSERT.
+    
+    If atomic is True, nothing is created when any item fails.
+    Returns one result dict per item (index, status, reserva, error).
+    """
+    errors: Dict[int, str] = {}
+    catalogo = catalog_cache.snapshot(db)
+    locais, salas = catalogo.locais, catalogo.salas
+    
+    now = datetime.now(timezone.utc)
+    for index, item in enumerate(reservas):
+        if item.local_id not in locais:
+            errors[index] = "Local não encontrado ou inativo"
+        elif item.sala_id not in salas:
+            errors[index] = "Sala não encontrada ou inativa"
+        elif salas[item.sala_id].local_id != item.local_id:
+            errors[index] = "A sala não pertence ao local informado"
+        elif item.data_inicio < now:
+            errors[index] = "Não é permitido criar reservas no passado"
+    
+    by_sala: Dict[int, List[Tuple[int, datetime, datetime]]] = defaultdict(list)
+    for index, item in enumerate(reservas):
+        if index not in errors:
+            by_sala[item.sala_id].append((index, item.data_inicio, item.data_fim))
+    
+    lock_salas(db, by_sala)
+    for sala_id, intervals in by_sala.items():
+        # Conflicts against existing reservations
+        for index in _find_db_conflicts(db, sala_id, intervals):
+            errors[index] = "Conflito de horário: já existe uma reserva para esta sala neste intervalo"
+        
+        # Conflicts inside the batch: the earlier-starting reservation wins
+        max_fim = None
+        for index, inicio, fim in sorted(intervals, key=lambda interval: (interval[1], interval[0])):
+            if index in errors:
+                continue
+            if max_fim is not None and inicio < max_fim:
+                errors[index] = "Conflito de horário: conflita com outra reserva do mesmo lote"
+                continue
+            max_fim = fim if max_fim is None else max(max_fim, fim)
+    
+    results = [{"index": index, "status": "failed", "reserva": None, "error": errors.get(index)} for index in range(len(reservas))]
+    valid_indexes = [index for index in range(len(reservas)) if index not in errors]
+    if atomic and errors:
+        for index in valid_indexes:
+            results[index]["status"] = "skipped"
+        return results
+    if not valid_indexes:
+        return results
+    
+    rows = []
+    for index in valid_indexes:
+        item = reservas[index]
+        rows.append({
+            "local_id": item.local_id,
+            "sala_id": item.sala_id,
+            "local": locais[item.local_id].nome,
+            "sala": salas[item.sala_id].nome,
+            "data_inicio": item.data_inicio,
+            "data_fim": item.data_fim,
+            "responsavel": item.responsavel,
+            "cafe": item.cafe,
+            "quantidade_cafe": item.quantidade_cafe if item.cafe else None,
+            "descricao": item.descricao,
+            "criado_por_email": criado_por_email
+        })
+    
+    created = db.scalars(
+        insert(models.Reserva).returning(models.Reserva, sort_by_parameter_order=True),
+        rows
+    ).all()
+    # Detach before commit so the RETURNING values are not expired (no refresh per row)
+    for db_reserva in created:
+        db.expunge(db_reserva)
+    db.commit()
+    
+    for index, db_reserva in zip(valid_indexes, created):
+        slot_index.invalidate(db_reserva.sala_id, db_reserva.data_inicio, db_reserva.data_fim)
+        results[index]["status"] = "created"
+        results[index]["reserva"] = db_reserva
+    return results
+
+
+def list_reservas_usuario(
+    db: Session,
+    email: str,
+    desde: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = 50
+) -> List[models.Reserva]:
+    """
+    Reservations created by the user or where the user participates, ordered by
+    (data_inicio, id) and paginated by keyset: `after` is the (data_inicio, id)
+    of the last row of the previous page. With `desde`, only reservations not
+    finished at that moment are returned.
+    Each side of the union is an index range scan limited to `limit` rows
+    (idx_reserva_criado_por_data and idx_participante_usuario_reserva).
+    """
+    def _restrict(query):
+        query = query.where(models.Reserva.deleted_at.is_(None))
+        if desde is not None:
+            query = query.where(models.Reserva.data_fim > desde)
+        if after is not None:
+            query = query.where(tuple_(models.Reserva.data_inicio, models.Reserva.id) > tuple_(*after))
+        return query.order_by(models.Reserva.data_inicio, models.Reserva.id).limit(limit)
+    
+    usuario_id = select(models.Usuario.id).where(models.Usuario.email == email).scalar_subquery()
+    criadas = _restrict(
+        select(models.Reserva.id).where(models.Reserva.criado_por_email == email)
+    ).subquery()
+    participando = _restrict(
+        select(models.Reserva.id).join(
+            models.Participante, models.Participante.reserva_id == models.Reserva.id
+        ).where(models.Participante.usuario_id == usuario_id)
+    ).subquery()
+    ids = union(select(criadas.c.id), select(participando.c.id)).subquery()
+    
+    return db.query(models.Reserva).join(
+        ids, ids.c.id == models.Reserva.id
+    ).order_by(models.Reserva.data_inicio, models.Reserva.id).limit(limit).all()
+
+
+# Related data that reservation reads can embed (?include=...)
+RESERVA_INCLUDES = ("participantes", "participantes.usuario")
+
+
+def _reserva_include_options(include: Optional[List[str]]) -> list:
+    """
+    Loader options for the requested includes: participants (and their users) are
+    fetched with selectinload, one extra query per level regardless of page size.
+    """
+    if not include:
+        return []
+    participantes = selectinload(models.Reserva.participantes)
+    if "participantes.usuario" in include:
+        return [participantes.selectinload(models.Participante.usuario)]
+    return [participantes.noload(models.Participante.usuario)]
+
+
+def get_reserva_by_id(
+    db: Session,
+    reserva_id: int,
+    include: Optional[List[str]] = None
+) -> Optional[models.Reserva]:
     """Gets a reservation by ID (only not deleted)."""
-    return db.query(models.Reserva).filter(
+    return db.query(models.Reserva).options(*_reserva_include_options(include)).filter(
         models.Reserva.id == reserva_id,
         models.Reserva.deleted_at.is_(None)
     ).first()
 
 
-def list_reservas(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
+def get_reserva_row(db: Session, reserva_id: int) -> Optional[Row]:
+    """Read-only variant of get_reserva_by_id (a row with the ReservaOut columns)."""
+    return db.execute(
+        select(*output_columns(models.Reserva, schemas.ReservaOut)).where(
+            models.Reserva.id == reserva_id,
+            models.Reserva.deleted_at.is_(None)
+        )
+    ).first()
+
+
+def _reserva_filters(
     data_inicio: Optional[datetime] = None,
     data_fim: Optional[datetime] = None,
     sala: Optional[str] = None,
     local: Optional[str] = None,
-    responsavel: Optional[str] = None
-) -> List[models.Reserva]:
+    responsavel: Optional[str] = None,
+    sala_id: Optional[int] = None,
+    local_id: Optional[int] = None,
+    ids: Optional[List[int]] = None
+) -> list:
     """
-    Lists reservations with optional filters.
-    If data_inicio and data_fim are provided, filters by date range.
+    WHERE conditions of the reservation list filters (not deleted included).
+    If data_inicio and data_fim are provided, filters by overlap with the interval.
     """
-    query = db.query(models.Reserva).filter(models.Reserva.deleted_at.is_(None))
+    conditions = [models.Reserva.deleted_at.is_(None)]
+    
+    if ids:
+        conditions.append(models.Reserva.id.in_(ids))
+    
+    if sala_id is not None:
+        conditions.append(models.Reserva.sala_id == sala_id)
+    
+    if local_id is not None:
+        conditions.append(models.Reserva.local_id == local_id)
     
     # Filter by date range
     if data_inicio and data_fim:
         if data_inicio > data_fim:
             raise ValueError("data_inicio não pode ser posterior a data_fim")
         # Reservations that overlap with the interval
-        query = query.filter(
+        conditions.append(
             and_(
                 models.Reserva.data_inicio < data_fim,
                 models.Reserva.data_fim > data_inicio
             )
         )
     elif data_inicio:
-        query = query.filter(models.Reserva.data_inicio >= data_inicio)
+        conditions.append(models.Reserva.data_inicio >= data_inicio)
     elif data_fim:
-        query = query.filter(models.Reserva.data_fim <= data_fim)
+        conditions.append(models.Reserva.data_fim <= data_fim)
     
     if sala:
-        query = query.filter(models.Reserva.sala.ilike(f"%{sala}%"))
+        conditions.append(models.Reserva.sala.ilike(f"%{sala}%"))
     
     if local:
-        query = query.filter(models.Reserva.local.ilike(f"%{local}%"))
+        conditions.append(models.Reserva.local.ilike(f"%{local}%"))
     
     if responsavel:
-        query = query.filter(models.Reserva.responsavel.ilike(f"%{responsavel}%"))
+        conditions.append(models.Reserva.responsavel.ilike(f"%{responsavel}%"))
+    
+    return conditions
+
+
+def list_reservas(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    sala: Optional[str] = None,
+    local: Optional[str] = None,
+    responsavel: Optional[str] = None,
+    include: Optional[List[str]] = None,
+    fields: Optional[Tuple[str, ...]] = None
+) -> list:
+    """
+    Lists reservations with optional filters.
+    If data_inicio and data_fim are provided, filters by date range.
+    Without includes, returns rows with the ReservaOut columns (only `fields`
+    when given); with includes, ORM entities with the requested relationships loaded.
+    """
+    conditions = _reserva_filters(data_inicio, data_fim, sala, local, responsavel)
     
-    return query.order_by(models.Reserva.data_inicio).offset(skip).limit(limit).all()
+    if include:
+        return db.query(models.Reserva).options(*_reserva_include_options(include)).filter(
+            *conditions
+        ).order_by(models.Reserva.data_inicio).offset(skip).limit(limit).all()
+    
+    query = select(*output_columns(models.Reserva, schemas.ReservaOut, fields)).where(*conditions)
+    return db.execute(query.order_by(models.Reserva.data_inicio).offset(skip).limit(limit)).all()
 
 
 def count_reservas(
@@ -349,49 +884,121 @@ def count_reservas(
     responsavel: Optional[str] = None
 ) -> int:
     """Counts total reservations (for pagination)."""
-    query = db.query(models.Reserva).filter(models.Reserva.deleted_at.is_(None))
+    conditions = _reserva_filters(data_inicio, data_fim, sala, local, responsavel)
+    return db.query(models.Reserva).filter(*conditions).count()
+
+
+def cancelar_reservas_em_lote(
+    db: Session,
+    filtro: schemas.ReservaCancelamentoLote
+) -> Tuple[int, List[int]]:
+    """
+    Soft-deletes every reservation matching the filter (same conditions as
+    list_reservas) with a single UPDATE ... RETURNING. With dry_run, only counts
+    them. Returns (total, cancelled IDs); the IDs are empty on a dry run.
+    Ownership is not checked: the caller must be an administrator.
+    """
+    conditions = _reserva_filters(
+        filtro.data_inicio,
+        filtro.data_fim,
+        sala_id=filtro.sala_id,
+        local_id=filtro.local_id,
+        ids=filtro.ids
+    )
+    if filtro.dry_run:
+        total = db.execute(select(func.count()).select_from(models.Reserva).where(*conditions)).scalar_one()
+        return total, []
     
-    if data_inicio and data_fim:
-        if data_inicio > data_fim:
-            raise ValueError("data_inicio não pode ser posterior a data_fim")
-        query = query.filter(
-            and_(
-                models.Reserva.data_inicio < data_fim,
-                models.Reserva.data_fim > data_inicio
-            )
-        )
-    elif data_inicio:
-        query = query.filter(models.Reserva.data_inicio >= data_inicio)
-    elif data_fim:
-        query = query.filter(models.Reserva.data_fim <= data_fim)
+    rows = db.execute(
+        update(models.Reserva)
+        .where(*conditions)
+        .values(deleted_at=datetime.now(timezone.utc))
+        .returning(models.Reserva.id, models.Reserva.sala_id, models.Reserva.data_inicio, models.Reserva.data_fim)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
     
-    if sala:
-        query = query.filter(models.Reserva.sala.ilike(f"%{sala}%"))
-    if local:
-        query = query.filter(models.Reserva.local.ilike(f"%{local}%"))
-    if responsavel:
-        query = query.filter(models.Reserva.responsavel.ilike(f"%{responsavel}%"))
+    # One slot index invalidation per room, over the span of its cancelled reservations
+    spans: Dict[int, Tuple[datetime, datetime]] = {}
+    for row in rows:
+        inicio, fim = spans.get(row.sala_id, (row.data_inicio, row.data_fim))
+        spans[row.sala_id] = (min(inicio, row.data_inicio), max(fim, row.data_fim))
+    for sala_id, (inicio, fim) in spans.items():
+        slot_index.invalidate(sala_id, inicio, fim)
+    return len(rows), sorted(row.id for row in rows)
+
+
+# Namespace (high 24 bits of the bigint key) of the shared advisory locks taken by
+# the update_reservas_change_seq trigger; the low 40 bits carry the lower bound
+# of the change_seq values drawn by the transaction holding it
+CHANGE_SEQ_LOCK_NAMESPACE = 0x525356
+
+_CHANGE_SEQ_LAST_VALUE = text("SELECT COALESCE(pg_sequence_last_value('reservas_change_seq'), 0)")
+
+_CHANGE_SEQ_IN_FLIGHT = text("""
+    SELECT min(((classid::bigint << 32) | objid::bigint) & ((1::bigint << 40) - 1))
+    FROM pg_locks
+    WHERE locktype = 'advisory'
+      AND objsubid = 1
+      AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND classid::bigint >> 8 = :namespace
+""")
+
+
+def get_change_seq_horizon(db: Session) -> Optional[int]:
+    """
+    Highest change_seq up to which every change is already visible, or None when
+    the database is not PostgreSQL (no concurrent writers to account for).
+    Values are drawn when a row is written, not when its transaction commits, so
+    a slow transaction can commit a lower change_seq after faster ones.
+    The sequence is read before the in-flight bounds, and both before the rows:
+    a transaction missing from the locks draws values above that reading.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
     
-    return query.count()
+    last_value = db.execute(_CHANGE_SEQ_LAST_VALUE).scalar_one()
+    in_flight = db.execute(_CHANGE_SEQ_IN_FLIGHT, {"namespace": CHANGE_SEQ_LOCK_NAMESPACE}).scalar_one()
+    return last_value if in_flight is None else min(last_value, in_flight)
 
 
-def update_reserva(db: Session, reserva_id: int, reserva_update: schemas.ReservaUpdate, usuario_email: str) -> Optional[models.Reserva]:
-    """Updates a reservation."""
-    db_reserva = get_reserva_by_id(db, reserva_id)
-    if not db_reserva:
-        return None
-    
+def list_reservas_changes(db: Session, since: int = 0, limit: int = 500) -> List[models.Reserva]:
+    """
+    Lists reservations created, updated or soft-deleted after the change token `since`.
+    Deleted reservations are included (with deleted_at filled) so clients can drop them.
+    Only changes up to get_change_seq_horizon are returned, so a token handed out
+    never skips a change committed later.
+    """
+    query = db.query(models.Reserva).filter(models.Reserva.change_seq > since)
+    horizon = get_change_seq_horizon(db)
+    if horizon is not None:
+        query = query.filter(models.Reserva.change_seq <= horizon)
+    return query.order_by(models.Reserva.change_seq).limit(limit).all()
+
+
+def _validar_atualizacao_reserva(
+    db: Session,
+    atual,
+    reserva_id: int,
+    update_data: dict,
+    usuario_email: str,
+    tem_conflito: Callable[[int, datetime, datetime], bool],
+    sugerir_outras_salas: bool = False
+) -> dict:
+    """
+    Validates an update of the reservation `atual` (ORM entity or row) and returns
+    update_data completed with the denormalized names and coffee fields.
+    tem_conflito(sala_id, data_inicio, data_fim) answers the time conflict check.
+    """
     # Check if user is the reservation creator
-    if db_reserva.criado_por_email and db_reserva.criado_por_email != usuario_email:
+    if atual.criado_por_email and atual.criado_por_email != usuario_email:
         raise ValueError("Você não tem permissão para editar esta reserva. Apenas o criador pode editá-la.")
     
-    update_data = reserva_update.model_dump(exclude_unset=True)
-    
     # Determine final values for validation
-    final_local_id = update_data.get("local_id", db_reserva.local_id)
-    final_sala_id = update_data.get("sala_id", db_reserva.sala_id)
-    final_data_inicio = update_data.get("data_inicio", db_reserva.data_inicio)
-    final_data_fim = update_data.get("data_fim", db_reserva.data_fim)
+    final_local_id = update_data.get("local_id", atual.local_id)
+    final_sala_id = update_data.get("sala_id", atual.sala_id)
+    final_data_inicio = update_data.get("data_inicio", atual.data_inicio)
+    final_data_fim = update_data.get("data_fim", atual.data_fim)
     
     # Validate dates
     if final_data_fim <= final_data_inicio:
@@ -404,11 +1011,11 @@ def update_reserva(db: Session, reserva_id: int, reserva_update: schemas.Reserva
     
     # Validate location and room if provided
     if "local_id" in update_data or "sala_id" in update_data:
-        local = get_local_by_id(db, final_local_id)
+        local = catalog_cache.get_local(db, final_local_id)
         if not local:
             raise ValueError("Local não encontrado ou inativo")
         
-        sala = get_sala_by_id(db, final_sala_id)
+        sala = catalog_cache.get_sala(db, final_sala_id)
         if not sala:
             raise ValueError("Sala não encontrada ou inativa")
         
@@ -420,33 +1027,161 @@ def update_reserva(db: Session, reserva_id: int, reserva_update: schemas.Reserva
         update_data["sala"] = sala.nome
     
     # Validate time conflict (ignoring the reservation itself)
-    if check_time_conflict(
-        db=db,
-        sala_id=final_sala_id,
-        data_inicio=final_data_inicio,
-        data_fim=final_data_fim,
-        exclude_reserva_id=reserva_id
-    ):
-        raise ValueError("Conflito de horário: já existe uma reserva para esta sala neste intervalo")
+    if tem_conflito(final_sala_id, final_data_inicio, final_data_fim):
+        raise _conflito_horario(
+            db, final_sala_id, final_local_id, final_data_inicio, final_data_fim,
+            exclude_reserva_id=reserva_id,
+            sugerir_outras_salas=sugerir_outras_salas
+        )
     
     # Validate coffee
-    final_cafe = update_data.get("cafe", db_reserva.cafe)
-    final_quantidade_cafe = update_data.get("quantidade_cafe", db_reserva.quantidade_cafe)
+    final_cafe = update_data.get("cafe", atual.cafe)
+    final_quantidade_cafe = update_data.get("quantidade_cafe", atual.quantidade_cafe)
     if final_cafe is True:
         if final_quantidade_cafe is None or final_quantidade_cafe <= 0:
             raise ValueError("quantidade_cafe é obrigatório e deve ser maior que 0 quando cafe = true")
     elif final_cafe is False:
         update_data["quantidade_cafe"] = None
     
+    return update_data
+
+
+def update_reserva(
+    db: Session,
+    reserva_id: int,
+    reserva_update: schemas.ReservaUpdate,
+    usuario_email: str,
+    sugerir_outras_salas: bool = False
+) -> Optional[Union[models.Reserva, Row]]:
+    """Updates a reservation (in two pipeline flushes when the driver supports it)."""
+    if pipeline.is_available(db):
+        return _update_reserva_pipelined(db, reserva_id, reserva_update, usuario_email, sugerir_outras_salas)
+    
+    db_reserva = get_reserva_by_id(db, reserva_id)
+    if not db_reserva:
+        return None
+    
+    def tem_conflito(sala_id: int, data_inicio: datetime, data_fim: datetime) -> bool:
+        lock_salas(db, [sala_id])
+        return check_time_conflict(
+            db=db,
+            sala_id=sala_id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            exclude_reserva_id=reserva_id
+        )
+    
+    update_data = _validar_atualizacao_reserva(
+        db,
+        db_reserva,
+        reserva_id,
+        reserva_update.model_dump(exclude_unset=True),
+        usuario_email,
+        tem_conflito,
+        sugerir_outras_salas=sugerir_outras_salas
+    )
+    
     # Apply updates
+    previous = (db_reserva.sala_id, db_reserva.data_inicio, db_reserva.data_fim)
     for field, value in update_data.items():
         setattr(db_reserva, field, value)
     
     db.commit()
     db.refresh(db_reserva)
+    slot_index.invalidate(*previous)
+    slot_index.invalidate(db_reserva.sala_id, db_reserva.data_inicio, db_reserva.data_fim)
     return db_reserva
 
 
+def _update_reserva_pipelined(
+    db: Session,
+    reserva_id: int,
+    reserva_update: schemas.ReservaUpdate,
+    usuario_email: str,
+    sugerir_outras_salas: bool = False
+) -> Optional[Row]:
+    """
+    update_reserva in two network flushes instead of one round trip per query.
+    First flush: the reservation, a conflicting reservation and the room's
+    series with their exceptions, all read against the final room and interval
+    computed in SQL (submitted value, or the current column when not submitted).
+    Second flush: UPDATE ... RETURNING and COMMIT. Validation order and error
+    messages are those of the sequential path. With SALA_ADVISORY_LOCKS, the lock
+    of the final room is the first statement of the first flush.
+    """
+    update_data = reserva_update.model_dump(exclude_unset=True)
+    reservas = models.Reserva.__table__
+    alvo = select(*(
+        literal(update_data[name], reservas.c[name].type).label(name) if name in update_data else reservas.c[name]
+        for name in ("sala_id", "data_inicio", "data_fim")
+    )).where(reservas.c.id == reserva_id, reservas.c.deleted_at.is_(None)).subquery("alvo")
+    
+    outras = reservas.alias("outras")
+    series = models.SerieReserva.__table__
+    series_da_sala = and_(
+        series.c.deleted_at.is_(None),
+        series.c.sala_id == alvo.c.sala_id,
+        series.c.data_inicio < alvo.c.data_fim,
+        or_(series.c.data_fim_serie.is_(None), series.c.data_fim_serie > alvo.c.data_inicio)
+    )
+    excecoes = models.SerieExcecao.__table__
+    
+    statements = []
+    if SALA_ADVISORY_LOCKS:
+        statements.append(select(func.pg_advisory_xact_lock(alvo.c.sala_id)))
+    statements += [
+        select(reservas).where(reservas.c.id == reserva_id, reservas.c.deleted_at.is_(None)),
+        select(outras.c.id).where(
+            outras.c.sala_id == alvo.c.sala_id,
+            outras.c.id != reserva_id,
+            outras.c.deleted_at.is_(None),
+            outras.c.data_inicio < alvo.c.data_fim,
+            outras.c.data_fim > alvo.c.data_inicio
+        ).limit(1),
+        select(series).where(series_da_sala),
+        select(excecoes).where(excecoes.c.serie_id.in_(select(series.c.id).where(series_da_sala))),
+    ]
+    atual_rows, conflito_rows, serie_rows, excecao_rows = pipeline.execute(db, statements)[-4:]
+    if not atual_rows:
+        db.rollback()
+        return None
+    atual = atual_rows[0]
+    
+    excecoes_por_serie: Dict[int, list] = defaultdict(list)
+    for excecao in excecao_rows:
+        excecoes_por_serie[excecao.serie_id].append(excecao)
+    
+    def tem_conflito(sala_id: int, data_inicio: datetime, data_fim: datetime) -> bool:
+        return bool(conflito_rows) or any(
+            _expand_serie(serie, excecoes_por_serie[serie.id], data_inicio, data_fim)
+            for serie in serie_rows
+        )
+    
+    try:
+        update_data = _validar_atualizacao_reserva(
+            db, atual, reserva_id, update_data, usuario_email, tem_conflito, sugerir_outras_salas
+        )
+    except ValueError:
+        db.rollback()
+        raise
+    
+    # Like the ORM path, only columns whose value changes are written
+    changes = {field: value for field, value in update_data.items() if getattr(atual, field) != value}
+    if not changes:
+        db.rollback()
+        return atual
+    
+    [updated_rows] = pipeline.execute(db, [
+        update(reservas).where(reservas.c.id == reserva_id).values(**changes).returning(
+            *output_columns(models.Reserva, schemas.ReservaOut)
+        )
+    ], commit=True)
+    updated = updated_rows[0]
+    slot_index.invalidate(atual.sala_id, atual.data_inicio, atual.data_fim)
+    slot_index.invalidate(updated.sala_id, updated.data_inicio, updated.data_fim)
+    return updated
+
+
 def delete_reserva(db: Session, reserva_id: int, usuario_email: str) -> bool:
     """Soft delete of a reservation."""
     db_reserva = get_reserva_by_id(db, reserva_id)
@@ -459,9 +1194,610 @@ def delete_reserva(db: Session, reserva_id: int, usuario_email: str) -> bool:
     
     db_reserva.deleted_at = datetime.now(timezone.utc)
     db.commit()
+    slot_index.invalidate(db_reserva.sala_id, db_reserva.data_inicio, db_reserva.data_fim)
+    return True
+
+
+def get_calendario_local(db: Session, local_id: int, inicio: datetime, fim: datetime) -> List[dict]:
+    """
+    Week/month grid of a location: its active rooms, each with one entry per UTC day
+    of [inicio, fim) holding the reservations (with participant counts) and series
+    occurrences that start on that day. Reservations and counts come from a single
+    grouped query.
+    """
+    salas = db.query(models.Sala.id, models.Sala.nome, models.Sala.capacidade).filter(
+        models.Sala.local_id == local_id,
+        models.Sala.ativo.is_(True),
+        models.Sala.deleted_at.is_(None)
+    ).order_by(models.Sala.nome).all()
+    sala_ids = [sala.id for sala in salas]
+    
+    inicio = inicio.astimezone(timezone.utc)
+    fim = fim.astimezone(timezone.utc)
+    first_day = inicio.date()
+    dias = [
+        first_day + timedelta(days=offset)
+        for offset in range(((fim - timedelta(microseconds=1)).date() - first_day).days + 1)
+    ]
+    grade: Dict[int, Dict[date, List[dict]]] = {
+        sala_id: {dia: [] for dia in dias} for sala_id in sala_ids
+    }
+    
+    def _add(sala_id: int, entrada: dict) -> None:
+        dia = max(entrada["data_inicio"], inicio).astimezone(timezone.utc).date()
+        grade[sala_id][dia].append(entrada)
+    
+    if sala_ids:
+        rows = db.query(
+            models.Reserva.id,
+            models.Reserva.sala_id,
+            models.Reserva.data_inicio,
+            models.Reserva.data_fim,
+            models.Reserva.responsavel,
+            models.Reserva.descricao,
+            models.Reserva.cafe,
+            models.Reserva.quantidade_cafe,
+            func.count(models.Participante.id).label("participantes")
+        ).outerjoin(
+            models.Participante, models.Participante.reserva_id == models.Reserva.id
+        ).filter(
+            models.Reserva.sala_id.in_(sala_ids),
+            models.Reserva.deleted_at.is_(None),
+            models.Reserva.data_inicio < fim,
+            models.Reserva.data_fim > inicio
+        ).group_by(models.Reserva.id).all()
+        
+        for row in rows:
+            _add(row.sala_id, {
+                "id": row.id,
+                "serie_id": None,
+                "data_inicio": row.data_inicio,
+                "data_fim": row.data_fim,
+                "responsavel": row.responsavel,
+                "descricao": row.descricao,
+                "cafe": row.cafe,
+                "quantidade_cafe": row.quantidade_cafe,
+                "participantes": row.participantes
+            })
+        for ocorrencia in list_serie_ocorrencias(db, inicio, fim, sala_ids=sala_ids):
+            _add(ocorrencia["sala_id"], {
+                "id": None,
+                "serie_id": ocorrencia["serie_id"],
+                "data_inicio": ocorrencia["data_inicio"],
+                "data_fim": ocorrencia["data_fim"],
+                "responsavel": ocorrencia["responsavel"],
+                "participantes": 0
+            })
+    
+    return [
+        {
+            "id": sala.id,
+            "nome": sala.nome,
+            "capacidade": sala.capacidade,
+            "dias": [
+                {"dia": dia, "reservas": sorted(entradas, key=lambda entrada: entrada["data_inicio"])}
+                for dia, entradas in grade[sala.id].items()
+            ]
+        }
+        for sala in salas
+    ]
+
+
+# ========== Recurring Reservation CRUD ==========
+
+MAX_OCORRENCIAS_SERIE = 500
+
+
+def _expand_serie(
+    serie: models.SerieReserva,
+    excecoes: List[models.SerieExcecao],
+    inicio: datetime,
+    fim: datetime
+) -> List[dict]:
+    """Expands the occurrences of a series overlapping [inicio, fim), applying its exceptions."""
+    rule = recurrence.parse_rrule(serie.rrule)
+    duracao = serie.data_fim - serie.data_inicio
+    excecoes_por_data = {excecao.data_original: excecao for excecao in excecoes}
+    
+    def ocorrencia(data_original: datetime, data_inicio: datetime, data_fim: datetime, modificada: bool) -> dict:
+        return {
+            "serie_id": serie.id,
+            "local_id": serie.local_id,
+            "sala_id": serie.sala_id,
+            "data_original": data_original,
+            "data_inicio": data_inicio,
+            "data_fim": data_fim,
+            "responsavel": serie.responsavel,
+            "modificada": modificada
+        }
+    
+    ocorrencias = [
+        ocorrencia(data_original, data_original, data_original + duracao, False)
+        for data_original in recurrence.expand(rule, serie.data_inicio, duracao, inicio, fim)
+        if data_original not in excecoes_por_data
+    ]
+    # Rescheduled occurrences may have moved into (or out of) the window
+    for excecao in excecoes:
+        if excecao.cancelada:
+            continue
+        if excecao.data_inicio < fim and excecao.data_fim > inicio:
+            ocorrencias.append(ocorrencia(excecao.data_original, excecao.data_inicio, excecao.data_fim, True))
+    
+    ocorrencias.sort(key=lambda item: item["data_inicio"])
+    return ocorrencias
+
+
+def list_serie_ocorrencias(
+    db: Session,
+    inicio: datetime,
+    fim: datetime,
+    sala_id: Optional[int] = None,
+    local_id: Optional[int] = None,
+    serie_id: Optional[int] = None,
+    sala_ids: Optional[List[int]] = None
+) -> List[dict]:
+    """
+    Lists occurrences of active series overlapping [inicio, fim).
+    Occurrences are expanded lazily from the RRULE; only the series and their
+    exceptions are read from the database (two queries).
+    """
+    query = db.query(models.SerieReserva).filter(
+        models.SerieReserva.deleted_at.is_(None),
+        models.SerieReserva.data_inicio < fim,
+        or_(
+            models.SerieReserva.data_fim_serie.is_(None),
+            models.SerieReserva.data_fim_serie > inicio
+        )
+    )
+    if sala_id is not None:
+        query = query.filter(models.SerieReserva.sala_id == sala_id)
+    if sala_ids is not None:
+        query = query.filter(models.SerieReserva.sala_id.in_(sala_ids))
+    if local_id is not None:
+        query = query.filter(models.SerieReserva.local_id == local_id)
+    if serie_id is not None:
+        query = query.filter(models.SerieReserva.id == serie_id)
+    
+    series = query.all()
+    if not series:
+        return []
+    
+    excecoes_por_serie: Dict[int, List[models.SerieExcecao]] = defaultdict(list)
+    for excecao in db.query(models.SerieExcecao).filter(
+        models.SerieExcecao.serie_id.in_([serie.id for serie in series])
+    ):
+        excecoes_por_serie[excecao.serie_id].append(excecao)
+    
+    ocorrencias = []
+    for serie in series:
+        ocorrencias.extend(_expand_serie(serie, excecoes_por_serie[serie.id], inicio, fim))
+    ocorrencias.sort(key=lambda item: item["data_inicio"])
+    return ocorrencias
+
+
+def list_ocupacao(
+    db: Session,
+    sala_ids: List[int],
+    inicio: datetime,
+    fim: datetime
+) -> List[Tuple[int, datetime, datetime]]:
+    """
+    Lists (sala_id, data_inicio, data_fim) of every active reservation and series
+    occurrence of the given rooms overlapping [inicio, fim).
+    """
+    rows = db.query(models.Reserva.sala_id, models.Reserva.data_inicio, models.Reserva.data_fim).filter(
+        models.Reserva.sala_id.in_(sala_ids),
+        models.Reserva.deleted_at.is_(None),
+        models.Reserva.data_inicio < fim,
+        models.Reserva.data_fim > inicio
+    ).all()
+    ocupacao = [(row.sala_id, row.data_inicio, row.data_fim) for row in rows]
+    ocupacao += [
+        (ocorrencia["sala_id"], ocorrencia["data_inicio"], ocorrencia["data_fim"])
+        for ocorrencia in list_serie_ocorrencias(db, inicio, fim, sala_ids=sala_ids)
+    ]
+    return ocupacao
+
+
+def _merge_intervals(intervals: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """Merges overlapping or adjacent intervals into a sorted list of disjoint ones."""
+    merged: List[Tuple[datetime, datetime]] = []
+    for inicio, fim in sorted(intervals):
+        if merged and inicio <= merged[-1][1]:
+            if fim > merged[-1][1]:
+                merged[-1] = (merged[-1][0], fim)
+        else:
+            merged.append((inicio, fim))
+    return merged
+
+
+def _find_serie_conflicts(
+    db: Session,
+    sala_id: int,
+    ocorrencias: List[datetime],
+    duracao: timedelta
+) -> List[datetime]:
+    """
+    Tests all occurrences of a new series against the room's reservations and
+    series with one range query per source and a sweep over merged busy intervals.
+    Returns the conflicting occurrence starts.
+    """
+    window_inicio = ocorrencias[0]
+    window_fim = ocorrencias[-1] + duracao
+    
+    busy = [
+        (row.data_inicio, row.data_fim)
+        for row in db.query(models.Reserva.data_inicio, models.Reserva.data_fim).filter(
+            models.Reserva.sala_id == sala_id,
+            models.Reserva.deleted_at.is_(None),
+            models.Reserva.data_inicio < window_fim,
+            models.Reserva.data_fim > window_inicio
+        )
+    ]
+    busy += [
+        (ocorrencia["data_inicio"], ocorrencia["data_fim"])
+        for ocorrencia in list_serie_ocorrencias(db, window_inicio, window_fim, sala_id=sala_id)
+    ]
+    busy = _merge_intervals(busy)
+    
+    # Both lists are sorted and busy intervals are disjoint: one forward pass
+    conflicts = []
+    position = 0
+    for inicio in ocorrencias:
+        fim = inicio + duracao
+        while position < len(busy) and busy[position][1] <= inicio:
+            position += 1
+        if position < len(busy) and busy[position][0] < fim:
+            conflicts.append(inicio)
+    return conflicts
+
+
+def create_serie_reserva(db: Session, serie: schemas.SerieReservaCreate, criado_por_email: str) -> models.SerieReserva:
+    """Creates a recurring reservation after validating every occurrence."""
+    local = catalog_cache.get_local(db, serie.local_id)
+    if not local:
+        raise ValueError("Local não encontrado ou inativo")
+    
+    sala = catalog_cache.get_sala(db, serie.sala_id)
+    if not sala:
+        raise ValueError("Sala não encontrada ou inativa")
+    
+    if sala.local_id != serie.local_id:
+        raise ValueError("A sala não pertence ao local informado")
+    
+    rule = recurrence.parse_rrule(serie.rrule)
+    if not rule.is_bounded:
+        raise ValueError("RRULE inválida: informe COUNT ou UNTIL para limitar a série")
+    
+    now = datetime.now(timezone.utc)
+    if serie.data_inicio < now:
+        raise ValueError("Não é permitido criar reservas no passado")
+    
+    duracao = serie.data_fim - serie.data_inicio
+    ocorrencias = recurrence.expand(rule, serie.data_inicio, duracao, limit=MAX_OCORRENCIAS_SERIE + 1)
+    if len(ocorrencias) > MAX_OCORRENCIAS_SERIE:
+        raise ValueError(f"A série excede o limite de {MAX_OCORRENCIAS_SERIE} ocorrências")
+    
+    lock_salas(db, [serie.sala_id])
+    conflitos = _find_serie_conflicts(db, serie.sala_id, ocorrencias, duracao)
+    if conflitos:
+        raise ValueError(
+            f"Conflito de horário: {len(conflitos)} ocorrência(s) da série conflitam com reservas existentes "
+            f"(primeira em {conflitos[0].isoformat()})"
+        )
+    
+    db_serie = models.SerieReserva(
+        local_id=serie.local_id,
+        sala_id=serie.sala_id,
+        local=local.nome,
+        sala=sala.nome,
+        rrule=serie.rrule,
+        data_inicio=serie.data_inicio,
+        data_fim=serie.data_fim,
+        data_fim_serie=ocorrencias[-1] + duracao,
+        responsavel=serie.responsavel,
+        cafe=serie.cafe,
+        quantidade_cafe=serie.quantidade_cafe if serie.cafe else None,
+        descricao=serie.descricao,
+        criado_por_email=criado_por_email
+    )
+    db.add(db_serie)
+    db.commit()
+    db.refresh(db_serie)
+    slot_index.invalidate(db_serie.sala_id)
+    return db_serie
+
+
+def get_serie_by_id(db: Session, serie_id: int) -> Optional[models.SerieReserva]:
+    """Gets a recurring reservation by ID (only not deleted)."""
+    return db.query(models.SerieReserva).filter(
+        models.SerieReserva.id == serie_id,
+        models.SerieReserva.deleted_at.is_(None)
+    ).first()
+
+
+def create_serie_excecao(
+    db: Session,
+    serie_id: int,
+    excecao: schemas.SerieExcecaoCreate,
+    usuario_email: str
+) -> Optional[models.SerieExcecao]:
+    """Cancels or reschedules one occurrence of a series (replaces an existing exception)."""
+    db_serie = get_serie_by_id(db, serie_id)
+    if not db_serie:
+        return None
+    
+    if db_serie.criado_por_email and db_serie.criado_por_email != usuario_email:
+        raise ValueError("Você não tem permissão para editar esta série. Apenas o criador pode editá-la.")
+    
+    # The occurrence must be generated by the RRULE
+    rule = recurrence.parse_rrule(db_serie.rrule)
+    duracao = db_serie.data_fim - db_serie.data_inicio
+    candidatas = recurrence.expand(
+        rule, db_serie.data_inicio, duracao,
+        excecao.data_original, excecao.data_original + duracao
+    )
+    if excecao.data_original not in candidatas:
+        raise ValueError("Ocorrência não encontrada na série")
+    
+    if not excecao.cancelada:
+        now = datetime.now(timezone.utc)
+        if excecao.data_inicio < now:
+            raise ValueError("Não é permitido atualizar reservas para o passado")
+        if excecao.data_inicio < db_serie.data_inicio:
+            raise ValueError("A nova data não pode ser anterior ao início da série")
+        if check_time_conflict(
+            db=db,
+            sala_id=db_serie.sala_id,
+            data_inicio=excecao.data_inicio,
+            data_fim=excecao.data_fim,
+            exclude_ocorrencia=(db_serie.id, excecao.data_original)
+        ):
+            raise ValueError("Conflito de horário: já existe uma reserva para esta sala neste intervalo")
+        if db_serie.data_fim_serie is not None and excecao.data_fim > db_serie.data_fim_serie:
+            db_serie.data_fim_serie = excecao.data_fim
+    
+    db_excecao = db.query(models.SerieExcecao).filter(
+        models.SerieExcecao.serie_id == serie_id,
+        models.SerieExcecao.data_original == excecao.data_original
+    ).first()
+    if db_excecao is None:
+        db_excecao = models.SerieExcecao(serie_id=serie_id, data_original=excecao.data_original)
+        db.add(db_excecao)
+    
+    db_excecao.cancelada = excecao.cancelada
+    db_excecao.data_inicio = excecao.data_inicio
+    db_excecao.data_fim = excecao.data_fim
+    db.commit()
+    db.refresh(db_excecao)
+    slot_index.invalidate(db_serie.sala_id)
+    return db_excecao
+
+
+def delete_serie_reserva(db: Session, serie_id: int, usuario_email: str) -> bool:
+    """Soft delete of a recurring reservation (all its occurrences)."""
+    db_serie = get_serie_by_id(db, serie_id)
+    if not db_serie:
+        return False
+    
+    if db_serie.criado_por_email and db_serie.criado_por_email != usuario_email:
+        raise ValueError("Você não tem permissão para excluir esta série. Apenas o criador pode excluí-la.")
+    
+    db_serie.deleted_at = datetime.now(timezone.utc)
+    db.commit()
+    slot_index.invalidate(db_serie.sala_id)
     return True
 
 
+# ========== Report CRUD ==========
+
+DIAS_SEMANA = ["segunda", "terça", "quarta", "quinta", "sexta", "sábado", "domingo"]
+
+
+def _periodo_relatorio(data_inicio: date, data_fim: date) -> Tuple[datetime, datetime]:
+    """UTC [inicio, fim) covering the report days (the rollups are keyed by UTC day)."""
+    inicio = datetime(data_inicio.year, data_inicio.month, data_inicio.day, tzinfo=timezone.utc)
+    return inicio, inicio + timedelta(days=(data_fim - data_inicio).days + 1)
+
+
+def _segundos_por_hora(data_inicio: datetime, data_fim: datetime, inicio: datetime, fim: datetime):
+    """
+    Yields (UTC day, hour, seconds) of [data_inicio, data_fim) clipped to [inicio, fim),
+    split like the ocupacao_horaria rollup.
+    """
+    data_inicio = max(data_inicio.astimezone(timezone.utc), inicio)
+    data_fim = min(data_fim.astimezone(timezone.utc), fim)
+    hora = data_inicio.replace(minute=0, second=0, microsecond=0)
+    while hora < data_fim:
+        proxima = hora + timedelta(hours=1)
+        yield hora.date(), hora.hour, (min(proxima, data_fim) - max(hora, data_inicio)).total_seconds()
+        hora = proxima
+
+
+def get_relatorio_ocupacao(
+    db: Session,
+    data_inicio: date,
+    data_fim: date,
+    agrupar_por: str = "sala",
+    local_id: Optional[int] = None,
+    sala_id: Optional[int] = None,
+    hora_inicio: int = 0,
+    hora_fim: int = 24
+) -> List[dict]:
+    """
+    Occupancy of the active rooms between data_inicio and data_fim (inclusive),
+    considering only hours in [hora_inicio, hora_fim). Reserved time comes from
+    one aggregate query over the ocupacao_horaria rollup plus the occurrences of
+    recurring series (expanded on demand, they are not in the rollup); available
+    time is the number of rooms x days x hours of each group.
+    """
+    salas_query = db.query(models.Sala.id, models.Sala.nome, models.Sala.local_id).filter(
+        models.Sala.ativo.is_(True),
+        models.Sala.deleted_at.is_(None)
+    )
+    if local_id:
+        salas_query = salas_query.filter(models.Sala.local_id == local_id)
+    if sala_id:
+        salas_query = salas_query.filter(models.Sala.id == sala_id)
+    salas = salas_query.order_by(models.Sala.id).all()
+    if not salas:
+        return []
+    
+    dias = [data_inicio + timedelta(days=offset) for offset in range((data_fim - data_inicio).days + 1)]
+    horas = hora_fim - hora_inicio
+    
+    if agrupar_por == "hora":
+        chave = models.OcupacaoHoraria.hora
+    elif agrupar_por == "dia_semana":
+        # ISO weekday (1 = Monday) shifted to Python's weekday numbering
+        chave = func.extract("isodow", models.OcupacaoHoraria.dia) - 1
+    elif agrupar_por == "local":
+        chave = models.Sala.local_id
+    else:
+        chave = models.OcupacaoHoraria.sala_id
+    
+    rows = db.query(
+        chave.label("chave"),
+        func.sum(models.OcupacaoHoraria.segundos_reservados).label("segundos")
+    ).join(
+        models.Sala, models.Sala.id == models.OcupacaoHoraria.sala_id
+    ).filter(
+        models.OcupacaoHoraria.sala_id.in_([sala.id for sala in salas]),
+        models.OcupacaoHoraria.dia >= data_inicio,
+        models.OcupacaoHoraria.dia <= data_fim,
+        models.OcupacaoHoraria.hora >= hora_inicio,
+        models.OcupacaoHoraria.hora < hora_fim
+    ).group_by(chave).all()
+    reservado = defaultdict(int, {int(row.chave): int(row.segundos or 0) for row in rows})
+    
+    periodo_inicio, periodo_fim = _periodo_relatorio(data_inicio, data_fim)
+    local_por_sala = {sala.id: sala.local_id for sala in salas}
+    for ocorrencia in list_serie_ocorrencias(db, periodo_inicio, periodo_fim, sala_ids=list(local_por_sala)):
+        for dia, hora, segundos in _segundos_por_hora(
+            ocorrencia["data_inicio"], ocorrencia["data_fim"], periodo_inicio, periodo_fim
+        ):
+            if not hora_inicio <= hora < hora_fim:
+                continue
+            if agrupar_por == "hora":
+                grupo = hora
+            elif agrupar_por == "dia_semana":
+                grupo = dia.weekday()
+            elif agrupar_por == "local":
+                grupo = local_por_sala[ocorrencia["sala_id"]]
+            else:
+                grupo = ocorrencia["sala_id"]
+            reservado[grupo] += int(segundos)
+    
+    # (chave, rotulo, available seconds) of every group, including empty ones
+    grupos = []
+    if agrupar_por == "hora":
+        for hora in range(hora_inicio, hora_fim):
+            grupos.append((hora, f"{hora:02d}h", len(salas) * len(dias) * 3600))
+    elif agrupar_por == "dia_semana":
+        dias_por_semana = defaultdict(int)
+        for dia in dias:
+            dias_por_semana[dia.weekday()] += 1
+        for weekday in sorted(dias_por_semana):
+            grupos.append((weekday, DIAS_SEMANA[weekday], len(salas) * dias_por_semana[weekday] * horas * 3600))
+    elif agrupar_por == "local":
+        salas_por_local = defaultdict(int)
+        for sala in salas:
+            salas_por_local[sala.local_id] += 1
+        nomes = dict(db.query(models.Local.id, models.Local.nome).filter(models.Local.id.in_(list(salas_por_local))).all())
+        for grupo_local_id in sorted(salas_por_local):
+            grupos.append((
+                grupo_local_id,
+                nomes.get(grupo_local_id, ""),
+                salas_por_local[grupo_local_id] * len(dias) * horas * 3600
+            ))
+    else:
+        for sala in salas:
+            grupos.append((sala.id, sala.nome, len(dias) * horas * 3600))
+    
+    itens = []
+    for grupo_chave, rotulo, disponivel in grupos:
+        segundos = reservado.get(grupo_chave, 0)
+        itens.append({
+            "chave": grupo_chave,
+            "rotulo": rotulo,
+            "horas_reservadas": round(segundos / 3600, 2),
+            "horas_disponiveis": round(disponivel / 3600, 2),
+            "ocupacao_percentual": round(100 * segundos / disponivel, 2) if disponivel else 0.0
+        })
+    return itens
+
+
+def get_relatorio_cafe(
+    db: Session,
+    data_inicio: date,
+    data_fim: date,
+    local_id: Optional[int] = None
+) -> List[dict]:
+    """
+    Coffee totals per day and location between data_inicio and data_fim (inclusive),
+    from the cafe_diario rollup plus the occurrences of recurring series with coffee
+    (counted on the UTC day they start, like the rollup).
+    """
+    query = db.query(
+        models.CafeDiario.dia,
+        models.CafeDiario.local_id,
+        models.Local.nome,
+        models.CafeDiario.reservas,
+        models.CafeDiario.quantidade_cafe
+    ).join(
+        models.Local, models.Local.id == models.CafeDiario.local_id
+    ).filter(
+        models.CafeDiario.dia >= data_inicio,
+        models.CafeDiario.dia <= data_fim,
+        models.CafeDiario.reservas > 0
+    )
+    if local_id:
+        query = query.filter(models.CafeDiario.local_id == local_id)
+    
+    totais = {
+        (row.dia, row.local_id): {
+            "dia": row.dia,
+            "local_id": row.local_id,
+            "local": row.nome,
+            "reservas": row.reservas,
+            "quantidade_cafe": row.quantidade_cafe
+        }
+        for row in query
+    }
+    
+    series_query = db.query(models.SerieReserva.id, models.SerieReserva.quantidade_cafe).filter(
+        models.SerieReserva.cafe.is_(True),
+        models.SerieReserva.deleted_at.is_(None)
+    )
+    if local_id:
+        series_query = series_query.filter(models.SerieReserva.local_id == local_id)
+    cafe_por_serie = dict(series_query.all())
+    if cafe_por_serie:
+        periodo_inicio, periodo_fim = _periodo_relatorio(data_inicio, data_fim)
+        nomes = {}
+        for ocorrencia in list_serie_ocorrencias(db, periodo_inicio, periodo_fim, local_id=local_id):
+            if ocorrencia["serie_id"] not in cafe_por_serie:
+                continue
+            inicio = ocorrencia["data_inicio"].astimezone(timezone.utc)
+            if not periodo_inicio <= inicio < periodo_fim:
+                continue
+            chave = (inicio.date(), ocorrencia["local_id"])
+            if chave not in totais:
+                if not nomes:
+                    nomes = dict(db.query(models.Local.id, models.Local.nome).all())
+                totais[chave] = {
+                    "dia": chave[0],
+                    "local_id": chave[1],
+                    "local": nomes.get(chave[1], ""),
+                    "reservas": 0,
+                    "quantidade_cafe": 0
+                }
+            totais[chave]["reservas"] += 1
+            totais[chave]["quantidade_cafe"] += cafe_por_serie[ocorrencia["serie_id"]] or 0
+    
+    return [totais[chave] for chave in sorted(totais)]
+
+
 # ========== User CRUD ==========
 
 def get_or_create_usuario(
@@ -517,19 +1853,20 @@ def list_usuarios(
     db: Session,
     skip: int = 0,
     limit: int = 100,
-    search: Optional[str] = None
-) -> List[models.Usuario]:
-    """Lists users with optional filters."""
-    query = db.query(models.Usuario)
+    search: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = None
+) -> List[Row]:
+    """Lists users with optional filters (rows with the UsuarioOut columns, only `fields` when given)."""
+    query = select(*output_columns(models.Usuario, schemas.UsuarioOut, fields))
     
     if search:
         search_pattern = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             (models.Usuario.nome.ilike(search_pattern)) |
             (models.Usuario.email.ilike(search_pattern))
         )
     
-    return query.order_by(models.Usuario.nome).offset(skip).limit(limit).all()
+    return db.execute(query.order_by(models.Usuario.nome).offset(skip).limit(limit)).all()
 
 
 def count_usuarios(db: Session, search: Optional[str] = None) -> int:
@@ -546,6 +1883,74 @@ def count_usuarios(db: Session, search: Optional[str] = None) -> int:
     return query.count()
 
 
+def get_freebusy(
+    db: Session,
+    usuario_ids: List[int],
+    inicio: datetime,
+    fim: datetime
+) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    """
+    Merged busy intervals of each user within [inicio, fim): reservations they
+    participate in or created, and occurrences of the series they created. One
+    query returns the reservation rows sorted by (usuario_id, data_inicio); the
+    expanded occurrences are merged into that stream, so intervals are merged in
+    a single pass.
+    """
+    def _overlapping(query):
+        return query.where(
+            models.Reserva.deleted_at.is_(None),
+            models.Reserva.data_inicio < fim,
+            models.Reserva.data_fim > inicio
+        )
+    
+    participacoes = _overlapping(select(
+        models.Participante.usuario_id.label("usuario_id"),
+        models.Reserva.data_inicio.label("data_inicio"),
+        models.Reserva.data_fim.label("data_fim")
+    ).join(
+        models.Reserva, models.Reserva.id == models.Participante.reserva_id
+    ).where(models.Participante.usuario_id.in_(usuario_ids)))
+    criadas = _overlapping(select(
+        models.Usuario.id.label("usuario_id"),
+        models.Reserva.data_inicio.label("data_inicio"),
+        models.Reserva.data_fim.label("data_fim")
+    ).join(
+        models.Reserva, models.Reserva.criado_por_email == models.Usuario.email
+    ).where(models.Usuario.id.in_(usuario_ids)))
+    ocupacao = union_all(participacoes, criadas).subquery()
+    rows = db.execute(
+        select(ocupacao).order_by(ocupacao.c.usuario_id, ocupacao.c.data_inicio)
+    )
+    
+    series = db.query(models.SerieReserva, models.Usuario.id).join(
+        models.Usuario, models.Usuario.email == models.SerieReserva.criado_por_email
+    ).options(selectinload(models.SerieReserva.excecoes)).filter(
+        models.Usuario.id.in_(usuario_ids),
+        models.SerieReserva.deleted_at.is_(None),
+        models.SerieReserva.data_inicio < fim,
+        or_(
+            models.SerieReserva.data_fim_serie.is_(None),
+            models.SerieReserva.data_fim_serie > inicio
+        )
+    ).all()
+    ocorrencias = sorted(
+        (usuario_id, ocorrencia["data_inicio"], ocorrencia["data_fim"])
+        for serie, usuario_id in series
+        for ocorrencia in _expand_serie(serie, serie.excecoes, inicio, fim)
+    )
+    
+    busy: Dict[int, List[Tuple[datetime, datetime]]] = {usuario_id: [] for usuario_id in usuario_ids}
+    for usuario_id, data_inicio, data_fim in heapq.merge(rows, ocorrencias, key=lambda row: (row[0], row[1])):
+        data_inicio, data_fim = max(data_inicio, inicio), min(data_fim, fim)
+        intervals = busy[usuario_id]
+        if intervals and data_inicio <= intervals[-1][1]:
+            if data_fim > intervals[-1][1]:
+                intervals[-1] = (intervals[-1][0], data_fim)
+        else:
+            intervals.append((data_inicio, data_fim))
+    return busy
+
+
 # ========== Participant CRUD ==========
 
 def create_participante(db: Session, participante: schemas.ParticipanteCreate) -> models.Participante:
@@ -585,6 +1990,62 @@ def create_participante(db: Session, participante: schemas.ParticipanteCreate) -
     return db_participante
 
 
+def set_participantes(
+    db: Session,
+    reserva_id: int,
+    usuario_ids: List[int],
+    nomes_manuais: List[str],
+    replace: bool = False
+) -> Tuple[int, int]:
+    """
+    Adds many participants to a reservation (or, with replace=True, makes them its
+    exact participant set). Users are validated with a single IN query and rows are
+    written with one multi-row INSERT ... ON CONFLICT DO NOTHING, so participants
+    that already exist are skipped. Returns (added, removed).
+    """
+    usuario_ids = list(dict.fromkeys(usuario_ids))
+    nomes_manuais = list(dict.fromkeys(nomes_manuais))
+    
+    if usuario_ids:
+        existentes = {
+            row.id for row in db.query(models.Usuario.id).filter(models.Usuario.id.in_(usuario_ids))
+        }
+        faltantes = [usuario_id for usuario_id in usuario_ids if usuario_id not in existentes]
+        if faltantes:
+            raise ValueError(f"Usuários não encontrados: {', '.join(str(usuario_id) for usuario_id in faltantes)}")
+    
+    removidos = 0
+    if replace:
+        removidos = db.query(models.Participante).filter(
+            models.Participante.reserva_id == reserva_id,
+            or_(
+                and_(
+                    models.Participante.usuario_id.isnot(None),
+                    models.Participante.usuario_id.notin_(usuario_ids)
+                ),
+                and_(
+                    models.Participante.nome_manual.isnot(None),
+                    models.Participante.nome_manual.notin_(nomes_manuais)
+                )
+            )
+        ).delete(synchronize_session=False)
+    
+    rows = [{"reserva_id": reserva_id, "usuario_id": usuario_id} for usuario_id in usuario_ids]
+    rows += [{"reserva_id": reserva_id, "nome_manual": nome} for nome in nomes_manuais]
+    adicionados = 0
+    if rows:
+        # ORM-enabled INSERTs report no rowcount: count the RETURNING rows instead
+        result = db.execute(
+            pg_insert(models.Participante).values([
+                {"usuario_id": None, "nome_manual": None, **row} for row in rows
+            ]).on_conflict_do_nothing().returning(models.Participante.id)
+        )
+        adicionados = len(result.all())
+    
+    db.commit()
+    return adicionados, removidos
+
+
 def get_participante_by_id(db: Session, participante_id: int) -> Optional[models.Participante]:
     """Gets a participant by ID."""
     return db.query(models.Participante).filter(models.Participante.id == participante_id).first()
@@ -615,3 +2076,23 @@ def delete_participantes_by_reserva(db: Session, reserva_id: int) -> int:
     ).delete()
     db.commit()
     return count
+
+
+# ========== Statement warm-up ==========
+
+def run_hot_queries(db: Session) -> None:
+    """
+    Runs the hot read queries once with their default filters (results are
+    discarded). Used at startup so every pooled connection has them prepared.
+    """
+    now = datetime.now(timezone.utc)
+    check_time_conflict(db, sala_id=0, data_inicio=now, data_fim=now + timedelta(hours=1))
+    check_time_conflict(db, sala_id=0, data_inicio=now, data_fim=now + timedelta(hours=1), exclude_reserva_id=0)
+    get_local_by_id(db, 0)
+    get_sala_by_id(db, 0)
+    get_reserva_by_id(db, 0)
+    get_reserva_row(db, 0)
+    list_reservas(db)
+    list_salas(db)
+    list_locais(db)
+    list_usuarios(db)
@@ -1,13 +1,17 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 import os
 import logging
 import re
 from dotenv import load_dotenv
 
-from .services.database import get_db
+from fastapi.concurrency import run_in_threadpool
+from .services.database import SessionLocal
+from .services import database, rate_limit, coalescing, events, availability, catalog, cancellation
+from . import crud
 from .routes import router
 from .schemas import ErrorDetail
 
@@ -23,14 +27,113 @@ load_dotenv()
 # Note: Database tables are created/updated via Alembic migrations
 # Run 'alembic upgrade head' to apply migrations
 
+
+def warm_up_database():
+    """Opens the pool connections and prepares the hot statements on each of them."""
+    database.warm_up(crud.run_hot_queries)
+
+
+def warm_up_availability():
+    """Builds the occupancy bitmaps for the coming days."""
+    db = SessionLocal()
+    try:
+        availability.warm_up(db)
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown."""
+    # Changes made by every worker invalidate the occupancy bitmaps and the catalog cache
+    events.broker.add_listener(availability.slot_index.on_event)
+    events.broker.add_listener(catalog.catalog_cache.on_event, channel=events.CATALOG_CHANNEL)
+    try:
+        await events.broker.start()
+    except Exception as e:
+        logger.warning(f"Reservation change listener not started: {str(e)}")
+    try:
+        await run_in_threadpool(warm_up_database)
+    except Exception as e:
+        logger.warning(f"Database pool not warmed at startup: {str(e)}")
+    try:
+        await run_in_threadpool(warm_up_availability)
+    except Exception as e:
+        logger.warning(f"Availability index not warmed at startup: {str(e)}")
+    
+    yield
+    # Close the shared LISTEN connection used by the SSE streams
+    await events.broker.close()
+
+
 app = FastAPI(
     title="Room Reservation System",
     description="RESTful API for room reservation management with conflict validation and soft delete",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+# Load shedding: reject with 503 instead of queueing when the DB pool is saturated
+@app.middleware("http")
+async def load_shedding_handler(request: Request, call_next):
+    """Rejects requests once in-flight requests exceed the configured pool fraction"""
+    if not rate_limit.LOAD_SHED_ENABLED or rate_limit.is_exempt(request):
+        return await call_next(request)
+    
+    if not rate_limit.concurrency_limiter.try_acquire():
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=ErrorDetail(
+                message="Servidor sobrecarregado. Tente novamente em instantes.",
+                code="SERVICE_OVERLOADED"
+            ).model_dump(),
+            headers={"Retry-After": rate_limit.retry_after_header(rate_limit.LOAD_SHED_RETRY_AFTER)}
+        )
+    
+    try:
+        return await call_next(request)
+    finally:
+        rate_limit.concurrency_limiter.release()
+
+
+# Single-flight coalescing of identical concurrent GET requests
+@app.middleware("http")
+async def coalescing_handler(request: Request, call_next):
+    """Shares one in-flight computation between identical idempotent requests"""
+    key = coalescing.get_coalescing_key(request) if coalescing.COALESCING_ENABLED else None
+    if key is None:
+        return await call_next(request)
+    # The result is shared with other requests: the leader's client going away must not cancel it
+    cancellation.disable(request)
+    return await coalescing.single_flight.run(key, request, call_next)
+
+
+# Token-bucket rate limiting per user (JWT email) or per client IP
+@app.middleware("http")
+async def rate_limit_handler(request: Request, call_next):
+    """Applies per-key token buckets with per-route cost weights"""
+    if not rate_limit.RATE_LIMIT_ENABLED or rate_limit.is_exempt(request):
+        return await call_next(request)
+    
+    wait_seconds = rate_limit.rate_limiter.consume(
+        rate_limit.get_rate_limit_key(request),
+        rate_limit.get_request_cost(request)
+    )
+    if wait_seconds > 0:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content=ErrorDetail(
+                message="Limite de requisições excedido. Tente novamente mais tarde.",
+                code="RATE_LIMIT_EXCEEDED"
+            ).model_dump(),
+            headers={"Retry-After": rate_limit.retry_after_header(wait_seconds)}
+        )
+    
+    return await call_next(request)
+
+
 # Configure CORS with wildcard support
 def is_origin_allowed(origin: str, allowed_origins: list) -> bool:
     """
@@ -92,6 +195,9 @@ async def cors_handler(request: Request, call_next):
     
     return response
 
+# Cancels the running queries of requests whose client disconnected (pure ASGI, outermost)
+app.add_middleware(cancellation.CancelOnDisconnectMiddleware)
+
 # Include routes
 app.include_router(router, prefix="/api")
 
@@ -155,6 +261,35 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
     )
 
 
+# Statements cancelled by statement_timeout or on client disconnect (SQLSTATE 57014)
+@app.exception_handler(OperationalError)
+async def operational_error_handler(request: Request, exc: OperationalError):
+    """Maps cancelled statements to 503/504; other operational errors go to the SQLAlchemy handler."""
+    if not database.is_query_canceled(exc):
+        return await sqlalchemy_exception_handler(request, exc)
+    
+    canceller = cancellation.get_canceller(request)
+    if canceller is not None and canceller.cancelled:
+        # The client is gone, nobody reads this response
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=ErrorDetail(
+                message="Consulta cancelada: o cliente encerrou a conexão.",
+                code="QUERY_CANCELLED"
+            ).model_dump()
+        )
+    
+    logger.warning(f"Statement timeout on {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content=ErrorDetail(
+            message="A consulta excedeu o tempo limite. Refine os filtros e tente novamente.",
+            code="QUERY_TIMEOUT",
+            details={"statement_timeout_ms": database.get_statement_timeout(request.url.path)}
+        ).model_dump()
+    )
+
+
 # Global exception handler for generic exceptions
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
@@ -179,6 +314,20 @@ def root():
     }
 
 
+@app.get("/metrics")
+def metrics():
+    """In-process counters (rate limiting, load shedding, coalescing, event streams, availability index, catalog cache, cancellations)."""
+    return {
+        "rate_limit": rate_limit.rate_limiter.stats(),
+        "load_shedding": rate_limit.concurrency_limiter.stats(),
+        "coalescing": coalescing.single_flight.stats(),
+        "events": events.broker.stats(),
+        "availability": availability.slot_index.stats(),
+        "catalog": catalog.catalog_cache.stats(),
+        "cancellation": cancellation.cancellation_stats.stats()
+    }
+
+
 @app.get("/health")
 def health_check():
     """
@@ -188,9 +337,11 @@ def health_check():
     try:
         # Test database connection
         from sqlalchemy import text
-        db = next(get_db())
-        db.execute(text("SELECT 1"))
-        db.close()
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1"))
+        finally:
+            db.close()
         
         return {
             "status": "healthy",
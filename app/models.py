@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Text, Date, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from .services.database import Base
 
 
@@ -73,6 +73,10 @@ class Reserva(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # Monotonic change counter (sequence), bumped by a trigger on every update
+    change_seq = Column(BigInteger, server_default=text("nextval('reservas_change_seq')"), nullable=False)
+    # Maintained by triggers on participantes (INSERT/DELETE)
+    participantes_count = Column(Integer, server_default=text("0"), nullable=False)
 
     local_obj = relationship("Local", foreign_keys=[local_id])
     sala_obj = relationship("Sala", foreign_keys=[sala_id], back_populates="reservas")
@@ -80,6 +84,15 @@ class Reserva(Base):
 
     __table_args__ = (
         Index('idx_reserva_sala_datas', 'sala', 'data_inicio', 'data_fim'),
+        Index('idx_reserva_change_seq', 'change_seq'),
+        Index(
+            'idx_reserva_sala_id_datas', 'sala_id', 'data_inicio', 'data_fim',
+            postgresql_where=text('deleted_at IS NULL')
+        ),
+        Index(
+            'idx_reserva_criado_por_data', 'criado_por_email', 'data_inicio',
+            postgresql_where=text('deleted_at IS NULL')
+        ),
     )
 
 
@@ -97,5 +110,102 @@ class Participante(Base):
 
     __table_args__ = (
         Index('idx_participante_reserva', 'reserva_id'),
-        Index('idx_participante_usuario', 'usuario_id'),
-    )
\ No newline at end of file
+        Index('idx_participante_usuario_reserva', 'usuario_id', 'reserva_id'),
+        Index(
+            'idx_participante_reserva_usuario_unico', 'reserva_id', 'usuario_id',
+            unique=True, postgresql_where=text('usuario_id IS NOT NULL')
+        ),
+        Index(
+            'idx_participante_reserva_nome_unico', 'reserva_id', 'nome_manual',
+            unique=True, postgresql_where=text('nome_manual IS NOT NULL')
+        ),
+    )
+
+
+class SerieReserva(Base):
+    """Recurring reservation: occurrences are expanded from the RRULE on demand."""
+    __tablename__ = "series_reservas"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    local_id = Column(Integer, ForeignKey("locais.id"), nullable=False)
+    sala_id = Column(Integer, ForeignKey("salas.id"), nullable=False)
+    # Denormalized fields, as in Reserva
+    local = Column(String(100), nullable=False)
+    sala = Column(String(100), nullable=False)
+    rrule = Column(String(500), nullable=False)
+    # First occurrence (DTSTART); its duration applies to every occurrence
+    data_inicio = Column(DateTime(timezone=True), nullable=False)
+    data_fim = Column(DateTime(timezone=True), nullable=False)
+    # End of the last occurrence (used to select series overlapping a window)
+    data_fim_serie = Column(DateTime(timezone=True), nullable=True)
+    responsavel = Column(String(150), nullable=False)
+    cafe = Column(Boolean, default=False, nullable=False)
+    quantidade_cafe = Column(Integer, nullable=True)
+    descricao = Column(Text, nullable=True)
+    criado_por_email = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+    excecoes = relationship("SerieExcecao", back_populates="serie", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index(
+            'idx_serie_sala_datas', 'sala_id', 'data_inicio', 'data_fim_serie',
+            postgresql_where=text('deleted_at IS NULL')
+        ),
+    )
+
+
+class SerieExcecao(Base):
+    """Exception to a single occurrence of a series (cancellation or new times)."""
+    __tablename__ = "series_excecoes"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    serie_id = Column(Integer, ForeignKey("series_reservas.id"), nullable=False)
+    # Start of the occurrence as generated by the RRULE
+    data_original = Column(DateTime(timezone=True), nullable=False)
+    cancelada = Column(Boolean, default=False, nullable=False)
+    data_inicio = Column(DateTime(timezone=True), nullable=True)
+    data_fim = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    serie = relationship("SerieReserva", back_populates="excecoes")
+
+    __table_args__ = (
+        Index('idx_excecao_serie_data', 'serie_id', 'data_original', unique=True),
+    )
+
+
+class OcupacaoHoraria(Base):
+    """
+    Reporting rollup: seconds reserved per room, UTC day and hour of day.
+    Maintained by the relatorios_reservas_change trigger on reservas.
+    """
+    __tablename__ = "ocupacao_horaria"
+
+    sala_id = Column(Integer, ForeignKey("salas.id"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    hora = Column(SmallInteger, primary_key=True)
+    segundos_reservados = Column(BigInteger, default=0, nullable=False)
+
+    __table_args__ = (
+        Index('idx_ocupacao_horaria_dia', 'dia'),
+    )
+
+
+class CafeDiario(Base):
+    """
+    Reporting rollup: reservations with coffee and coffee quantity per location and UTC day.
+    Maintained by the relatorios_reservas_change trigger on reservas.
+    """
+    __tablename__ = "cafe_diario"
+
+    local_id = Column(Integer, ForeignKey("locais.id"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    reservas = Column(Integer, default=0, nullable=False)
+    quantidade_cafe = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index('idx_cafe_diario_dia', 'dia'),
+    )
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Union
+from datetime import date, datetime, timedelta, timezone
+import base64
 import os
 import jwt
 from google.oauth2 import id_token
@@ -9,11 +13,30 @@ from google.auth.transport import requests
 
 from . import crud, schemas, models
 from .services.database import get_db
-from .services.auth import get_current_user_email
+from .services.auth import get_current_user_email, is_admin_email
+from .services import events, availability, reports, serialization
+from .services.catalog import catalog_cache
 
 router = APIRouter()
 
 
+FIELDS_DESCRIPTION = "Comma-separated output fields to return (id is always included); all fields when omitted"
+
+
+def _parse_fields(fields: Optional[str], schema) -> Optional[Tuple[str, ...]]:
+    """Validates a sparse fieldset against schema and returns it in schema order (None = all fields)."""
+    values = {value.strip() for value in (fields or "").split(",") if value.strip()}
+    if not values:
+        return None
+    invalid = sorted(values - set(schema.model_fields))
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields inválido: {', '.join(invalid)}. Valores aceitos: {', '.join(schema.model_fields)}"
+        )
+    return tuple(name for name in schema.model_fields if name in values or name == "id")
+
+
 # ========== Location Endpoints ==========
 
 @router.post("/v1/locais", response_model=schemas.LocalOut, status_code=201)
@@ -21,6 +44,8 @@ def create_local(local: schemas.LocalCreate, db: Session = Depends(get_db)):
     """Creates a new location."""
     try:
         return crud.create_local(db=db, local=local)
+    except OperationalError:
+        raise
     except Exception as e:
         if "unique" in str(e).lower() or "duplicate" in str(e).lower():
             raise HTTPException(status_code=409, detail="Já existe um local com este nome")
@@ -32,21 +57,114 @@ def list_locais(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     ativo: Optional[bool] = Query(None, description="Filter by active/inactive status"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
-    """Lists locations with optional filters."""
-    return crud.list_locais(db=db, skip=skip, limit=limit, ativo=ativo)
+    """Lists locations with optional filters (served from the catalog cache)."""
+    selected = _parse_fields(fields, schemas.LocalOut)
+    schema = serialization.project(schemas.LocalOut, selected) if selected else schemas.LocalOut
+    return serialization.render(
+        List[schema],
+        catalog_cache.list_locais(db, skip=skip, limit=limit, ativo=ativo)
+    )
 
 
 @router.get("/v1/locais/{local_id}", response_model=schemas.LocalOut)
 def get_local(local_id: int, db: Session = Depends(get_db)):
     """Gets a location by ID."""
-    local = crud.get_local_by_id(db, local_id=local_id)
+    local = catalog_cache.get_local(db, local_id)
     if local is None:
         raise HTTPException(status_code=404, detail="Local não encontrado")
     return local
 
 
+@router.get("/v1/locais/{local_id}/stream")
+async def stream_local(local_id: int, db: Session = Depends(get_db)):
+    """
+    Streams reservation changes of all rooms of a location (Server-Sent Events).
+    """
+    local = await run_in_threadpool(catalog_cache.get_local, db, local_id)
+    if local is None:
+        raise HTTPException(status_code=404, detail="Local não encontrado")
+    return await _open_event_stream(db, "local", local_id)
+
+
+@router.get("/v1/locais/{local_id}/disponibilidade", response_model=schemas.DisponibilidadeOut)
+def get_disponibilidade_local(
+    local_id: int,
+    inicio: datetime = Query(..., description="Start of the window (ISO 8601)"),
+    fim: datetime = Query(..., description="End of the window (ISO 8601)"),
+    duracao_minutos: int = Query(availability.SLOT_MINUTES, ge=1, le=1440, description="Minimum free interval length"),
+    capacidade_minima: Optional[int] = Query(None, ge=1, description="Filter by minimum capacity"),
+    db: Session = Depends(get_db)
+):
+    """
+    Lists the free intervals of every room of a location within a window (max. 31 days).
+    Answered from the in-memory occupancy bitmaps, at slot granularity.
+    """
+    if inicio >= fim:
+        raise HTTPException(status_code=400, detail="inicio deve ser anterior a fim")
+    if fim - inicio > timedelta(days=31):
+        raise HTTPException(status_code=400, detail="A janela de consulta não pode exceder 31 dias")
+    
+    local = catalog_cache.get_local(db, local_id)
+    if local is None:
+        raise HTTPException(status_code=404, detail="Local não encontrado")
+    
+    salas = catalog_cache.list_salas(db, limit=1000, local_id=local_id, ativo=True, capacidade_minima=capacidade_minima)
+    livres = availability.get_availability(
+        db,
+        sala_ids=[sala.id for sala in salas],
+        inicio=inicio,
+        fim=fim,
+        duracao_minutos=duracao_minutos
+    )
+    return {
+        "local_id": local_id,
+        "inicio": inicio,
+        "fim": fim,
+        "slot_minutos": availability.SLOT_MINUTES,
+        "salas": [
+            {
+                "sala_id": sala.id,
+                "nome": sala.nome,
+                "capacidade": sala.capacidade,
+                "livres": [{"data_inicio": a, "data_fim": b} for a, b in livres[sala.id]]
+            }
+            for sala in salas
+        ]
+    }
+
+
+@router.get("/v1/locais/{local_id}/calendario", response_model=schemas.CalendarioOut)
+def get_calendario_local(
+    local_id: int,
+    inicio: datetime = Query(..., description="Start of the window (ISO 8601)"),
+    fim: datetime = Query(..., description="End of the window (ISO 8601)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Calendar grid of a location (max. 31 days): every active room with its
+    reservations grouped per day (UTC), including participant counts.
+    """
+    if inicio >= fim:
+        raise HTTPException(status_code=400, detail="inicio deve ser anterior a fim")
+    if fim - inicio > timedelta(days=31):
+        raise HTTPException(status_code=400, detail="A janela de consulta não pode exceder 31 dias")
+    
+    local = catalog_cache.get_local(db, local_id)
+    if local is None:
+        raise HTTPException(status_code=404, detail="Local não encontrado")
+    
+    return {
+        "local_id": local.id,
+        "local": local.nome,
+        "inicio": inicio,
+        "fim": fim,
+        "salas": crud.get_calendario_local(db, local_id=local_id, inicio=inicio, fim=fim)
+    }
+
+
 @router.put("/v1/locais/{local_id}", response_model=schemas.LocalOut)
 def update_local(local_id: int, local_update: schemas.LocalUpdate, db: Session = Depends(get_db)):
     """Updates a location."""
@@ -55,6 +173,8 @@ def update_local(local_id: int, local_update: schemas.LocalUpdate, db: Session =
         if local is None:
             raise HTTPException(status_code=404, detail="Local não encontrado")
         return local
+    except OperationalError:
+        raise
     except Exception as e:
         if "unique" in str(e).lower() or "duplicate" in str(e).lower():
             raise HTTPException(status_code=409, detail="Já existe um local com este nome")
@@ -69,6 +189,8 @@ def partial_update_local(local_id: int, local_update: schemas.LocalUpdate, db: S
         if local is None:
             raise HTTPException(status_code=404, detail="Local não encontrado")
         return local
+    except OperationalError:
+        raise
     except Exception as e:
         if "unique" in str(e).lower() or "duplicate" in str(e).lower():
             raise HTTPException(status_code=409, detail="Já existe um local com este nome")
@@ -76,12 +198,21 @@ def partial_update_local(local_id: int, local_update: schemas.LocalUpdate, db: S
 
 
 @router.delete("/v1/locais/{local_id}", status_code=200)
-def delete_local(local_id: int, db: Session = Depends(get_db)):
-    """Deletes a location (soft delete)."""
-    success = crud.delete_local(db, local_id=local_id)
-    if not success:
+def delete_local(
+    local_id: int,
+    cancelar_reservas_futuras: bool = Query(False, description="Also cancel the future reservations and recurring series of the location's rooms"),
+    db: Session = Depends(get_db)
+):
+    """Deletes a location and its rooms (soft delete)."""
+    excluidos = crud.delete_local(db, local_id=local_id, cancelar_reservas_futuras=cancelar_reservas_futuras)
+    if excluidos is None:
         raise HTTPException(status_code=404, detail="Local não encontrado")
-    return {"message": "Local excluído com sucesso"}
+    return {
+        "message": "Local excluído com sucesso",
+        "salas_excluidas": excluidos["salas"],
+        "reservas_canceladas": excluidos["reservas"],
+        "series_encerradas": excluidos["series"]
+    }
 
 
 # ========== Room Endpoints ==========
@@ -97,6 +228,8 @@ def create_sala(sala: schemas.SalaCreate, db: Session = Depends(get_db)):
         if "já existe" in str(e).lower():
             raise HTTPException(status_code=409, detail=str(e))
         raise HTTPException(status_code=400, detail=str(e))
+    except OperationalError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -108,28 +241,63 @@ def list_salas(
     local_id: Optional[int] = Query(None, description="Filter by location ID"),
     ativo: Optional[bool] = Query(None, description="Filter by active/inactive status"),
     capacidade_minima: Optional[int] = Query(None, ge=1, description="Filter by minimum capacity"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
-    """Lists rooms with optional filters."""
-    return crud.list_salas(
-        db=db,
+    """Lists rooms with optional filters (served from the catalog cache)."""
+    selected = _parse_fields(fields, schemas.SalaOut)
+    schema = serialization.project(schemas.SalaOut, selected) if selected else schemas.SalaOut
+    salas = catalog_cache.list_salas(
+        db,
         skip=skip,
         limit=limit,
         local_id=local_id,
         ativo=ativo,
         capacidade_minima=capacidade_minima
     )
+    return serialization.render(List[schema], salas)
 
 
 @router.get("/v1/salas/{sala_id}", response_model=schemas.SalaOut)
 def get_sala(sala_id: int, db: Session = Depends(get_db)):
     """Gets a room by ID."""
-    sala = crud.get_sala_by_id(db, sala_id=sala_id)
+    sala = catalog_cache.get_sala(db, sala_id)
     if sala is None:
         raise HTTPException(status_code=404, detail="Sala não encontrada")
     return sala
 
 
+@router.get("/v1/salas/{sala_id}/stream")
+async def stream_sala(sala_id: int, db: Session = Depends(get_db)):
+    """
+    Streams reservation create/update/delete events of a room (Server-Sent Events).
+    Intended for kiosk screens instead of polling.
+    """
+    sala = await run_in_threadpool(catalog_cache.get_sala, db, sala_id)
+    if sala is None:
+        raise HTTPException(status_code=404, detail="Sala não encontrada")
+    return await _open_event_stream(db, "sala", sala_id)
+
+
+async def _open_event_stream(db: Session, kind: str, target_id: int) -> StreamingResponse:
+    """Starts the shared LISTEN connection and returns the SSE response."""
+    # Release the pooled connection: the stream may stay open for hours
+    await run_in_threadpool(db.close)
+    
+    if not events.broker.has_capacity():
+        raise HTTPException(status_code=503, detail="Limite de conexões de streaming atingido")
+    try:
+        await events.broker.start()
+    except Exception:
+        raise HTTPException(status_code=503, detail="Streaming de eventos indisponível")
+    
+    return StreamingResponse(
+        events.event_stream(kind, target_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.put("/v1/salas/{sala_id}", response_model=schemas.SalaOut)
 def update_sala(sala_id: int, sala_update: schemas.SalaUpdate, db: Session = Depends(get_db)):
     """Updates a room."""
@@ -144,6 +312,8 @@ def update_sala(sala_id: int, sala_update: schemas.SalaUpdate, db: Session = Dep
         if "já existe" in str(e).lower():
             raise HTTPException(status_code=409, detail=str(e))
         raise HTTPException(status_code=400, detail=str(e))
+    except OperationalError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -162,30 +332,65 @@ def partial_update_sala(sala_id: int, sala_update: schemas.SalaUpdate, db: Sessi
         if "já existe" in str(e).lower():
             raise HTTPException(status_code=409, detail=str(e))
         raise HTTPException(status_code=400, detail=str(e))
+    except OperationalError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.delete("/v1/salas/{sala_id}", status_code=200)
-def delete_sala(sala_id: int, db: Session = Depends(get_db)):
+def delete_sala(
+    sala_id: int,
+    cancelar_reservas_futuras: bool = Query(False, description="Also cancel the room's future reservations and recurring series"),
+    db: Session = Depends(get_db)
+):
     """Deletes a room (soft delete)."""
-    success = crud.delete_sala(db, sala_id=sala_id)
-    if not success:
+    excluidos = crud.delete_sala(db, sala_id=sala_id, cancelar_reservas_futuras=cancelar_reservas_futuras)
+    if excluidos is None:
         raise HTTPException(status_code=404, detail="Sala não encontrada")
-    return {"message": "Sala excluída com sucesso"}
+    return {
+        "message": "Sala excluída com sucesso",
+        "reservas_canceladas": excluidos["reservas"],
+        "series_encerradas": excluidos["series"]
+    }
 
 
 # ========== Reservation Endpoints ==========
 
-@router.post("/v1/reservas", response_model=schemas.ReservaOut, status_code=201)
+def _conflito_response(e: crud.ConflitoHorarioError) -> JSONResponse:
+    """409 response with the conflicting reservations and free-interval suggestions."""
+    return JSONResponse(
+        status_code=409,
+        content=schemas.ConflitoHorarioOut(
+            detail=str(e),
+            conflitos=e.conflitos,
+            sugestoes=e.sugestoes
+        ).model_dump(mode="json")
+    )
+
+
+@router.post(
+    "/v1/reservas",
+    response_model=schemas.ReservaOut,
+    status_code=201,
+    responses={409: {"model": schemas.ConflitoHorarioOut}}
+)
 def create_reserva(
     reserva: schemas.ReservaCreate, 
+    sugerir_outras_salas: bool = Query(False, description="On conflict, also suggest free intervals in other rooms of the location"),
     db: Session = Depends(get_db),
     usuario_email: str = Depends(get_current_user_email)
 ):
     """Creates a new reservation."""
     try:
-        return crud.create_reserva(db=db, reserva=reserva, criado_por_email=usuario_email)
+        return crud.create_reserva(
+            db=db,
+            reserva=reserva,
+            criado_por_email=usuario_email,
+            sugerir_outras_salas=sugerir_outras_salas
+        )
+    except crud.ConflitoHorarioError as e:
+        return _conflito_response(e)
     except ValueError as e:
         error_msg = str(e).lower()
         if "conflito" in error_msg:
@@ -193,11 +398,66 @@ def create_reserva(
         if "não encontrado" in error_msg or "inativo" in error_msg:
             raise HTTPException(status_code=404, detail=str(e))
         raise HTTPException(status_code=400, detail=str(e))
+    except OperationalError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/v1/reservas", response_model=List[schemas.ReservaOut])
+@router.post("/v1/reservas/bulk", response_model=schemas.ReservaBulkOut, status_code=200)
+def create_reservas_bulk(
+    payload: schemas.ReservaBulkCreate,
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """
+    Creates many reservations in one request, with one result per item.
+    In all_or_nothing mode nothing is created if any item fails (409).
+    """
+    atomic = payload.modo == "all_or_nothing"
+    try:
+        results = crud.create_reservas_bulk(
+            db=db,
+            reservas=payload.reservas,
+            criado_por_email=usuario_email,
+            atomic=atomic
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    body = schemas.ReservaBulkOut(
+        created=sum(1 for result in results if result["status"] == "created"),
+        failed=sum(1 for result in results if result["status"] == "failed"),
+        results=results
+    )
+    if atomic and body.failed:
+        return JSONResponse(status_code=409, content=body.model_dump(mode="json"))
+    return body
+
+
+INCLUDE_DESCRIPTION = "Comma-separated related data to embed: participantes, participantes.usuario"
+
+
+def _parse_include(include: Optional[str]) -> List[str]:
+    values = [value.strip() for value in (include or "").split(",") if value.strip()]
+    invalid = [value for value in values if value not in crud.RESERVA_INCLUDES]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"include inválido: {', '.join(invalid)}. Valores aceitos: {', '.join(crud.RESERVA_INCLUDES)}"
+        )
+    return values
+
+
+def _reserva_schema(include: List[str]):
+    """Output schema for the includes: participants are only touched when they were loaded."""
+    return schemas.ReservaComParticipantesOut if include else schemas.ReservaOut
+
+
+@router.get(
+    "/v1/reservas",
+    response_model=List[Union[schemas.ReservaComParticipantesOut, schemas.ReservaOut]]
+)
 def list_reservas(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
@@ -206,14 +466,22 @@ def list_reservas(
     sala: Optional[str] = Query(None, description="Filter by room name"),
     local: Optional[str] = Query(None, description="Filter by location name"),
     responsavel: Optional[str] = Query(None, description="Filter by responsible person"),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """
     Lists reservations with optional filters.
     If data_inicio and data_fim are provided, validates that data_inicio <= data_fim.
+    With `fields`, only those columns are selected and returned.
     """
+    includes = _parse_include(include)
+    selected = _parse_fields(fields, schemas.ReservaOut)
+    schema = _reserva_schema(includes)
+    if selected:
+        schema = serialization.project(schema, selected + ("participantes",) if includes else selected)
     try:
-        return crud.list_reservas(
+        reservas = crud.list_reservas(
             db=db,
             skip=skip,
             limit=limit,
@@ -221,34 +489,81 @@ def list_reservas(
             data_fim=data_fim,
             sala=sala,
             local=local,
-            responsavel=responsavel
+            responsavel=responsavel,
+            include=includes,
+            fields=selected
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return serialization.render(List[schema], reservas)
+
+
+@router.get("/v1/reservas/changes", response_model=schemas.ReservaChangesOut)
+def list_reservas_changes(
+    since: int = Query(0, ge=0, description="Change token returned by the previous sync (0 for a full sync)"),
+    limit: int = Query(500, ge=1, le=1000, description="Maximum number of changes to return"),
+    db: Session = Depends(get_db)
+):
+    """
+    Lists reservations created, updated or deleted since the given change token.
+    Clients keep `next_token` and call again while `has_more` is true.
+    """
+    changes = crud.list_reservas_changes(db, since=since, limit=limit + 1)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    return serialization.render(schemas.ReservaChangesOut, {
+        "items": changes,
+        "next_token": changes[-1].change_seq if changes else since,
+        "has_more": has_more
+    })
 
 
-@router.get("/v1/reservas/{reserva_id}", response_model=schemas.ReservaOut)
-def get_reserva(reserva_id: int, db: Session = Depends(get_db)):
+@router.get(
+    "/v1/reservas/{reserva_id}",
+    response_model=Union[schemas.ReservaComParticipantesOut, schemas.ReservaOut]
+)
+def get_reserva(
+    reserva_id: int,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
     """Gets a reservation by ID."""
-    reserva = crud.get_reserva_by_id(db, reserva_id=reserva_id)
+    includes = _parse_include(include)
+    if includes:
+        reserva = crud.get_reserva_by_id(db, reserva_id=reserva_id, include=includes)
+    else:
+        reserva = crud.get_reserva_row(db, reserva_id)
     if reserva is None:
         raise HTTPException(status_code=404, detail="Reserva não encontrada")
-    return reserva
+    return serialization.render(_reserva_schema(includes), reserva)
 
 
-@router.put("/v1/reservas/{reserva_id}", response_model=schemas.ReservaOut)
+@router.put(
+    "/v1/reservas/{reserva_id}",
+    response_model=schemas.ReservaOut,
+    responses={409: {"model": schemas.ConflitoHorarioOut}}
+)
 def update_reserva(
     reserva_id: int, 
     reserva_update: schemas.ReservaUpdate, 
+    sugerir_outras_salas: bool = Query(False, description="On conflict, also suggest free intervals in other rooms of the location"),
     db: Session = Depends(get_db),
     usuario_email: str = Depends(get_current_user_email)
 ):
     """Updates a reservation."""
     try:
-        updated_reserva = crud.update_reserva(db, reserva_id=reserva_id, reserva_update=reserva_update, usuario_email=usuario_email)
+        updated_reserva = crud.update_reserva(
+            db,
+            reserva_id=reserva_id,
+            reserva_update=reserva_update,
+            usuario_email=usuario_email,
+            sugerir_outras_salas=sugerir_outras_salas
+        )
         if updated_reserva is None:
             raise HTTPException(status_code=404, detail="Reserva não encontrada")
         return updated_reserva
+    except crud.ConflitoHorarioError as e:
+        return _conflito_response(e)
     except ValueError as e:
         error_msg = str(e).lower()
         if "permissão" in error_msg:
@@ -258,23 +573,38 @@ def update_reserva(
         if "não encontrado" in error_msg or "inativo" in error_msg:
             raise HTTPException(status_code=404, detail=str(e))
         raise HTTPException(status_code=400, detail=str(e))
+    except OperationalError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.patch("/v1/reservas/{reserva_id}", response_model=schemas.ReservaOut)
+@router.patch(
+    "/v1/reservas/{reserva_id}",
+    response_model=schemas.ReservaOut,
+    responses={409: {"model": schemas.ConflitoHorarioOut}}
+)
 def partial_update_reserva(
     reserva_id: int, 
     reserva_update: schemas.ReservaUpdate, 
+    sugerir_outras_salas: bool = Query(False, description="On conflict, also suggest free intervals in other rooms of the location"),
     db: Session = Depends(get_db),
     usuario_email: str = Depends(get_current_user_email)
 ):
     """Partially updates a reservation."""
     try:
-        updated_reserva = crud.update_reserva(db, reserva_id=reserva_id, reserva_update=reserva_update, usuario_email=usuario_email)
+        updated_reserva = crud.update_reserva(
+            db,
+            reserva_id=reserva_id,
+            reserva_update=reserva_update,
+            usuario_email=usuario_email,
+            sugerir_outras_salas=sugerir_outras_salas
+        )
         if updated_reserva is None:
             raise HTTPException(status_code=404, detail="Reserva não encontrada")
         return updated_reserva
+    except crud.ConflitoHorarioError as e:
+        return _conflito_response(e)
     except ValueError as e:
         error_msg = str(e).lower()
         if "permissão" in error_msg:
@@ -284,6 +614,8 @@ def partial_update_reserva(
         if "não encontrado" in error_msg or "inativo" in error_msg:
             raise HTTPException(status_code=404, detail=str(e))
         raise HTTPException(status_code=400, detail=str(e))
+    except OperationalError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -305,10 +637,229 @@ def delete_reserva(
         if "permissão" in error_msg:
             raise HTTPException(status_code=403, detail=str(e))
         raise HTTPException(status_code=400, detail=str(e))
+    except OperationalError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/v1/reservas/cancelar-em-lote", response_model=schemas.ReservaCancelamentoLoteOut, status_code=200)
+def cancelar_reservas_em_lote(
+    filtro: schemas.ReservaCancelamentoLote,
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """
+    Cancels (soft delete) every reservation of a room or location overlapping a
+    window, or a list of reservation IDs, in a single statement (admin only).
+    With dry_run, only reports how many would be cancelled.
+    """
+    if not is_admin_email(usuario_email):
+        raise HTTPException(status_code=403, detail="Acesso negado. Apenas administradores podem cancelar reservas em lote.")
+    
+    try:
+        total, ids = crud.cancelar_reservas_em_lote(db, filtro)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schemas.ReservaCancelamentoLoteOut(dry_run=filtro.dry_run, total=total, ids=ids)
+
+
+# ========== Recurring Reservation Endpoints ==========
+
+@router.post("/v1/series", response_model=schemas.SerieReservaOut, status_code=201)
+def create_serie_reserva(
+    serie: schemas.SerieReservaCreate,
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """
+    Creates a recurring reservation from an iCalendar RRULE.
+    All occurrences are validated against the room's reservations at once.
+    """
+    try:
+        return crud.create_serie_reserva(db=db, serie=serie, criado_por_email=usuario_email)
+    except ValueError as e:
+        error_msg = str(e).lower()
+        if "conflito" in error_msg:
+            raise HTTPException(status_code=409, detail=str(e))
+        if "não encontrado" in error_msg or "inativo" in error_msg:
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+    except OperationalError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/v1/series/{serie_id}", response_model=schemas.SerieReservaOut)
+def get_serie_reserva(serie_id: int, db: Session = Depends(get_db)):
+    """Gets a recurring reservation by ID."""
+    serie = crud.get_serie_by_id(db, serie_id=serie_id)
+    if serie is None:
+        raise HTTPException(status_code=404, detail="Série não encontrada")
+    return serie
+
+
+@router.get("/v1/series/{serie_id}/ocorrencias", response_model=List[schemas.SerieOcorrenciaOut])
+def list_serie_ocorrencias(
+    serie_id: int,
+    inicio: datetime = Query(..., description="Start of the window (ISO 8601)"),
+    fim: datetime = Query(..., description="End of the window (ISO 8601)"),
+    db: Session = Depends(get_db)
+):
+    """Lists the occurrences of a series within a time window (exceptions applied)."""
+    if inicio >= fim:
+        raise HTTPException(status_code=400, detail="inicio deve ser anterior a fim")
+    if crud.get_serie_by_id(db, serie_id=serie_id) is None:
+        raise HTTPException(status_code=404, detail="Série não encontrada")
+    return crud.list_serie_ocorrencias(db, inicio=inicio, fim=fim, serie_id=serie_id)
+
+
+@router.post("/v1/series/{serie_id}/excecoes", response_model=schemas.SerieExcecaoOut, status_code=201)
+def create_serie_excecao(
+    serie_id: int,
+    excecao: schemas.SerieExcecaoCreate,
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """Cancels or reschedules a single occurrence of a series."""
+    try:
+        db_excecao = crud.create_serie_excecao(db, serie_id=serie_id, excecao=excecao, usuario_email=usuario_email)
+        if db_excecao is None:
+            raise HTTPException(status_code=404, detail="Série não encontrada")
+        return db_excecao
+    except ValueError as e:
+        error_msg = str(e).lower()
+        if "permissão" in error_msg:
+            raise HTTPException(status_code=403, detail=str(e))
+        if "conflito" in error_msg:
+            raise HTTPException(status_code=409, detail=str(e))
+        if "não encontrada" in error_msg:
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/v1/series/{serie_id}", status_code=200)
+def delete_serie_reserva(
+    serie_id: int,
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """Deletes a recurring reservation and all its occurrences (soft delete)."""
+    try:
+        success = crud.delete_serie_reserva(db, serie_id=serie_id, usuario_email=usuario_email)
+        if not success:
+            raise HTTPException(status_code=404, detail="Série não encontrada")
+        return {"message": "Série excluída com sucesso"}
+    except ValueError as e:
+        error_msg = str(e).lower()
+        if "permissão" in error_msg:
+            raise HTTPException(status_code=403, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ========== Report Endpoints ==========
+
+@router.get("/v1/relatorios/ocupacao", response_model=schemas.RelatorioOcupacaoOut)
+def get_relatorio_ocupacao(
+    data_inicio: date = Query(..., description="First day (UTC) of the period"),
+    data_fim: date = Query(..., description="Last day (UTC) of the period, inclusive"),
+    agrupar_por: schemas.AgrupamentoOcupacao = Query("sala", description="Group by room, location, hour of day or weekday"),
+    local_id: Optional[int] = Query(None, description="Filter by location ID"),
+    sala_id: Optional[int] = Query(None, description="Filter by room ID"),
+    hora_inicio: int = Query(0, ge=0, le=23, description="First hour of day (UTC) considered available"),
+    hora_fim: int = Query(24, ge=1, le=24, description="Hour of day (UTC) where availability ends"),
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """Occupancy percentage of active rooms, read from the hourly rollup plus the occurrences of recurring series."""
+    if data_fim < data_inicio or hora_fim <= hora_inicio:
+        raise HTTPException(status_code=400, detail="Período inválido: o fim deve ser posterior ao início")
+    if (data_fim - data_inicio).days >= reports.MAX_DIAS_RELATORIO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Período muito longo: máximo de {reports.MAX_DIAS_RELATORIO} dias"
+        )
+    
+    itens = crud.get_relatorio_ocupacao(
+        db,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        agrupar_por=agrupar_por,
+        local_id=local_id,
+        sala_id=sala_id,
+        hora_inicio=hora_inicio,
+        hora_fim=hora_fim
+    )
+    return schemas.RelatorioOcupacaoOut(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        agrupar_por=agrupar_por,
+        itens=itens
+    )
+
+
+@router.get("/v1/relatorios/cafe", response_model=schemas.RelatorioCafeOut)
+def get_relatorio_cafe(
+    data_inicio: date = Query(..., description="First day (UTC) of the period"),
+    data_fim: date = Query(..., description="Last day (UTC) of the period, inclusive"),
+    local_id: Optional[int] = Query(None, description="Filter by location ID"),
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """Reservations with coffee and coffee quantity per day and location (daily rollup plus series occurrences)."""
+    if data_fim < data_inicio:
+        raise HTTPException(status_code=400, detail="Período inválido: o fim deve ser posterior ao início")
+    if (data_fim - data_inicio).days >= reports.MAX_DIAS_RELATORIO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Período muito longo: máximo de {reports.MAX_DIAS_RELATORIO} dias"
+        )
+    
+    itens = crud.get_relatorio_cafe(db, data_inicio=data_inicio, data_fim=data_fim, local_id=local_id)
+    return schemas.RelatorioCafeOut(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        total_reservas=sum(item["reservas"] for item in itens),
+        total_quantidade_cafe=sum(item["quantidade_cafe"] for item in itens),
+        itens=itens
+    )
+
+
+@router.post("/v1/relatorios/rebuild", status_code=200)
+def rebuild_relatorios(
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """Rebuilds the report rollups from the reservations (admin only)."""
+    if not is_admin_email(usuario_email):
+        raise HTTPException(status_code=403, detail="Acesso negado. Apenas administradores podem reconstruir relatórios.")
+    
+    reports.rebuild_rollups(db)
+    return {"message": "Relatórios reconstruídos com sucesso"}
+
+
+# ========== Bootstrap Endpoint ==========
+
+@router.get("/v1/bootstrap", response_model=schemas.BootstrapOut)
+def get_bootstrap(
+    limit_reservas: int = Query(50, ge=1, le=200, description="Maximum number of upcoming reservations"),
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """
+    Everything the front-end needs on startup: the user profile, the active
+    locations with their rooms (cached) and the caller's upcoming reservations.
+    """
+    usuario = crud.get_usuario_by_email(db, usuario_email)
+    reservas = crud.list_reservas_usuario(db, usuario_email, desde=datetime.now(timezone.utc), limit=limit_reservas)
+    return schemas.BootstrapOut(
+        usuario=schemas.UsuarioOut.model_validate(usuario) if usuario else None,
+        locais=catalog_cache.get(db),
+        reservas=[schemas.ReservaOut.model_validate(reserva) for reserva in reservas]
+    )
+
+
 # ========== Authentication Endpoints ==========
 
 @router.post("/v1/auth/google", response_model=schemas.AuthResponse, status_code=200)
@@ -385,6 +936,8 @@ def login_with_google(request: schemas.GoogleTokenRequest, db: Session = Depends
         
     except HTTPException:
         raise
+    except OperationalError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -402,7 +955,7 @@ def search_usuarios(
     db: Session = Depends(get_db)
 ):
     """Searches users by name or email (for form selection)."""
-    return crud.list_usuarios(db=db, skip=0, limit=limit, search=q)
+    return serialization.render(List[schemas.UsuarioOut], crud.list_usuarios(db=db, skip=0, limit=limit, search=q))
 
 
 @router.get("/v1/usuarios", response_model=List[schemas.UsuarioOut])
@@ -410,20 +963,86 @@ def list_usuarios(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     search: Optional[str] = Query(None, description="Search by name or email"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db),
     usuario_email: str = Depends(get_current_user_email)
 ):
     """
     Lists registered users (admin only).
     """
-    # Check if user is admin (can be implemented with email verification in environment variable)
-    admin_emails = os.getenv("ADMIN_EMAILS", "").split(",")
-    admin_emails = [e.strip().lower() for e in admin_emails if e.strip()]
-    
-    if usuario_email.lower() not in admin_emails:
+    # Check if user is admin (emails listed in the ADMIN_EMAILS environment variable)
+    if not is_admin_email(usuario_email):
         raise HTTPException(status_code=403, detail="Acesso negado. Apenas administradores podem listar usuários.")
     
-    return crud.list_usuarios(db=db, skip=skip, limit=limit, search=search)
+    selected = _parse_fields(fields, schemas.UsuarioOut)
+    schema = serialization.project(schemas.UsuarioOut, selected) if selected else schemas.UsuarioOut
+    return serialization.render(
+        List[schema],
+        crud.list_usuarios(db=db, skip=skip, limit=limit, search=search, fields=selected)
+    )
+
+
+def _encode_cursor(reserva: models.Reserva) -> str:
+    raw = f"{reserva.data_inicio.isoformat()}|{reserva.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        data_inicio, reserva_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(data_inicio), int(reserva_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+@router.get("/v1/me/reservas", response_model=schemas.ReservasUsuarioOut)
+def list_minhas_reservas(
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of reservations to return"),
+    apenas_futuras: bool = Query(False, description="Only reservations that have not finished yet"),
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """
+    Lists the reservations created by the caller or where the caller participates,
+    ordered by start time. Pass `next_cursor` as `cursor` while `has_more` is true.
+    """
+    reservas = crud.list_reservas_usuario(
+        db,
+        email=usuario_email,
+        desde=datetime.now(timezone.utc) if apenas_futuras else None,
+        after=_decode_cursor(cursor) if cursor else None,
+        limit=limit + 1
+    )
+    has_more = len(reservas) > limit
+    reservas = reservas[:limit]
+    return serialization.render(schemas.ReservasUsuarioOut, {
+        "items": reservas,
+        "next_cursor": _encode_cursor(reservas[-1]) if has_more else None,
+        "has_more": has_more
+    })
+
+
+@router.post("/v1/usuarios/freebusy", response_model=schemas.FreeBusyOut, status_code=200)
+def get_freebusy(
+    consulta: schemas.FreeBusyRequest,
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """Returns the busy intervals of up to 100 users within a window (max. 31 days)."""
+    usuario_ids = list(dict.fromkeys(consulta.usuario_ids))
+    busy = crud.get_freebusy(db, usuario_ids=usuario_ids, inicio=consulta.inicio, fim=consulta.fim)
+    return {
+        "inicio": consulta.inicio,
+        "fim": consulta.fim,
+        "usuarios": [
+            {
+                "usuario_id": usuario_id,
+                "ocupado": [{"data_inicio": a, "data_fim": b} for a, b in busy[usuario_id]]
+            }
+            for usuario_id in usuario_ids
+        ]
+    }
 
 
 @router.get("/v1/usuarios/{usuario_id}", response_model=schemas.UsuarioOut)
@@ -464,6 +1083,8 @@ def create_participante(
         return db_participante
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except OperationalError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -478,7 +1099,66 @@ def list_participantes_reserva(reserva_id: int, db: Session = Depends(get_db)):
     participantes = db.query(models.Participante).options(joinedload(models.Participante.usuario)).filter(
         models.Participante.reserva_id == reserva_id
     ).order_by(models.Participante.created_at).all()
-    return participantes
+    return serialization.render(List[schemas.ParticipanteOut], participantes)
+
+
+def _set_participantes(
+    db: Session,
+    reserva_id: int,
+    participantes: schemas.ParticipantesBulk,
+    usuario_email: str,
+    replace: bool
+) -> dict:
+    reserva = crud.get_reserva_by_id(db, reserva_id)
+    if not reserva:
+        raise HTTPException(status_code=404, detail="Reserva não encontrada")
+    
+    if reserva.criado_por_email and reserva.criado_por_email != usuario_email:
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para adicionar participantes a esta reserva"
+        )
+    
+    try:
+        adicionados, removidos = crud.set_participantes(
+            db,
+            reserva_id=reserva_id,
+            usuario_ids=participantes.usuario_ids,
+            nomes_manuais=participantes.nomes_manuais,
+            replace=replace
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "adicionados": adicionados,
+        "removidos": removidos,
+        "participantes": db.query(models.Participante).options(joinedload(models.Participante.usuario)).filter(
+            models.Participante.reserva_id == reserva_id
+        ).order_by(models.Participante.created_at).all()
+    }
+
+
+@router.put("/v1/reservas/{reserva_id}/participantes", response_model=schemas.ParticipantesBulkOut)
+def replace_participantes_reserva(
+    reserva_id: int,
+    participantes: schemas.ParticipantesBulk,
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """Replaces the participant set of a reservation."""
+    return _set_participantes(db, reserva_id, participantes, usuario_email, replace=True)
+
+
+@router.post("/v1/reservas/{reserva_id}/participantes/bulk", response_model=schemas.ParticipantesBulkOut)
+def add_participantes_reserva(
+    reserva_id: int,
+    participantes: schemas.ParticipantesBulk,
+    db: Session = Depends(get_db),
+    usuario_email: str = Depends(get_current_user_email)
+):
+    """Adds many participants to a reservation (existing ones are skipped)."""
+    return _set_participantes(db, reserva_id, participantes, usuario_email, replace=False)
 
 
 @router.delete("/v1/participantes/{participante_id}", status_code=200)
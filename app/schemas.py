@@ -1,6 +1,6 @@
 from pydantic import BaseModel, model_validator, Field
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, List, Literal
 
 
 # Standard Error Schemas
@@ -130,6 +130,7 @@ class ReservaUpdate(BaseModel):
 class ReservaOut(ReservaBase):
     id: int
     criado_por_email: Optional[str] = None
+    participantes_count: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -137,6 +138,270 @@ class ReservaOut(ReservaBase):
         from_attributes = True
 
 
+class ReservasUsuarioOut(BaseModel):
+    items: List[ReservaOut]
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page (null on the last page)")
+    has_more: bool
+
+
+class ReservaConflitante(BaseModel):
+    reserva_id: Optional[int] = None
+    serie_id: Optional[int] = None
+    data_inicio: datetime
+    data_fim: datetime
+
+
+class SugestaoHorario(BaseModel):
+    sala_id: int
+    data_inicio: datetime
+    data_fim: datetime
+
+
+class ConflitoHorarioOut(BaseModel):
+    detail: str
+    conflitos: List[ReservaConflitante]
+    sugestoes: List[SugestaoHorario] = Field(..., description="Nearest free intervals with the requested duration")
+
+
+class ReservaBulkCreate(BaseModel):
+    reservas: List[ReservaCreate] = Field(..., min_length=1, max_length=500)
+    modo: Literal["all_or_nothing", "best_effort"] = Field(
+        "all_or_nothing",
+        description="all_or_nothing: creates nothing if any item fails; best_effort: creates every valid item"
+    )
+
+
+class ReservaBulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "failed", "skipped"]
+    reserva: Optional[ReservaOut] = None
+    error: Optional[str] = None
+
+
+class ReservaBulkOut(BaseModel):
+    created: int
+    failed: int
+    results: List[ReservaBulkItemResult]
+
+
+class ReservaCancelamentoLote(BaseModel):
+    sala_id: Optional[int] = None
+    local_id: Optional[int] = None
+    data_inicio: Optional[datetime] = Field(None, description="Start of the window (reservations overlapping it are cancelled)")
+    data_fim: Optional[datetime] = Field(None, description="End of the window")
+    ids: List[int] = Field(default_factory=list, max_length=5000, description="Reservation IDs (instead of, or combined with, the filters)")
+    dry_run: bool = Field(False, description="Only counts the reservations that would be cancelled")
+
+    @model_validator(mode='after')
+    def validate_filtro(self):
+        if (self.data_inicio is None) != (self.data_fim is None):
+            raise ValueError("data_inicio e data_fim devem ser informados juntos")
+        if self.data_inicio and self.data_fim <= self.data_inicio:
+            raise ValueError("data_fim deve ser posterior a data_inicio")
+        if not self.ids and (self.data_inicio is None or (self.sala_id is None and self.local_id is None)):
+            raise ValueError("Informe ids ou sala_id/local_id com data_inicio e data_fim")
+        return self
+
+
+class ReservaCancelamentoLoteOut(BaseModel):
+    dry_run: bool
+    total: int = Field(..., description="Reservations cancelled (or that would be cancelled, on a dry run)")
+    ids: List[int] = Field(default_factory=list, description="IDs of the cancelled reservations (empty on a dry run)")
+
+
+class ReservaChangeOut(ReservaOut):
+    deleted_at: Optional[datetime] = None
+    change_seq: int
+
+
+class ReservaChangesOut(BaseModel):
+    items: List[ReservaChangeOut]
+    next_token: int = Field(..., description="Token to send as `since` in the next sync")
+    has_more: bool = Field(..., description="True if more changes are available after next_token")
+
+
+# Recurring Reservation Schemas
+class SerieReservaCreate(BaseModel):
+    local_id: int
+    sala_id: int
+    data_inicio: datetime = Field(..., description="Start of the first occurrence (DTSTART)")
+    data_fim: datetime = Field(..., description="End of the first occurrence (defines the duration)")
+    rrule: str = Field(..., max_length=500, description="iCalendar RRULE, e.g. FREQ=WEEKLY;BYDAY=MO;COUNT=10")
+    responsavel: str = Field(..., max_length=150)
+    cafe: bool = False
+    quantidade_cafe: Optional[int] = Field(None, ge=1)
+    descricao: Optional[str] = Field(None, max_length=1000)
+
+    @model_validator(mode='after')
+    def validate_dates(self):
+        if self.data_fim <= self.data_inicio:
+            raise ValueError("data_fim deve ser posterior a data_inicio")
+        return self
+
+    @model_validator(mode='after')
+    def validate_coffee(self):
+        if self.cafe is True:
+            if self.quantidade_cafe is None or self.quantidade_cafe <= 0:
+                raise ValueError("quantidade_cafe é obrigatório e deve ser maior que 0 quando cafe = true")
+        elif self.cafe is False:
+            self.quantidade_cafe = None
+        return self
+
+
+class SerieReservaOut(BaseModel):
+    id: int
+    local_id: int
+    sala_id: int
+    local: str
+    sala: str
+    rrule: str
+    data_inicio: datetime
+    data_fim: datetime
+    data_fim_serie: Optional[datetime] = None
+    responsavel: str
+    cafe: bool
+    quantidade_cafe: Optional[int] = None
+    descricao: Optional[str] = None
+    criado_por_email: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SerieOcorrenciaOut(BaseModel):
+    serie_id: int
+    local_id: int
+    sala_id: int
+    data_original: datetime = Field(..., description="Occurrence start as generated by the RRULE")
+    data_inicio: datetime
+    data_fim: datetime
+    responsavel: str
+    modificada: bool = False
+
+
+class SerieExcecaoCreate(BaseModel):
+    data_original: datetime = Field(..., description="Start of the occurrence to change")
+    cancelada: bool = False
+    data_inicio: Optional[datetime] = None
+    data_fim: Optional[datetime] = None
+
+    @model_validator(mode='after')
+    def validate_excecao(self):
+        if self.cancelada:
+            self.data_inicio = None
+            self.data_fim = None
+            return self
+        if self.data_inicio is None or self.data_fim is None:
+            raise ValueError("Informe cancelada = true ou os novos data_inicio e data_fim da ocorrência")
+        if self.data_fim <= self.data_inicio:
+            raise ValueError("data_fim deve ser posterior a data_inicio")
+        return self
+
+
+class SerieExcecaoOut(BaseModel):
+    id: int
+    serie_id: int
+    data_original: datetime
+    cancelada: bool
+    data_inicio: Optional[datetime] = None
+    data_fim: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Availability Schemas
+class IntervaloLivre(BaseModel):
+    data_inicio: datetime
+    data_fim: datetime
+
+
+class SalaDisponibilidadeOut(BaseModel):
+    sala_id: int
+    nome: str
+    capacidade: Optional[int] = None
+    livres: List[IntervaloLivre]
+
+
+class DisponibilidadeOut(BaseModel):
+    local_id: int
+    inicio: datetime
+    fim: datetime
+    slot_minutos: int
+    salas: List[SalaDisponibilidadeOut]
+
+
+# Calendar Schemas
+class CalendarioReservaOut(BaseModel):
+    id: Optional[int] = Field(None, description="Reservation ID (null for series occurrences)")
+    serie_id: Optional[int] = None
+    data_inicio: datetime
+    data_fim: datetime
+    responsavel: str
+    descricao: Optional[str] = None
+    cafe: bool = False
+    quantidade_cafe: Optional[int] = None
+    participantes: int = 0
+
+
+class CalendarioDiaOut(BaseModel):
+    dia: date
+    reservas: List[CalendarioReservaOut]
+
+
+class CalendarioSalaOut(BaseModel):
+    id: int
+    nome: str
+    capacidade: Optional[int] = None
+    dias: List[CalendarioDiaOut]
+
+
+class CalendarioOut(BaseModel):
+    local_id: int
+    local: str
+    inicio: datetime
+    fim: datetime
+    salas: List[CalendarioSalaOut]
+
+
+# Report Schemas
+AgrupamentoOcupacao = Literal["sala", "local", "hora", "dia_semana"]
+
+
+class RelatorioOcupacaoItem(BaseModel):
+    chave: int = Field(..., description="Room ID, location ID, hour of day (0-23) or weekday (0 = Monday)")
+    rotulo: str
+    horas_reservadas: float
+    horas_disponiveis: float
+    ocupacao_percentual: float
+
+
+class RelatorioOcupacaoOut(BaseModel):
+    data_inicio: date
+    data_fim: date
+    agrupar_por: AgrupamentoOcupacao
+    itens: List[RelatorioOcupacaoItem]
+
+
+class RelatorioCafeItem(BaseModel):
+    dia: date
+    local_id: int
+    local: str
+    reservas: int
+    quantidade_cafe: int
+
+
+class RelatorioCafeOut(BaseModel):
+    data_inicio: date
+    data_fim: date
+    total_reservas: int
+    total_quantidade_cafe: int
+    itens: List[RelatorioCafeItem]
+
+
 # Pagination Schema
 class PaginatedResponse(BaseModel):
     items: list
@@ -173,6 +438,36 @@ class UsuarioOut(UsuarioBase):
         from_attributes = True
 
 
+class FreeBusyRequest(BaseModel):
+    usuario_ids: List[int] = Field(..., min_length=1, max_length=100)
+    inicio: datetime
+    fim: datetime
+
+    @model_validator(mode='after')
+    def validate_window(self):
+        # Times without an offset are taken as UTC, like the occupancy slots
+        if self.inicio.tzinfo is None:
+            self.inicio = self.inicio.replace(tzinfo=timezone.utc)
+        if self.fim.tzinfo is None:
+            self.fim = self.fim.replace(tzinfo=timezone.utc)
+        if self.fim <= self.inicio:
+            raise ValueError("fim deve ser posterior a inicio")
+        if self.fim - self.inicio > timedelta(days=31):
+            raise ValueError("A janela de consulta não pode exceder 31 dias")
+        return self
+
+
+class UsuarioFreeBusyOut(BaseModel):
+    usuario_id: int
+    ocupado: List[IntervaloLivre] = Field(..., description="Merged busy intervals within the window")
+
+
+class FreeBusyOut(BaseModel):
+    inicio: datetime
+    fim: datetime
+    usuarios: List[UsuarioFreeBusyOut]
+
+
 # Participant Schemas
 class ParticipanteBase(BaseModel):
     reserva_id: int
@@ -205,6 +500,39 @@ class ParticipanteOut(BaseModel):
         from_attributes = True
 
 
+class ParticipantesBulk(BaseModel):
+    usuario_ids: List[int] = Field(default_factory=list, max_length=500)
+    nomes_manuais: List[str] = Field(default_factory=list, max_length=500)
+
+    @model_validator(mode='after')
+    def validate_nomes(self):
+        self.nomes_manuais = [nome.strip() for nome in self.nomes_manuais if nome and nome.strip()]
+        if any(len(nome) > 255 for nome in self.nomes_manuais):
+            raise ValueError("nome_manual deve ter no máximo 255 caracteres")
+        return self
+
+
+class ParticipantesBulkOut(BaseModel):
+    adicionados: int
+    removidos: int = 0
+    participantes: List[ParticipanteOut]
+
+
+class ReservaComParticipantesOut(ReservaOut):
+    participantes: List[ParticipanteOut]
+
+
+# Bootstrap Schemas
+class LocalComSalasOut(LocalOut):
+    salas: List[SalaOut]
+
+
+class BootstrapOut(BaseModel):
+    usuario: Optional[UsuarioOut] = None
+    locais: List[LocalComSalasOut]
+    reservas: List[ReservaOut] = Field(..., description="Upcoming reservations created by or with the caller")
+
+
 # Authentication Schemas
 class GoogleTokenRequest(BaseModel):
     token: str = Field(..., description="JWT token from Google Identity Services")
@@ -42,20 +42,32 @@ def get_current_user_email(credentials: HTTPAuthorizationCredentials = Depends(s
         )
 
 
-def get_current_user_email_optional(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))) -> Optional[str]:
+def decode_token_email(token: str) -> Optional[str]:
     """
-    Optional version of authentication - returns None if there's no token.
+    Decodes a system JWT and returns its email, or None if the token is invalid.
+    Used where authentication is informative only (e.g. rate limiting keys).
     """
-    if not credentials:
-        return None
-    
-    token = credentials.credentials
     secret_key = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
     
     try:
         payload = jwt.decode(token, secret_key, algorithms=["HS256"])
-        email = payload.get("email")
-        return email
-    except:
+        return payload.get("email")
+    except jwt.PyJWTError:
+        return None
+
+
+def get_current_user_email_optional(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))) -> Optional[str]:
+    """
+    Optional version of authentication - returns None if there's no token.
+    """
+    if not credentials:
         return None
+    
+    return decode_token_email(credentials.credentials)
+
 
+def is_admin_email(email: str) -> bool:
+    """Checks whether the email is listed in the ADMIN_EMAILS environment variable."""
+    admin_emails = os.getenv("ADMIN_EMAILS", "").split(",")
+    admin_emails = [e.strip().lower() for e in admin_emails if e.strip()]
+    return email.lower() in admin_emails
@@ -0,0 +1,252 @@
+"""
+Per-room, per-day occupancy bitmaps for fast availability queries.
+
+Each (sala_id, day) pair maps to a Python int where bit i is set when slot i
+(SLOT_MINUTES long, UTC) overlaps an active reservation or series occurrence.
+Bitmaps are built lazily (one query for all missing pairs), invalidated on
+every reservation write in this worker and, through the LISTEN/NOTIFY event
+broker, on writes made by other workers. Availability for many rooms is then
+answered with bitwise operations instead of SQL range scans.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+SLOT_MINUTES = int(os.getenv("AVAILABILITY_SLOT_MINUTES", "15"))
+if SLOT_MINUTES <= 0 or 1440 % SLOT_MINUTES:
+    raise ValueError("AVAILABILITY_SLOT_MINUTES deve dividir 1440")
+SLOTS_PER_DAY = 1440 // SLOT_MINUTES
+SLOT = timedelta(minutes=SLOT_MINUTES)
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+# Bitmaps older than this are reloaded (safety net for writes not seen via NOTIFY)
+AVAILABILITY_CACHE_TTL = float(os.getenv("AVAILABILITY_CACHE_TTL", "300"))
+AVAILABILITY_CACHE_MAX_ENTRIES = int(os.getenv("AVAILABILITY_CACHE_MAX_ENTRIES", "200000"))
+AVAILABILITY_WARM_DAYS = int(os.getenv("AVAILABILITY_WARM_DAYS", "7"))
+
+Key = Tuple[int, date]
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, dt_time.min, tzinfo=timezone.utc)
+
+
+def days_between(inicio: datetime, fim: datetime) -> List[date]:
+    """UTC days touched by [inicio, fim)."""
+    first = inicio.astimezone(timezone.utc).date()
+    last = (fim.astimezone(timezone.utc) - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+def interval_mask(day: date, inicio: datetime, fim: datetime) -> int:
+    """Bits of the slots of `day` that overlap [inicio, fim)."""
+    start = day_start(day)
+    begin = max(inicio, start) - start
+    end = min(fim, start + timedelta(days=1)) - start
+    if end <= begin:
+        return 0
+    first_slot = int(begin // SLOT)
+    last_slot = -int(-end // SLOT)  # ceil
+    return ((1 << (last_slot - first_slot)) - 1) << first_slot
+
+
+class SlotIndex:
+    """
+    Thread-safe LRU cache of occupancy bitmaps.
+    A generation counter prevents storing bitmaps loaded concurrently with an
+    invalidation (they could miss the write that triggered it).
+    """
+
+    def __init__(self, max_entries: int = AVAILABILITY_CACHE_MAX_ENTRIES, ttl: float = AVAILABILITY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._bitmaps: "OrderedDict[Key, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, sala_id: int, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> None:
+        """Drops the bitmaps of a room for the days touched by [inicio, fim) (all days if omitted)."""
+        with self._lock:
+            self._generation += 1
+            if inicio is None or fim is None:
+                for key in [key for key in self._bitmaps if key[0] == sala_id]:
+                    del self._bitmaps[key]
+                return
+            for day in days_between(inicio, fim):
+                self._bitmaps.pop((sala_id, day), None)
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._bitmaps.clear()
+
+    def on_event(self, event: dict) -> None:
+        """Event broker listener: invalidates the days touched by a reservation change."""
+        if event.get("op") == "resync":
+            self.invalidate_all()
+            return
+        for sala_key, inicio_key, fim_key in (
+            ("sala_id", "data_inicio", "data_fim"),
+            ("old_sala_id", "old_data_inicio", "old_data_fim"),
+        ):
+            sala_id = event.get(sala_key)
+            if sala_id is None:
+                continue
+            inicio = _parse_timestamp(event.get(inicio_key))
+            fim = _parse_timestamp(event.get(fim_key))
+            self.invalidate(sala_id, inicio, fim)
+
+    def get_bitmaps(self, db: Session, sala_ids: Iterable[int], days: List[date]) -> Dict[Key, int]:
+        """Returns the bitmap of every (sala_id, day), loading missing ones in one pass."""
+        sala_ids = list(sala_ids)
+        result: Dict[Key, int] = {}
+        missing: List[Key] = []
+        now = time.monotonic()
+
+        with self._lock:
+            generation = self._generation
+            for sala_id in sala_ids:
+                for day in days:
+                    entry = self._bitmaps.get((sala_id, day))
+                    if entry is not None and now - entry[1] < self.ttl:
+                        self._bitmaps.move_to_end((sala_id, day))
+                        result[(sala_id, day)] = entry[0]
+                    else:
+                        missing.append((sala_id, day))
+            self.hits += len(result)
+            self.misses += len(missing)
+
+        if not missing:
+            return result
+
+        loaded = load_bitmaps(
+            db,
+            sala_ids=sorted({key[0] for key in missing}),
+            days=sorted({key[1] for key in missing})
+        )
+        with self._lock:
+            store = generation == self._generation
+            for key in missing:
+                bitmap = loaded.get(key, 0)
+                result[key] = bitmap
+                if store:
+                    self._bitmaps[key] = (bitmap, now)
+            while len(self._bitmaps) > self.max_entries:
+                self._bitmaps.popitem(last=False)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._bitmaps),
+            "slot_minutes": SLOT_MINUTES,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def load_bitmaps(db: Session, sala_ids: List[int], days: List[date]) -> Dict[Key, int]:
+    """Builds bitmaps from active reservations and series occurrences of the given rooms and days."""
+    from .. import crud
+
+    bitmaps: Dict[Key, int] = {}
+    if not sala_ids or not days:
+        return bitmaps
+
+    inicio = day_start(days[0])
+    fim = day_start(days[-1]) + timedelta(days=1)
+    wanted_days = set(days)
+
+    for sala_id, data_inicio, data_fim in crud.list_ocupacao(db, sala_ids=sala_ids, inicio=inicio, fim=fim):
+        for day in days_between(max(data_inicio, inicio), min(data_fim, fim)):
+            if day in wanted_days:
+                key = (sala_id, day)
+                bitmaps[key] = bitmaps.get(key, 0) | interval_mask(day, data_inicio, data_fim)
+    return bitmaps
+
+
+def free_intervals(bitmap: int, first_slot_start: datetime, min_slots: int = 1) -> List[Tuple[datetime, datetime]]:
+    """
+    Converts the free bits of a (multi-day) bitmap into [inicio, fim) intervals,
+    keeping only runs of at least min_slots slots.
+    """
+    intervals = []
+    position = 0
+    while bitmap:
+        low = (bitmap & -bitmap).bit_length() - 1
+        bitmap >>= low
+        position += low
+        run = (~bitmap & (bitmap + 1)).bit_length() - 1
+        if run >= min_slots:
+            intervals.append((first_slot_start + position * SLOT, first_slot_start + (position + run) * SLOT))
+        bitmap >>= run
+        position += run
+    return intervals
+
+
+def get_availability(
+    db: Session,
+    sala_ids: List[int],
+    inicio: datetime,
+    fim: datetime,
+    duracao_minutos: int = SLOT_MINUTES
+) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    """
+    Free intervals of each room inside [inicio, fim), at slot granularity,
+    keeping only those long enough for duracao_minutos.
+    """
+    inicio = inicio.astimezone(timezone.utc)
+    fim = fim.astimezone(timezone.utc)
+    days = days_between(inicio, fim)
+    bitmaps = slot_index.get_bitmaps(db, sala_ids, days)
+
+    window_start = day_start(days[0])
+    total_slots = len(days) * SLOTS_PER_DAY
+    # Only slots fully inside the window are eligible
+    first_slot = -int(-(inicio - window_start) // SLOT)
+    last_slot = int((fim - window_start) // SLOT)
+    window_mask = ((1 << max(last_slot - first_slot, 0)) - 1) << first_slot
+    min_slots = max(1, -(-duracao_minutos // SLOT_MINUTES))
+
+    availability = {}
+    for sala_id in sala_ids:
+        occupied = 0
+        for offset, day in enumerate(days):
+            occupied |= bitmaps[(sala_id, day)] << (offset * SLOTS_PER_DAY)
+        free = ~occupied & ((1 << total_slots) - 1) & window_mask
+        availability[sala_id] = free_intervals(free, window_start, min_slots)
+    return availability
+
+
+slot_index = SlotIndex()
+
+
+def warm_up(db: Session) -> None:
+    """Loads the bitmaps of every active room for the next AVAILABILITY_WARM_DAYS days."""
+    from .. import crud
+
+    if AVAILABILITY_WARM_DAYS <= 0:
+        return
+    today = datetime.now(timezone.utc).date()
+    days = [today + timedelta(days=offset) for offset in range(AVAILABILITY_WARM_DAYS)]
+    sala_ids = [sala.id for sala in crud.list_salas(db, limit=None)]
+    slot_index.get_bitmaps(db, sala_ids, days)
+    logger.info(f"Availability index warmed for {len(sala_ids)} rooms and {len(days)} days")
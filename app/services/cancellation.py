@@ -0,0 +1,138 @@
+"""
+Cancellation of in-flight queries when the client disconnects.
+
+Sync routes run in the threadpool and never look at the client connection, so
+a slow query keeps its pool connection and thread busy long after the client
+has gone away. CancelOnDisconnectMiddleware (pure ASGI, outermost) reads the
+request's receive channel itself and, when an http.disconnect arrives before
+the response is complete, asks Postgres to cancel the statement running on
+every session opened for the request (registered by database.get_db).
+"""
+import asyncio
+import logging
+import os
+import threading
+from typing import Set
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+CANCEL_ON_DISCONNECT = os.getenv("CANCEL_ON_DISCONNECT", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+class QueryCanceller:
+    """
+    Sessions of one request whose running statement can be cancelled.
+    The lock is also taken by the session events that record and forget the
+    session's connection, so a cancel never reaches a connection that has
+    already gone back to the pool (and to another request).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions: Set = set()
+        self.enabled = True
+        self.cancelled = False
+
+    def add(self, db) -> None:
+        with self.lock:
+            self.sessions.add(db)
+
+    def discard(self, db) -> None:
+        with self.lock:
+            self.sessions.discard(db)
+
+    def disable(self) -> None:
+        """Used when the request's result is shared with other requests (coalescing)."""
+        with self.lock:
+            self.enabled = False
+
+    def cancel(self) -> int:
+        """Sends a cancel request for each registered session with an open transaction (blocking)."""
+        with self.lock:
+            if not self.enabled:
+                return 0
+            self.enabled = False
+            self.cancelled = True
+            cancelled = 0
+            for db in self.sessions:
+                connection = db.info.get("driver_connection")
+                if connection is None:
+                    continue
+                try:
+                    # psycopg 3 (cancel_safe) or psycopg2 (cancel)
+                    getattr(connection, "cancel_safe", connection.cancel)()
+                    cancelled += 1
+                except Exception as e:
+                    logger.warning(f"Failed to cancel query: {str(e)}")
+            return cancelled
+
+
+class CancellationStats:
+    def __init__(self):
+        self.disconnects = 0
+        self.queries_cancelled = 0
+
+    def stats(self) -> dict:
+        return {
+            "enabled": CANCEL_ON_DISCONNECT,
+            "disconnects": self.disconnects,
+            "queries_cancelled": self.queries_cancelled,
+        }
+
+
+cancellation_stats = CancellationStats()
+
+
+def get_canceller(request: Request):
+    """The request's QueryCanceller (None when the middleware is off)."""
+    return getattr(request.state, "query_canceller", None)
+
+
+def disable(request: Request) -> None:
+    canceller = get_canceller(request)
+    if canceller is not None:
+        canceller.disable()
+
+
+class CancelOnDisconnectMiddleware:
+    """
+    Owns the request's receive channel: messages are relayed to the application
+    through a queue, so the body and the disconnect are still seen downstream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not CANCEL_ON_DISCONNECT:
+            await self.app(scope, receive, send)
+            return
+
+        canceller = QueryCanceller()
+        scope.setdefault("state", {})["query_canceller"] = canceller
+        messages: asyncio.Queue = asyncio.Queue()
+
+        async def listen():
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    break
+            if canceller.enabled:
+                cancellation_stats.disconnects += 1
+                cancellation_stats.queries_cancelled += await run_in_threadpool(canceller.cancel)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Response complete: a disconnect from now on is not an abandoned request
+                canceller.disable()
+            await send(message)
+
+        listener = asyncio.create_task(listen())
+        try:
+            await self.app(scope, messages.get, send_wrapper)
+        finally:
+            listener.cancel()
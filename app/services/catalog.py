@@ -0,0 +1,161 @@
+"""
+In-process, versioned cache of the location/room catalog (reference data).
+
+Locations and rooms change a few times a month but are read on almost every
+request: catalog listings, front-end startup and the validation inside every
+reservation write. The whole catalog (every non-deleted location and room) is
+loaded at once and kept until it is invalidated:
+- by location/room writes made through this worker (crud calls invalidate());
+- by writes made by other workers, through the 'catalogo_changes' NOTIFY
+  channel (notify_catalogo_change trigger) relayed by the event broker;
+- after CATALOG_CACHE_TTL seconds, as a safety net for missed notifications.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))
+
+
+class Catalog:
+    """Immutable snapshot of the catalog (Pydantic LocalOut/SalaOut objects)."""
+
+    __slots__ = ("version", "locais", "salas", "arvore")
+
+    def __init__(self, version: int, locais: list, salas: list):
+        from .. import schemas
+
+        self.version = version
+        self.locais: Dict[int, "schemas.LocalOut"] = {local.id: local for local in locais}
+        self.salas: Dict[int, "schemas.SalaOut"] = {sala.id: sala for sala in salas}
+
+        # Active locations with their active rooms, ordered by name
+        salas_por_local: Dict[int, list] = {local.id: [] for local in locais if local.ativo}
+        for sala in salas:
+            if sala.ativo and sala.local_id in salas_por_local:
+                salas_por_local[sala.local_id].append(sala)
+        self.arvore: List["schemas.LocalComSalasOut"] = [
+            schemas.LocalComSalasOut(**local.model_dump(), salas=salas_por_local[local.id])
+            for local in locais
+            if local.ativo
+        ]
+
+
+class CatalogCache:
+    """
+    Thread-safe holder of the current catalog snapshot.
+    The version is bumped on every invalidation; a snapshot loaded concurrently
+    with an invalidation is returned to its caller but not stored, since it
+    could miss the write that triggered it.
+    """
+
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL):
+        self.ttl = ttl
+        self._snapshot: Optional[Catalog] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def on_event(self, event: dict) -> None:
+        """Event broker listener: any catalog notification (or resync) drops the snapshot."""
+        self.invalidate()
+
+    def snapshot(self, db: Session) -> Catalog:
+        now = time.monotonic()
+        with self._lock:
+            if self._snapshot is not None and now - self._loaded_at < self.ttl:
+                self.hits += 1
+                return self._snapshot
+            self.misses += 1
+            version = self._version
+
+        snapshot = load_catalog(db, version)
+        with self._lock:
+            if version == self._version:
+                self._snapshot = snapshot
+                self._loaded_at = now
+        return snapshot
+
+    def get(self, db: Session) -> list:
+        """Active locations with nested active rooms (schemas.LocalComSalasOut)."""
+        return self.snapshot(db).arvore
+
+    def get_local(self, db: Session, local_id: int):
+        """Non-deleted location by ID (same semantics as crud.get_local_by_id)."""
+        return self.snapshot(db).locais.get(local_id)
+
+    def get_sala(self, db: Session, sala_id: int):
+        """Non-deleted room by ID (same semantics as crud.get_sala_by_id)."""
+        return self.snapshot(db).salas.get(sala_id)
+
+    def list_locais(self, db: Session, skip: int = 0, limit: int = 100, ativo: Optional[bool] = None) -> list:
+        """Same filters and ordering as crud.list_locais, answered from memory."""
+        locais = list(self.snapshot(db).locais.values())
+        if ativo is not None:
+            locais = [local for local in locais if local.ativo == ativo]
+        return locais[skip:skip + limit]
+
+    def list_salas(
+        self,
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        local_id: Optional[int] = None,
+        ativo: Optional[bool] = None,
+        capacidade_minima: Optional[int] = None
+    ) -> list:
+        """Same filters and ordering as crud.list_salas, answered from memory."""
+        salas = list(self.snapshot(db).salas.values())
+        if local_id is not None:
+            salas = [sala for sala in salas if sala.local_id == local_id]
+        if ativo is not None:
+            salas = [sala for sala in salas if sala.ativo == ativo]
+        if capacidade_minima is not None:
+            salas = [sala for sala in salas if sala.capacidade is not None and sala.capacidade >= capacidade_minima]
+        return salas[skip:skip + limit]
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": self._version,
+            "cached": snapshot is not None,
+            "locais": len(snapshot.locais) if snapshot else 0,
+            "salas": len(snapshot.salas) if snapshot else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def load_catalog(db: Session, version: int = 0) -> Catalog:
+    """
+    Loads every non-deleted location and room (two row queries, no ORM entities).
+    The rows come ordered by name with the database collation; the snapshot
+    keeps that order, so listings filter it without sorting again.
+    """
+    from .. import crud, schemas
+
+    locais = crud.list_locais(db, limit=None)
+    salas = crud.list_salas(db, limit=None)
+
+    return Catalog(
+        version,
+        locais=[schemas.LocalOut.model_validate(local) for local in locais],
+        salas=[schemas.SalaOut.model_validate(sala) for sala in salas]
+    )
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,138 @@
+"""
+Request coalescing (single-flight) for idempotent GET routes.
+
+Concurrent requests with the same normalized path and query string wait on a
+single in-flight computation and share its serialized response body.
+Routes that depend on the caller's identity include the bearer token in the
+key, so responses are never shared between different users.
+"""
+import asyncio
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import Request, Response
+
+# (path pattern, per_user) - per_user routes only coalesce requests of the same caller
+COALESCED_ROUTES: List[Tuple[re.Pattern, bool]] = [
+    (re.compile(r"^/api/v1/reservas$"), False),
+    (re.compile(r"^/api/v1/reservas/\d+$"), False),
+    (re.compile(r"^/api/v1/salas$"), False),
+    (re.compile(r"^/api/v1/salas/\d+$"), False),
+    (re.compile(r"^/api/v1/locais$"), False),
+    (re.compile(r"^/api/v1/locais/\d+$"), False),
+    (re.compile(r"^/api/v1/locais/\d+/calendario$"), False),
+    (re.compile(r"^/api/v1/bootstrap$"), True),
+]
+
+# Response headers that must not be copied to followers
+_SKIPPED_HEADERS = {"content-length", "access-control-allow-origin", "access-control-allow-credentials"}
+
+
+class SharedResponse:
+    """Fully buffered response that can be replayed to every waiter."""
+
+    __slots__ = ("status_code", "headers", "body")
+
+    def __init__(self, status_code: int, headers: List[Tuple[str, str]], body: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    def to_response(self) -> Response:
+        # Content-Type comes from the copied headers (call_next responses have no media_type)
+        response = Response(content=self.body, status_code=self.status_code)
+        for name, value in self.headers:
+            if name.lower() not in _SKIPPED_HEADERS:
+                response.headers.append(name, value)
+        return response
+
+
+class SingleFlight:
+    """
+    Keeps one future per in-flight key. The first request (leader) computes
+    the response; requests arriving while it runs (followers) await it.
+    Runs on the event loop only, so no locking is needed.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def run(self, key: str, request: Request, call_next) -> Response:
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.followers += 1
+            try:
+                shared: SharedResponse = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # The leader was cancelled (client went away); compute it again
+                    return await self.run(key, request, call_next)
+                raise
+            return shared.to_response()
+
+        self.leaders += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await call_next(request)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            shared = SharedResponse(
+                status_code=response.status_code,
+                headers=list(response.headers.items()),
+                body=body,
+            )
+            future.set_result(shared)
+            return shared.to_response()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody is waiting on it
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> dict:
+        total = self.leaders + self.followers
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "coalescing_ratio": round(self.followers / total, 4) if total else 0.0,
+        }
+
+
+COALESCING_ENABLED = os.getenv("COALESCING_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+
+single_flight = SingleFlight()
+
+
+def get_coalescing_key(request: Request) -> Optional[str]:
+    """
+    Returns the single-flight key for a request, or None if it must not be coalesced.
+    The query string is normalized (sorted parameters) so that equivalent
+    requests share the same key.
+    """
+    if request.method != "GET":
+        return None
+
+    path = request.url.path
+    for pattern, per_user in COALESCED_ROUTES:
+        if pattern.match(path):
+            break
+    else:
+        return None
+
+    query = urlencode(sorted(parse_qsl(request.url.query, keep_blank_values=True)))
+    key = f"{path}?{query}"
+    if per_user:
+        authorization = request.headers.get("authorization", "")
+        key += "#" + hashlib.sha256(authorization.encode()).hexdigest()
+    return key
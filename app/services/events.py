@@ -0,0 +1,270 @@
+"""
+Reservation change events (Postgres LISTEN/NOTIFY).
+
+Each worker keeps a single dedicated LISTEN connection on the
+'reservas_changes' channel (fed by the notify_reservas_change trigger) and
+fans the events out in-process to subscribers keyed by room or location.
+The same connection listens on 'catalogo_changes' (location/room writes),
+whose events only go to in-process cache listeners.
+The connection is watched by the event loop itself, so idle subscribers cost
+only a bounded queue each.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "reservas_changes"
+CATALOG_CHANNEL = "catalogo_changes"
+CHANNELS = (CHANNEL, CATALOG_CHANNEL)
+
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+SSE_MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", "10000"))
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+LISTEN_RECONNECT_SECONDS = float(os.getenv("LISTEN_RECONNECT_SECONDS", "5"))
+
+# Event sent to a subscriber when events may have been lost (queue overflow, reconnect)
+RESYNC_EVENT = {"op": "resync"}
+
+SubscriptionKey = Tuple[str, int]
+
+
+class ReservaEventBroker:
+    """
+    Fans out reservation change notifications to in-process subscribers.
+    Subscribers are asyncio queues registered under ("sala", id) or ("local", id).
+    Listeners (plain callables) receive every event and are used by in-process
+    caches that need to be invalidated on writes made by other workers.
+    """
+
+    def __init__(self, queue_size: int = SSE_QUEUE_SIZE, max_subscribers: int = SSE_MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Dict[SubscriptionKey, Set[asyncio.Queue]] = defaultdict(set)
+        self._listeners: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+        self._subscriber_count = 0
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._starting: Optional[asyncio.Future] = None
+        self._closed = False
+        self.events_received = 0
+        self.events_dropped = 0
+
+    @property
+    def is_listening(self) -> bool:
+        return self._connection is not None
+
+    def has_capacity(self) -> bool:
+        return self._subscriber_count < self.max_subscribers
+
+    def add_listener(self, listener: Callable[[dict], None], channel: str = CHANNEL) -> None:
+        """Registers a callable invoked (on the event loop) for every event of a channel."""
+        self._listeners[channel].append(listener)
+
+    async def start(self) -> None:
+        """Opens the LISTEN connection if it is not open yet."""
+        if self._connection is not None:
+            return
+        if self._starting is not None:
+            await asyncio.shield(self._starting)
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._closed = False
+        self._starting = self._loop.create_future()
+        try:
+            connection = await run_in_threadpool(self._connect)
+            self._connection = connection
+            self._loop.add_reader(connection.fileno(), self._on_readable)
+            logger.info(f"Listening for changes on channels {', '.join(CHANNELS)}")
+            self._starting.set_result(None)
+        except Exception as e:
+            self._starting.set_exception(e)
+            self._starting.exception()
+            raise
+        finally:
+            self._starting = None
+
+    def _connect(self):
+        # Dedicated connection, detached from the pool so it never takes a pool slot
+        pooled = engine.raw_connection()
+        connection = pooled.driver_connection
+        pooled.detach()
+        try:
+            connection.autocommit = True
+            cursor = connection.cursor()
+            for channel in CHANNELS:
+                cursor.execute(f"LISTEN {channel}")
+            cursor.close()
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _drain_notifies(self) -> List[Tuple[str, str]]:
+        connection = self._connection
+        if callable(connection.notifies):
+            # psycopg 3: reads what is available without blocking
+            return [(notify.channel, notify.payload) for notify in connection.notifies(timeout=0)]
+        # psycopg2
+        connection.poll()
+        payloads = [(notify.channel, notify.payload) for notify in connection.notifies]
+        connection.notifies.clear()
+        return payloads
+
+    def _on_readable(self) -> None:
+        try:
+            payloads = self._drain_notifies()
+        except Exception as e:
+            logger.error(f"LISTEN connection lost: {str(e)}")
+            self._drop_connection()
+            self._schedule_reconnect()
+            return
+
+        for channel, payload in payloads:
+            try:
+                event = json.loads(payload)
+            except ValueError:
+                logger.warning(f"Invalid notification payload: {payload!r}")
+                continue
+            if channel == CHANNEL:
+                self.publish(event)
+            else:
+                self.events_received += 1
+                self._notify_listeners(channel, event)
+
+    def _notify_listeners(self, channel: str, event: dict) -> None:
+        for listener in self._listeners.get(channel, ()):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Event listener failed: {str(e)}", exc_info=True)
+
+    def publish(self, event: dict) -> None:
+        """Delivers an event to listeners and to the subscribers of its room and location."""
+        self.events_received += 1
+        self._notify_listeners(CHANNEL, event)
+
+        keys = {
+            ("sala", event.get("sala_id")),
+            ("local", event.get("local_id")),
+            ("sala", event.get("old_sala_id")),
+            ("local", event.get("old_local_id")),
+        }
+        for key in keys:
+            if key[1] is None:
+                continue
+            for queue in self._subscribers.get(key, ()):
+                self._offer(queue, event)
+
+    def _offer(self, queue: asyncio.Queue, event: dict) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: discard its backlog and ask it to resync
+            self.events_dropped += queue.qsize()
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_EVENT)
+
+    def _drop_connection(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._loop.remove_reader(self._connection.fileno())
+        except Exception:
+            pass
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+    def _schedule_reconnect(self) -> None:
+        if self._closed or self._loop is None:
+            return
+        self._loop.call_later(LISTEN_RECONNECT_SECONDS, lambda: asyncio.ensure_future(self._reconnect()))
+
+    async def _reconnect(self) -> None:
+        if self._closed or self._connection is not None:
+            return
+        try:
+            await self.start()
+        except Exception as e:
+            logger.error(f"Failed to reconnect LISTEN connection: {str(e)}")
+            self._schedule_reconnect()
+            return
+        # Events may have been missed while disconnected
+        for channel in list(self._listeners):
+            self._notify_listeners(channel, RESYNC_EVENT)
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._offer(queue, RESYNC_EVENT)
+
+    def subscribe(self, kind: str, target_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[(kind, target_id)].add(queue)
+        self._subscriber_count += 1
+        return queue
+
+    def unsubscribe(self, kind: str, target_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get((kind, target_id))
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        self._subscriber_count -= 1
+        if not queues:
+            del self._subscribers[(kind, target_id)]
+
+    async def close(self) -> None:
+        self._closed = True
+        self._drop_connection()
+
+    def stats(self) -> dict:
+        return {
+            "listening": self.is_listening,
+            "subscribers": self._subscriber_count,
+            "subscription_keys": len(self._subscribers),
+            "events_received": self.events_received,
+            "events_dropped": self.events_dropped,
+        }
+
+
+broker = ReservaEventBroker()
+
+
+def format_sse(event: dict) -> str:
+    """Formats an event as a Server-Sent Events message."""
+    op = event.get("op", "update")
+    lines = [f"event: reserva.{op}" if op != "resync" else "event: resync"]
+    if event.get("change_seq") is not None:
+        lines.append(f"id: {event['change_seq']}")
+    lines.append(f"data: {json.dumps(event)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(kind: str, target_id: int) -> AsyncIterator[str]:
+    """
+    Yields SSE messages for a room or location until the client disconnects.
+    Sends a comment line every SSE_KEEPALIVE_SECONDS so proxies keep the connection open.
+    """
+    queue = broker.subscribe(kind, target_id)
+    try:
+        yield f"retry: {int(LISTEN_RECONNECT_SECONDS * 1000)}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(kind, target_id, queue)
@@ -0,0 +1,69 @@
+"""
+Pipelined statement execution (psycopg 3 pipeline mode).
+
+Statements that do not depend on each other's results are sent to the server
+in a single network flush instead of paying one round trip each, which matters
+when the database sits in another availability zone. Statements are compiled
+by SQLAlchemy and run on the session's own connection, inside its current
+transaction. Other drivers (psycopg2, SQLite) use the regular sequential path.
+"""
+import os
+from typing import List, Sequence
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+
+PIPELINE_ENABLED = os.getenv("DB_PIPELINE_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def is_available(db: Session) -> bool:
+    """Pipeline mode needs the psycopg 3 driver built against libpq 14 or newer."""
+    if not PIPELINE_ENABLED or db.get_bind().dialect.driver != "psycopg":
+        return False
+    import psycopg
+    return psycopg.Pipeline.is_supported()
+
+
+def execute(db: Session, statements: Sequence[Executable], commit: bool = False) -> List[list]:
+    """
+    Sends the statements in one flush and returns the rows of each one (named
+    tuples; an empty list for statements without results). With commit=True the
+    COMMIT goes in the same flush and the session's transaction is closed.
+    Any error rolls the session back and is re-raised; driver errors are
+    wrapped like SQLAlchemy's own (OperationalError, IntegrityError, ...).
+    """
+    import psycopg
+    from psycopg.rows import namedtuple_row
+
+    connection = db.connection()
+    driver_connection = connection.connection.driver_connection
+    cursors = []
+    try:
+        with driver_connection.pipeline():
+            for statement in statements:
+                compiled = statement.compile(dialect=connection.dialect)
+                cursor = driver_connection.cursor(row_factory=namedtuple_row)
+                cursor.execute(str(compiled), compiled.params)
+                cursors.append(cursor)
+            if commit:
+                # As a pipelined statement rather than connection.commit(), which
+                # waits for a sync of its own before the pipeline's final one
+                commit_cursor = driver_connection.cursor()
+                cursors.append(commit_cursor)
+                commit_cursor.execute("COMMIT")
+        results = [cursor.fetchall() if cursor.description else [] for cursor in cursors[:len(statements)]]
+    except psycopg.Error as e:
+        db.rollback()
+        raise DBAPIError.instance(None, None, e, psycopg.Error) from e
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        for cursor in cursors:
+            cursor.close()
+
+    if commit:
+        # Already committed on the driver connection; this only ends the session's transaction
+        db.commit()
+    return results
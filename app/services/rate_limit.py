@@ -0,0 +1,195 @@
+"""
+In-process rate limiting and load shedding.
+
+Two independent guards protect the shared threadpool and database pool:
+- A token-bucket limiter keyed by the authenticated user's email (from the JWT)
+  or, for anonymous requests, by the client IP. Each route has a cost weight.
+- A concurrency limiter that rejects requests with 503 once the number of
+  in-flight requests exceeds a fraction of the database pool capacity.
+"""
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request
+
+from .auth import decode_token_email
+from .database import get_pool_capacity
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Paths that never count against the limits (docs, health checks, metrics)
+EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json", "/docs/oauth2-redirect"}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+class TokenBucket:
+    """Token bucket state for a single key."""
+
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, updated_at: float):
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter.
+    Buckets are kept in LRU order and the least recently used ones are evicted
+    once max_keys is reached, so memory stays bounded.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float, max_keys: int = 10000):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+
+    def consume(self, key: str, cost: float = 1.0) -> float:
+        """
+        Tries to take `cost` tokens from the bucket of `key`.
+        Returns 0 if the request is allowed, otherwise the number of seconds
+        until enough tokens will be available.
+        """
+        now = time.monotonic()
+        cost = min(cost, self.capacity)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.capacity, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            elapsed = now - bucket.updated_at
+            bucket.tokens = min(self.capacity, bucket.tokens + elapsed * self.refill_rate)
+            bucket.updated_at = now
+
+        if bucket.tokens >= cost:
+            bucket.tokens -= cost
+            self.allowed += 1
+            return 0.0
+
+        self.rejected += 1
+        if self.refill_rate <= 0:
+            return float("inf")
+        return (cost - bucket.tokens) / self.refill_rate
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "refill_per_second": self.refill_rate,
+            "tracked_keys": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+class ConcurrencyLimiter:
+    """
+    Counts in-flight requests and refuses new ones above max_in_flight.
+    Runs on the event loop only, so no locking is needed.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.shed = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "shed": self.shed,
+        }
+
+
+RATE_LIMIT_ENABLED = _env_bool("RATE_LIMIT_ENABLED", True)
+RATE_LIMIT_READ_COST = _env_float("RATE_LIMIT_READ_COST", 1)
+RATE_LIMIT_WRITE_COST = _env_float("RATE_LIMIT_WRITE_COST", 5)
+RATE_LIMIT_AUTH_COST = _env_float("RATE_LIMIT_AUTH_COST", 20)
+RATE_LIMIT_TRUST_FORWARDED = _env_bool("RATE_LIMIT_TRUST_FORWARDED", False)
+
+LOAD_SHED_ENABLED = _env_bool("LOAD_SHED_ENABLED", True)
+# Fraction of the DB pool capacity (pool_size + max_overflow) allowed in flight
+LOAD_SHED_POOL_FRACTION = _env_float("LOAD_SHED_POOL_FRACTION", 1.0)
+LOAD_SHED_RETRY_AFTER = _env_float("LOAD_SHED_RETRY_AFTER", 1)
+
+rate_limiter = RateLimiter(
+    capacity=_env_float("RATE_LIMIT_CAPACITY", 120),
+    refill_rate=_env_float("RATE_LIMIT_REFILL_PER_SECOND", 2),
+    max_keys=int(_env_float("RATE_LIMIT_MAX_KEYS", 10000)),
+)
+
+concurrency_limiter = ConcurrencyLimiter(
+    max_in_flight=max(1, int(get_pool_capacity() * LOAD_SHED_POOL_FRACTION))
+)
+
+
+def is_exempt(request: Request) -> bool:
+    """Preflight requests and infrastructure endpoints are never limited."""
+    return request.method == "OPTIONS" or request.url.path in EXEMPT_PATHS
+
+
+def get_client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def get_rate_limit_key(request: Request) -> str:
+    """
+    Returns the bucket key: the JWT email when a valid bearer token is sent,
+    otherwise the client IP.
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        email: Optional[str] = decode_token_email(token)
+        if email:
+            return f"user:{email.lower()}"
+    return f"ip:{get_client_ip(request)}"
+
+
+def get_request_cost(request: Request) -> float:
+    """Weights authentication and write routes above reads."""
+    if request.url.path.endswith("/v1/auth/google"):
+        return RATE_LIMIT_AUTH_COST
+    if request.method in WRITE_METHODS:
+        return RATE_LIMIT_WRITE_COST
+    return RATE_LIMIT_READ_COST
+
+
+def retry_after_header(seconds: float) -> str:
+    """Formats a Retry-After value (whole seconds, at least 1)."""
+    if math.isinf(seconds):
+        return "60"
+    return str(max(1, math.ceil(seconds)))
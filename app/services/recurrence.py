@@ -0,0 +1,292 @@
+"""
+Minimal iCalendar RRULE (RFC 5545) expansion engine for recurring reservations.
+
+Supported rule parts: FREQ (DAILY, WEEKLY, MONTHLY), INTERVAL, COUNT, UNTIL,
+BYDAY (weekday codes; with FREQ=MONTHLY also with an ordinal, e.g. 1MO or -1FR),
+BYMONTHDAY and BYSETPOS.
+All times are handled in UTC, like every other date in the API.
+"""
+import calendar
+import re
+from datetime import datetime, date, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+
+_BYDAY_PATTERN = re.compile(r"^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$")
+
+
+class RecurrenceRule:
+    """Parsed RRULE."""
+
+    __slots__ = ("freq", "interval", "count", "until", "byday", "bymonthday", "bysetpos")
+
+    def __init__(
+        self,
+        freq: str,
+        interval: int = 1,
+        count: Optional[int] = None,
+        until: Optional[datetime] = None,
+        byday: Optional[List[Tuple[int, int]]] = None,
+        bymonthday: Optional[List[int]] = None,
+        bysetpos: Optional[List[int]] = None,
+    ):
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = until
+        # (ordinal, weekday) pairs; ordinal 0 means every such weekday of the period
+        self.byday = byday
+        self.bymonthday = bymonthday
+        self.bysetpos = bysetpos
+
+    @property
+    def weekdays(self) -> Optional[List[int]]:
+        return sorted({weekday for _, weekday in self.byday}) if self.byday is not None else None
+
+    @property
+    def is_bounded(self) -> bool:
+        return self.count is not None or self.until is not None
+
+
+def _parse_until(value: str) -> datetime:
+    for fmt in ("%Y%m%dT%H%M%SZ", "%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    raise ValueError(f"RRULE inválida: UNTIL '{value}' não reconhecido")
+
+
+def parse_rrule(rule: str) -> RecurrenceRule:
+    """
+    Parses an RRULE string (with or without the 'RRULE:' prefix).
+    Raises ValueError for malformed or unsupported rules.
+    """
+    text = rule.strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[6:]
+
+    parts = {}
+    for part in text.split(";"):
+        if not part:
+            continue
+        name, sep, value = part.partition("=")
+        if not sep or not value:
+            raise ValueError(f"RRULE inválida: parte '{part}' malformada")
+        parts[name.strip().upper()] = value.strip().upper()
+
+    freq = parts.pop("FREQ", None)
+    if freq not in FREQUENCIES:
+        raise ValueError(f"RRULE inválida: FREQ deve ser um de {', '.join(FREQUENCIES)}")
+
+    try:
+        interval = int(parts.pop("INTERVAL", "1"))
+        count = int(parts["COUNT"]) if "COUNT" in parts else None
+    except ValueError:
+        raise ValueError("RRULE inválida: INTERVAL e COUNT devem ser inteiros")
+    parts.pop("COUNT", None)
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError("RRULE inválida: INTERVAL e COUNT devem ser maiores que 0")
+
+    until = _parse_until(parts.pop("UNTIL")) if "UNTIL" in parts else None
+    if count is not None and until is not None:
+        raise ValueError("RRULE inválida: COUNT e UNTIL não podem ser usados juntos")
+
+    byday = None
+    if "BYDAY" in parts:
+        byday = set()
+        for day in parts.pop("BYDAY").split(","):
+            match = _BYDAY_PATTERN.match(day)
+            if match is None:
+                raise ValueError("RRULE inválida: BYDAY aceita MO, TU, WE, TH, FR, SA, SU (com FREQ=MONTHLY, também 1MO, -1FR...)")
+            ordinal = int(match.group(1)) if match.group(1) else 0
+            if ordinal and freq != "MONTHLY":
+                raise ValueError("RRULE inválida: BYDAY com posição (ex.: 1MO) só é suportado com FREQ=MONTHLY")
+            if not -5 <= ordinal <= 5:
+                raise ValueError("RRULE inválida: a posição em BYDAY deve estar entre -5 e 5 (exceto 0)")
+            byday.add((ordinal, WEEKDAYS[match.group(2)]))
+        byday = sorted(byday)
+
+    bymonthday = None
+    if "BYMONTHDAY" in parts:
+        try:
+            bymonthday = sorted({int(day) for day in parts.pop("BYMONTHDAY").split(",")})
+        except ValueError:
+            raise ValueError("RRULE inválida: BYMONTHDAY deve conter inteiros")
+        if any(day == 0 or not -31 <= day <= 31 for day in bymonthday):
+            raise ValueError("RRULE inválida: BYMONTHDAY deve estar entre -31 e 31 (exceto 0)")
+        if freq != "MONTHLY":
+            raise ValueError("RRULE inválida: BYMONTHDAY só é suportado com FREQ=MONTHLY")
+
+    bysetpos = None
+    if "BYSETPOS" in parts:
+        try:
+            bysetpos = sorted({int(position) for position in parts.pop("BYSETPOS").split(",")})
+        except ValueError:
+            raise ValueError("RRULE inválida: BYSETPOS deve conter inteiros")
+        if any(position == 0 or not -31 <= position <= 31 for position in bysetpos):
+            raise ValueError("RRULE inválida: BYSETPOS deve estar entre -31 e 31 (exceto 0)")
+        if byday is None and bymonthday is None:
+            raise ValueError("RRULE inválida: BYSETPOS exige BYDAY ou BYMONTHDAY")
+
+    parts.pop("WKST", None)
+    if parts:
+        raise ValueError(f"RRULE inválida: partes não suportadas: {', '.join(sorted(parts))}")
+
+    return RecurrenceRule(freq, interval, count, until, byday, bymonthday, bysetpos)
+
+
+def _add_months(year: int, month: int, months: int):
+    total = year * 12 + (month - 1) + months
+    return total // 12, total % 12 + 1
+
+
+def _matches_byday(day: date, byday: List[Tuple[int, int]], days_in_month: int) -> bool:
+    """Whether a date matches a BYDAY entry, ordinals counted within its month."""
+    position = (day.day - 1) // 7 + 1
+    position_from_end = -((days_in_month - day.day) // 7 + 1)
+    return any(
+        day.weekday() == weekday and ordinal in (0, position, position_from_end)
+        for ordinal, weekday in byday
+    )
+
+
+def _select_positions(dates: List[date], bysetpos: Optional[List[int]]) -> List[date]:
+    """Applies BYSETPOS (1-based, negative from the end) to the sorted dates of a period."""
+    if bysetpos is None:
+        return dates
+    selected = {
+        dates[position - 1 if position > 0 else position]
+        for position in bysetpos
+        if -len(dates) <= position <= len(dates)
+    }
+    return sorted(selected)
+
+
+def _period_days(rule: RecurrenceRule, dtstart: datetime, period: int) -> List[date]:
+    """Candidate dates of the n-th period (day, week or month) of the rule."""
+    start_date = dtstart.date()
+
+    if rule.freq == "DAILY":
+        day = start_date + timedelta(days=period * rule.interval)
+        if rule.byday is not None and day.weekday() not in rule.weekdays:
+            return []
+        return [day]
+
+    if rule.freq == "WEEKLY":
+        week_start = start_date - timedelta(days=start_date.weekday()) + timedelta(weeks=period * rule.interval)
+        weekdays = rule.weekdays if rule.byday is not None else [start_date.weekday()]
+        return _select_positions([week_start + timedelta(days=weekday) for weekday in weekdays], rule.bysetpos)
+
+    year, month = _add_months(start_date.year, start_date.month, period * rule.interval)
+    days_in_month = calendar.monthrange(year, month)[1]
+    if rule.bymonthday is None and rule.byday is not None:
+        # Every matching weekday of the month (e.g. BYDAY=MO, 1MO, -1FR)
+        dates = [
+            date(year, month, monthday)
+            for monthday in range(1, days_in_month + 1)
+            if _matches_byday(date(year, month, monthday), rule.byday, days_in_month)
+        ]
+        return _select_positions(dates, rule.bysetpos)
+
+    monthdays = rule.bymonthday if rule.bymonthday is not None else [start_date.day]
+    days = set()
+    for monthday in monthdays:
+        day = monthday if monthday > 0 else days_in_month + monthday + 1
+        # Invalid days (e.g. the 31st in a 30-day month) are skipped, as in RFC 5545
+        if 1 <= day <= days_in_month:
+            days.add(date(year, month, day))
+    dates = sorted(days)
+    if rule.byday is not None:
+        # BYDAY limits the BYMONTHDAY dates (e.g. Friday the 13th)
+        dates = [day for day in dates if _matches_byday(day, rule.byday, days_in_month)]
+    return _select_positions(dates, rule.bysetpos)
+
+
+def _first_period(rule: RecurrenceRule, dtstart: datetime, not_before: Optional[datetime]) -> int:
+    """
+    First period that can contain occurrences at or after not_before.
+    Rules with COUNT must always be expanded from the beginning.
+    """
+    if not_before is None or rule.count is not None or not_before <= dtstart:
+        return 0
+    if rule.freq == "DAILY":
+        return max((not_before.date() - dtstart.date()).days // rule.interval - 1, 0)
+    if rule.freq == "WEEKLY":
+        return max((not_before.date() - dtstart.date()).days // (7 * rule.interval) - 1, 0)
+    months = (not_before.year - dtstart.year) * 12 + (not_before.month - dtstart.month)
+    return max(months // rule.interval - 1, 0)
+
+
+def iter_occurrences(
+    rule: RecurrenceRule,
+    dtstart: datetime,
+    not_before: Optional[datetime] = None,
+) -> Iterator[datetime]:
+    """
+    Yields occurrence start times in ascending order, starting at dtstart
+    (which is always the first occurrence) and skipping those before not_before.
+    Unbounded rules yield forever; callers must stop on their own.
+    """
+    start_time = dtstart.timetz()
+    produced = 0
+    period = _first_period(rule, dtstart, not_before)
+    empty_periods = 0
+
+    if period == 0:
+        produced = 1
+        if not_before is None or dtstart >= not_before:
+            yield dtstart
+        if rule.count is not None and produced >= rule.count:
+            return
+
+    while True:
+        days = _period_days(rule, dtstart, period)
+        period += 1
+        if not days:
+            # Guard against rules that can never match (e.g. BYMONTHDAY=31;BYDAY=...)
+            empty_periods += 1
+            if empty_periods > 500:
+                return
+            continue
+        empty_periods = 0
+
+        for day in days:
+            occurrence = datetime.combine(day, start_time)
+            if occurrence <= dtstart:
+                continue
+            if rule.until is not None and occurrence > rule.until:
+                return
+            produced += 1
+            if not_before is None or occurrence >= not_before:
+                yield occurrence
+            if rule.count is not None and produced >= rule.count:
+                return
+
+
+def expand(
+    rule: RecurrenceRule,
+    dtstart: datetime,
+    duration: timedelta,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> List[datetime]:
+    """
+    Returns the occurrence starts whose interval [start, start + duration)
+    overlaps [window_start, window_end). Without a window end the rule must be
+    bounded or a limit must be given.
+    """
+    not_before = window_start - duration if window_start is not None else None
+    occurrences = []
+    for occurrence in iter_occurrences(rule, dtstart, not_before):
+        if window_end is not None and occurrence >= window_end:
+            break
+        if window_start is not None and occurrence + duration <= window_start:
+            continue
+        occurrences.append(occurrence)
+        if limit is not None and len(occurrences) >= limit:
+            break
+    return occurrences
@@ -0,0 +1,50 @@
+"""
+Reporting rollups (ocupacao_horaria, cafe_diario).
+
+The rollups are kept up to date incrementally by the relatorios_reservas_change
+trigger on reservas, so reports never scan the reservations table. Only
+one-off reservations are aggregated; recurring series are not part of the
+rollups and their occurrences in the report period are expanded and added
+when a report is read (crud.get_relatorio_ocupacao / get_relatorio_cafe).
+
+If the rollups drift (e.g. after manual data fixes with triggers disabled),
+rebuild them with:
+
+    python -m app.services.reports rebuild
+"""
+import logging
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Longest period accepted by the report endpoints
+MAX_DIAS_RELATORIO = 366
+
+
+def rebuild_rollups(db: Session) -> None:
+    """Recomputes every rollup from reservas in a single transaction."""
+    db.execute(text("SELECT relatorios_rebuild()"))
+    db.commit()
+
+
+def main(argv) -> int:
+    if argv[1:] != ["rebuild"]:
+        print("Uso: python -m app.services.reports rebuild")
+        return 2
+
+    from .database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db)
+    finally:
+        db.close()
+    print("Relatórios reconstruídos com sucesso")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,177 @@
+"""
+Shared test fixtures.
+
+Unit tests run anywhere. Tests that use the `db` or `client` fixtures need a
+disposable PostgreSQL database, since the schema relies on the triggers created
+by the Alembic migrations:
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/reservas_test pdm run pytest
+
+The migrations are applied once per session and every table is truncated after
+each test. Without TEST_DATABASE_URL those tests are skipped.
+
+Benchmarks are marked `bench` and only run with RUN_BENCHMARKS=1; they print
+their numbers, so run them with -s:
+
+    RUN_BENCHMARKS=1 TEST_DATABASE_URL=... pdm run pytest -m bench -s
+"""
+import json
+import os
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOAD_SHED_ENABLED", "false")
+os.environ.setdefault("ADMIN_EMAILS", "admin@example.com")
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS", "false").strip().lower() in ("1", "true", "yes", "on")
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import jwt
+import psycopg
+import pytest
+from sqlalchemy import event, text
+
+from app import models
+from app.services.availability import slot_index
+from app.services.catalog import catalog_cache
+from app.services.database import Base, SessionLocal, engine
+
+ROOT = Path(__file__).resolve().parents[1]
+
+ADMIN_EMAIL = "admin@example.com"
+USER_EMAIL = "usuario@example.com"
+
+
+def pytest_collection_modifyitems(config, items):
+    if RUN_BENCHMARKS:
+        return
+    skip = pytest.mark.skip(reason="RUN_BENCHMARKS is not set")
+    for item in items:
+        if "bench" in item.keywords:
+            item.add_marker(skip)
+
+
+def auth_headers(email: str = USER_EMAIL) -> dict:
+    """Authorization header with a system JWT for the given email."""
+    secret_key = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
+    token = jwt.encode({"email": email}, secret_key, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def future(days: int = 1, hour: int = 10, minute: int = 0) -> datetime:
+    """A UTC datetime `days` ahead, at a fixed time of the day."""
+    base = datetime.now(timezone.utc) + timedelta(days=days)
+    return base.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+@pytest.fixture(scope="session")
+def migrated_database():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.upgrade(config, "head")
+    return engine
+
+
+@contextmanager
+def selects():
+    """Collects the SQL of the SELECT statements run meanwhile."""
+    statements = []
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+
+
+def truncate_all() -> None:
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    with engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    catalog_cache.invalidate()
+    slot_index.invalidate_all()
+
+
+@pytest.fixture
+def db(migrated_database):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        truncate_all()
+
+
+@pytest.fixture
+def listener(migrated_database):
+    """A separate connection listening on the reservas channel, like the event broker."""
+    url = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    connection = psycopg.connect(url, autocommit=True)
+    connection.execute("LISTEN reservas_changes")
+    try:
+        yield connection
+    finally:
+        connection.close()
+
+
+def received(connection, timeout: float = 1) -> list:
+    """Payloads delivered to `listener`, waiting up to `timeout` for the first one."""
+    payloads = [notify.payload for notify in connection.notifies(timeout=timeout, stop_after=1)]
+    payloads += [notify.payload for notify in connection.notifies(timeout=0)]
+    return [json.loads(payload) for payload in payloads]
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def local(db) -> models.Local:
+    db_local = models.Local(nome="Sede", descricao="Prédio principal")
+    db.add(db_local)
+    db.commit()
+    db.refresh(db_local)
+    return db_local
+
+
+@pytest.fixture
+def sala(db, local) -> models.Sala:
+    db_sala = models.Sala(nome="Sala 1", local_id=local.id, capacidade=10)
+    db.add(db_sala)
+    db.commit()
+    db.refresh(db_sala)
+    return db_sala
+
+
+def reserva_payload(sala: models.Sala, inicio: datetime, horas: float = 1, **extra) -> dict:
+    """ReservaCreate fields for a reservation of `sala` starting at `inicio`."""
+    payload = {
+        "local_id": sala.local_id,
+        "sala_id": sala.id,
+        "local": "Sede",
+        "sala": sala.nome,
+        "data_inicio": inicio,
+        "data_fim": inicio + timedelta(hours=horas),
+        "responsavel": "Responsável",
+    }
+    payload.update(extra)
+    return payload
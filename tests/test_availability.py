@@ -0,0 +1,225 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import crud, models, schemas
+from app.services import availability
+from app.services.availability import (
+    SLOT, SLOT_MINUTES, SLOTS_PER_DAY, SlotIndex, day_start, free_intervals, get_availability, interval_mask
+)
+
+from .conftest import USER_EMAIL, auth_headers, future, reserva_payload
+
+DIA = date(2026, 3, 10)
+INICIO = day_start(DIA)
+
+
+def hora(h: float, dia: int = 0) -> datetime:
+    return INICIO + timedelta(days=dia, hours=h)
+
+
+def slot(h: float) -> int:
+    """Slot of the day that contains the time h."""
+    return int(h * 60 // SLOT_MINUTES)
+
+
+def bits(first: int, last: int) -> int:
+    """Mask of slots [first, last)."""
+    return ((1 << (last - first)) - 1) << first
+
+
+@pytest.mark.parametrize("inicio, fim, esperado", [
+    (hora(10), hora(11), bits(slot(10), slot(11))),
+    # Partly covered slots count as busy
+    (hora(10) + timedelta(minutes=1), hora(10) + SLOT + timedelta(minutes=1), bits(slot(10), slot(10) + 2)),
+    (hora(0), hora(24), bits(0, SLOTS_PER_DAY)),
+    # Clipped to the day on both sides
+    (hora(23, dia=-1), hora(1), bits(0, slot(1))),
+    (hora(23), hora(1, dia=1), bits(slot(23), SLOTS_PER_DAY)),
+    # Touching the day only at its edges
+    (hora(22, dia=-1), hora(0), 0),
+    (hora(24), hora(2, dia=1), 0),
+])
+def test_interval_mask(inicio, fim, esperado):
+    assert interval_mask(DIA, inicio, fim) == esperado
+
+
+def test_free_intervals_runs():
+    assert free_intervals(0, INICIO) == []
+    bitmap = bits(0, 2) | bits(5, 6) | bits(8, 12)
+
+    assert free_intervals(bitmap, INICIO) == [
+        (INICIO, INICIO + 2 * SLOT), (INICIO + 5 * SLOT, INICIO + 6 * SLOT), (INICIO + 8 * SLOT, INICIO + 12 * SLOT)
+    ]
+    assert free_intervals(bitmap, INICIO, min_slots=2) == [(INICIO, INICIO + 2 * SLOT), (INICIO + 8 * SLOT, INICIO + 12 * SLOT)]
+    assert free_intervals(bitmap, INICIO, min_slots=5) == []
+
+
+def test_free_run_across_midnight_is_one_interval():
+    # Last two slots of the first day and first three of the second
+    bitmap = bits(SLOTS_PER_DAY - 2, SLOTS_PER_DAY + 3)
+
+    assert free_intervals(bitmap, INICIO) == [(hora(24) - 2 * SLOT, hora(24) + 3 * SLOT)]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    """A fresh index whose bitmaps come from `ocupacao` instead of the database."""
+    ocupacao = {}
+    index = SlotIndex()
+    monkeypatch.setattr(availability, "slot_index", index)
+    monkeypatch.setattr(
+        availability, "load_bitmaps",
+        lambda db, sala_ids, days: {key: ocupacao[key] for key in ocupacao if key[0] in sala_ids and key[1] in days}
+    )
+    index.ocupacao = ocupacao
+    return index
+
+
+def test_only_slots_fully_inside_the_window_are_free(index):
+    inicio = hora(10) + timedelta(minutes=1)
+    fim = hora(11) + SLOT - timedelta(minutes=1)
+
+    assert get_availability(None, [1], inicio, fim) == {1: [(hora(10) + SLOT, hora(11))]}
+
+
+def test_window_across_midnight(index):
+    index.ocupacao[(1, DIA + timedelta(days=1))] = bits(0, 2)
+    index.ocupacao[(2, DIA)] = bits(slot(23.5), SLOTS_PER_DAY)
+
+    livres = get_availability(None, [1, 2, 3], hora(23), hora(1, dia=1))
+
+    assert livres == {
+        1: [(hora(23), hora(24)), (hora(24) + 2 * SLOT, hora(25))],
+        2: [(hora(23), hora(23.5)), (hora(24), hora(25))],
+        3: [(hora(23), hora(25))],
+    }
+
+
+def test_duration_is_rounded_up_to_whole_slots(index):
+    # Two free slots from 09:00, busy until 10:00, free until 12:00
+    index.ocupacao[(1, DIA)] = bits(slot(9) + 2, slot(10))
+
+    livres = get_availability(None, [1], hora(9), hora(12), duracao_minutos=SLOT_MINUTES + 1)
+    assert livres == {1: [(hora(9), hora(9) + 2 * SLOT), (hora(10), hora(12))]}
+
+    livres = get_availability(None, [1], hora(9), hora(12), duracao_minutos=2 * SLOT_MINUTES + 1)
+    assert livres == {1: [(hora(10), hora(12))]}
+
+
+def test_bitmaps_loaded_during_an_invalidation_are_not_stored(monkeypatch):
+    index = SlotIndex()
+    loads = []
+
+    def load(db, sala_ids, days):
+        loads.append((sala_ids, days))
+        if len(loads) == 1:
+            # A write lands while the first load is running
+            index.invalidate(1, hora(10), hora(11))
+        return {(1, DIA): bits(0, 4)}
+
+    monkeypatch.setattr(availability, "load_bitmaps", load)
+
+    assert index.get_bitmaps(None, [1], [DIA]) == {(1, DIA): bits(0, 4)}
+    assert index.stats()["entries"] == 0
+
+    index.get_bitmaps(None, [1], [DIA])
+    index.get_bitmaps(None, [1, 2], [DIA])
+    # The second call stores the bitmap; the third only loads the missing room
+    assert loads == [([1], [DIA]), ([1], [DIA]), ([2], [DIA])]
+    assert (index.hits, index.misses) == (1, 3)
+
+
+def test_events_invalidate_the_days_they_touch(index):
+    dias = [DIA, DIA + timedelta(days=1), DIA + timedelta(days=2)]
+    index.get_bitmaps(None, [1, 2], dias)
+
+    # A reservation moved from room 2 (day 0) to room 1 (across days 1 and 2)
+    index.on_event({
+        "op": "update", "sala_id": 1, "data_inicio": hora(23, dia=1).isoformat(), "data_fim": hora(1, dia=2).isoformat(),
+        "old_sala_id": 2, "old_data_inicio": hora(9).isoformat(), "old_data_fim": hora(10).isoformat(),
+    })
+    assert set(index._bitmaps) == {(1, dias[0]), (2, dias[1]), (2, dias[2])}
+
+    index.on_event({"op": "resync"})
+    assert index.stats()["entries"] == 0
+
+
+def disponibilidade(client, local, inicio: datetime, fim: datetime, **params) -> dict:
+    response = client.get(
+        f"/api/v1/locais/{local.id}/disponibilidade",
+        params={"inicio": inicio.isoformat(), "fim": fim.isoformat(), **params},
+        headers=auth_headers()
+    )
+    assert response.status_code == 200, response.text
+    return {
+        sala["sala_id"]: [
+            (datetime.fromisoformat(livre["data_inicio"]), datetime.fromisoformat(livre["data_fim"]))
+            for livre in sala["livres"]
+        ]
+        for sala in response.json()["salas"]
+    }
+
+
+def test_route_reflects_writes(db, client, local, sala):
+    amanha = future(days=2, hour=0)
+    janela = (amanha + timedelta(hours=8), amanha + timedelta(hours=12))
+    reserva = crud.create_reserva(
+        db, schemas.ReservaCreate(**reserva_payload(sala, amanha + timedelta(hours=9))), USER_EMAIL
+    )
+
+    assert disponibilidade(client, local, *janela) == {
+        sala.id: [(janela[0], amanha + timedelta(hours=9)), (amanha + timedelta(hours=10), janela[1])]
+    }
+
+    # Moving the reservation drops the cached bitmap of the day
+    crud.update_reserva(
+        db, reserva.id,
+        schemas.ReservaUpdate(data_inicio=amanha + timedelta(hours=11), data_fim=amanha + timedelta(hours=12)),
+        USER_EMAIL
+    )
+    assert disponibilidade(client, local, *janela) == {sala.id: [(janela[0], amanha + timedelta(hours=11))]}
+
+    crud.delete_reserva(db, reserva.id, USER_EMAIL)
+    assert disponibilidade(client, local, *janela, duracao_minutos=240) == {sala.id: [janela]}
+
+
+def test_route_counts_series_and_filters_rooms(db, client, local, sala):
+    amanha = future(days=2, hour=0)
+    grande = models.Sala(nome="Auditório", local_id=local.id, capacidade=100)
+    inativa = models.Sala(nome="Sala 3", local_id=local.id, capacidade=100, ativo=False)
+    db.add_all([grande, inativa])
+    db.add(models.SerieReserva(
+        local_id=local.id, sala_id=sala.id, local="Sede", sala=sala.nome, rrule="FREQ=DAILY;COUNT=2",
+        data_inicio=amanha + timedelta(hours=8), data_fim=amanha + timedelta(hours=10),
+        data_fim_serie=amanha + timedelta(days=1, hours=10), responsavel="Equipe"
+    ))
+    db.commit()
+
+    janela = (amanha + timedelta(hours=7), amanha + timedelta(days=1, hours=9))
+    livres = disponibilidade(client, local, *janela)
+
+    assert livres == {
+        sala.id: [
+            (janela[0], amanha + timedelta(hours=8)),
+            (amanha + timedelta(hours=10), amanha + timedelta(days=1, hours=8)),
+        ],
+        grande.id: [janela],
+    }
+    assert list(disponibilidade(client, local, *janela, capacidade_minima=50)) == [grande.id]
+
+
+def test_route_validation(client, local):
+    inicio = future(days=1)
+
+    assert client.get(
+        f"/api/v1/locais/{local.id}/disponibilidade", params={"inicio": inicio.isoformat(), "fim": inicio.isoformat()}
+    ).status_code == 400
+    assert client.get(
+        f"/api/v1/locais/{local.id}/disponibilidade",
+        params={"inicio": inicio.isoformat(), "fim": (inicio + timedelta(days=32)).isoformat()}
+    ).status_code == 400
+    assert client.get(
+        "/api/v1/locais/999/disponibilidade",
+        params={"inicio": inicio.isoformat(), "fim": (inicio + timedelta(hours=1)).isoformat()}
+    ).status_code == 404
@@ -0,0 +1,141 @@
+"""
+update_reserva over a slow network: sequential queries against the pipelined
+path (DB_PIPELINE_ENABLED), with and without SALA_ADVISORY_LOCKS. The session
+talks to the database through a local TCP proxy that holds every packet for
+half the round trip in each direction.
+"""
+import queue
+import socket
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.services import pipeline
+from app.services.database import DB_PREPARE_THRESHOLD, engine
+
+from .conftest import USER_EMAIL, future, reserva_payload
+
+pytestmark = pytest.mark.bench
+
+CALLS = 40
+RTTS_MS = (0, 2, 10)
+
+
+class LatencyProxy:
+    """Forwards TCP connections to `upstream`, delaying each packet by rtt / 2 per direction."""
+
+    def __init__(self, upstream: tuple, rtt: float):
+        self.upstream = upstream
+        self.delay = rtt / 2
+        self.sockets = []
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            server = socket.create_connection(self.upstream)
+            for sock in (client, server):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sockets += [client, server]
+            self._pipe(client, server)
+            self._pipe(server, client)
+
+    def _pipe(self, source: socket.socket, target: socket.socket) -> None:
+        """A reader that stamps each packet and a writer that sends it once it is due, so packets overlap."""
+        packets = queue.Queue()
+
+        def read() -> None:
+            while True:
+                try:
+                    data = source.recv(65536)
+                except OSError:
+                    data = b""
+                packets.put((time.monotonic() + self.delay, data))
+                if not data:
+                    return
+
+        def write() -> None:
+            while True:
+                due, data = packets.get()
+                time.sleep(max(0.0, due - time.monotonic()))
+                if not data:
+                    break
+                try:
+                    target.sendall(data)
+                except OSError:
+                    break
+            try:
+                target.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+        threading.Thread(target=read, daemon=True).start()
+        threading.Thread(target=write, daemon=True).start()
+
+    def close(self) -> None:
+        self.listener.close()
+        for sock in self.sockets:
+            sock.close()
+
+
+@pytest.fixture
+def sessao_lenta():
+    """Opens a session factory whose connections go through a LatencyProxy with the given RTT (seconds)."""
+    abertos = []
+
+    def abrir(rtt: float) -> sessionmaker:
+        proxy = LatencyProxy((engine.url.host or "localhost", engine.url.port or 5432), rtt)
+        lento = create_engine(
+            engine.url.set(host="127.0.0.1", port=proxy.port), connect_args={"prepare_threshold": DB_PREPARE_THRESHOLD}
+        )
+        abertos.append((proxy, lento))
+        return sessionmaker(autoflush=False, bind=lento)
+
+    yield abrir
+    for proxy, lento in abertos:
+        lento.dispose()
+        proxy.close()
+
+
+def atualizar(Session, reserva_id: int, dia) -> float:
+    """CALLS updates moving the reservation back and forth; returns the mean ms per call."""
+    db = Session()
+    try:
+        inicio = time.perf_counter()
+        for i in range(CALLS):
+            hora = dia + timedelta(hours=10 if i % 2 else 12)
+            crud.update_reserva(
+                db, reserva_id, schemas.ReservaUpdate(data_inicio=hora, data_fim=hora + timedelta(hours=1)), USER_EMAIL
+            )
+        return (time.perf_counter() - inicio) / CALLS * 1000
+    finally:
+        db.close()
+
+
+def test_update_latency(db, sala, sessao_lenta, monkeypatch):
+    dia = future(days=2, hour=0)
+    reserva = crud.create_reserva(db, schemas.ReservaCreate(**reserva_payload(sala, dia + timedelta(hours=10))), USER_EMAIL)
+    db.close()
+
+    print(f"\nms per update_reserva ({CALLS} calls per run)")
+    print(f"{'RTT':>6} {'locks':>6} {'sequential':>11} {'pipelined':>10}")
+    for rtt in RTTS_MS:
+        Session = sessao_lenta(rtt / 1000)
+        for locks in (False, True):
+            monkeypatch.setattr(crud, "SALA_ADVISORY_LOCKS", locks)
+            tempos = []
+            for pipelined in (False, True):
+                monkeypatch.setattr(pipeline, "PIPELINE_ENABLED", pipelined)
+                atualizar(Session, reserva.id, dia)
+                tempos.append(atualizar(Session, reserva.id, dia))
+            print(f"{rtt:>4}ms {'on' if locks else 'off':>6} {tempos[0]:>11.2f} {tempos[1]:>10.2f}")
@@ -0,0 +1,85 @@
+"""
+Listing 10k reservations: ORM entities against the Core rows returned by
+crud.list_reservas, each followed by the JSON encode of List[ReservaOut].
+Reports the median time of a few runs and the tracemalloc peak of one run.
+"""
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from typing import List
+
+import pytest
+from sqlalchemy import insert
+
+from app import crud, models, schemas
+from app.services import serialization
+from app.services.database import SessionLocal
+
+from .conftest import USER_EMAIL, future
+
+pytestmark = pytest.mark.bench
+
+ROWS = 10_000
+RUNS = 5
+
+
+@pytest.fixture
+def reservas(db, sala):
+    inicio = future(days=1, hour=0)
+    db.execute(insert(models.Reserva), [
+        {
+            "local_id": sala.local_id, "sala_id": sala.id, "local": "Sede", "sala": sala.nome,
+            "data_inicio": inicio + timedelta(hours=i), "data_fim": inicio + timedelta(hours=i, minutes=30),
+            "responsavel": "Responsável", "cafe": i % 2 == 0, "quantidade_cafe": 4 if i % 2 == 0 else None,
+            "descricao": "Reunião de planejamento" if i % 3 else None, "criado_por_email": USER_EMAIL,
+        }
+        for i in range(ROWS)
+    ])
+    db.commit()
+
+
+def orm(db) -> list:
+    return db.query(models.Reserva).filter(models.Reserva.deleted_at.is_(None)).order_by(
+        models.Reserva.data_inicio
+    ).limit(ROWS).all()
+
+
+def core(db) -> list:
+    return crud.list_reservas(db, limit=ROWS)
+
+
+def listar(consulta) -> bytes:
+    """Query and encode on a fresh session, so no run reuses another's identity map."""
+    db = SessionLocal()
+    try:
+        return serialization.dump_json(List[schemas.ReservaOut], consulta(db))
+    finally:
+        db.close()
+
+
+def medir(consulta) -> tuple:
+    """(median seconds, tracemalloc peak in MiB)."""
+    listar(consulta)
+    tempos = []
+    for _ in range(RUNS):
+        inicio = time.perf_counter()
+        listar(consulta)
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        listar(consulta)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(tempos), pico / 2 ** 20
+
+
+def test_orm_against_core_rows(reservas):
+    assert listar(orm) == listar(core)
+
+    print()
+    for nome, consulta in (("ORM", orm), ("Core", core)):
+        mediana, pico = medir(consulta)
+        print(f"{nome}: {mediana * 1000:.1f} ms median, {ROWS / mediana:,.0f} rows/s, peak {pico:.1f} MiB ({ROWS} rows)")
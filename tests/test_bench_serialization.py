@@ -0,0 +1,96 @@
+"""
+Per-row cost of serializing ORM rows: FastAPI's regular path (validation,
+dump to Python objects, json.dumps in JSONResponse) against serialization.dump_json.
+Runs on in-memory rows, no database needed.
+"""
+import json
+import time
+from datetime import timedelta
+from typing import List
+
+import pytest
+from fastapi.responses import JSONResponse
+
+from app import models, schemas
+from app.services import serialization
+
+from .conftest import future
+
+pytestmark = pytest.mark.bench
+
+ROWS = 1000
+REPEAT = 7
+
+
+def reservas() -> list:
+    agora = future(days=-1)
+    return [
+        models.Reserva(
+            id=i, local_id=1, sala_id=2, local="Sede", sala="Sala 1", data_inicio=future(days=1 + i % 30),
+            data_fim=future(days=1 + i % 30) + timedelta(hours=1), responsavel="Responsável", cafe=i % 2 == 0,
+            quantidade_cafe=4 if i % 2 == 0 else None, descricao="Reunião de planejamento" if i % 3 else None,
+            criado_por_email="usuario@example.com", participantes_count=i % 8, created_at=agora, updated_at=agora
+        )
+        for i in range(ROWS)
+    ]
+
+
+def salas() -> list:
+    agora = future(days=-1)
+    return [
+        models.Sala(
+            id=i, nome=f"Sala {i}", local_id=1 + i % 5, capacidade=10 + i % 20, recursos="TV, projetor",
+            ativo=True, created_at=agora, updated_at=agora
+        )
+        for i in range(ROWS)
+    ]
+
+
+def participantes() -> list:
+    agora = future(days=-1)
+    usuario = models.Usuario(
+        id=1, google_id="g1", email="ana@example.com", nome="Ana", foto_url=None, created_at=agora, updated_at=agora
+    )
+    # Half with a loaded user, half with a manual name
+    return [
+        models.Participante(id=i, reserva_id=1, usuario_id=1, usuario=usuario, created_at=agora)
+        if i % 2 else models.Participante(id=i, reserva_id=1, nome_manual=f"Visitante {i}", created_at=agora)
+        for i in range(ROWS)
+    ]
+
+
+def regular(type_, content) -> bytes:
+    """What FastAPI does with a response_model: validate, dump to Python objects, json.dumps."""
+    adapter = serialization.get_adapter(type_)
+    validated = adapter.validate_python(content, from_attributes=True)
+    return JSONResponse(content=adapter.dump_python(validated, mode="json")).body
+
+
+def rapido(type_, content) -> bytes:
+    return serialization.dump_json(type_, content)
+
+
+def melhor(funcao, type_, content) -> float:
+    """Best of REPEAT runs, in microseconds per row."""
+    tempos = []
+    for _ in range(REPEAT):
+        inicio = time.perf_counter()
+        funcao(type_, content)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) / len(content) * 1e6
+
+
+@pytest.mark.parametrize("schema, linhas", [
+    (schemas.ReservaOut, reservas),
+    (schemas.SalaOut, salas),
+    (schemas.ParticipanteOut, participantes),
+])
+def test_serialization_per_row(schema, linhas):
+    type_ = List[schema]
+    content = linhas()
+    assert json.loads(regular(type_, content)) == json.loads(rapido(type_, content))
+
+    antes = melhor(regular, type_, content)
+    depois = melhor(rapido, type_, content)
+
+    print(f"\n{schema.__name__}: {antes:.2f} µs/row -> {depois:.2f} µs/row ({antes / depois:.1f}x), {ROWS} rows")
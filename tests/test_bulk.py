@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from app import crud, models, schemas
+
+from .conftest import USER_EMAIL, auth_headers, future, reserva_payload
+
+DIA = future(days=2, hour=8)
+
+
+def itens(sala, *horarios) -> list:
+    """ReservaCreate items of `sala` at DIA + each offset in hours (1 hour long unless given as a pair)."""
+    resultado = []
+    for horario in horarios:
+        inicio, horas = horario if isinstance(horario, tuple) else (horario, 1)
+        resultado.append(schemas.ReservaCreate(**reserva_payload(sala, DIA + timedelta(hours=inicio), horas)))
+    return resultado
+
+
+def status(resultados: list) -> list:
+    return [resultado["status"] for resultado in resultados]
+
+
+def test_conflicts_inside_the_batch_are_found_per_room(db, local, sala):
+    outra = models.Sala(nome="Sala 2", local_id=local.id)
+    db.add(outra)
+    db.commit()
+
+    # 0 and 2 overlap; 1 and 3 are adjacent to 0; 4 is in another room at the same time as 0
+    lote = itens(sala, (2, 2), 1, (3, 1), 4) + itens(outra, (2, 2))
+    resultados = crud.create_reservas_bulk(db, lote, USER_EMAIL, atomic=False)
+
+    assert status(resultados) == ["created", "created", "failed", "created", "created"]
+    assert resultados[2]["error"] == "Conflito de horário: conflita com outra reserva do mesmo lote"
+    assert db.query(models.Reserva).count() == 4
+
+
+def test_earlier_start_wins_regardless_of_the_order_in_the_batch(db, sala):
+    resultados = crud.create_reservas_bulk(db, itens(sala, (3, 2), (1, 3)), USER_EMAIL, atomic=False)
+
+    assert status(resultados) == ["failed", "created"]
+    assert db.query(models.Reserva).one().data_inicio == DIA + timedelta(hours=1)
+
+
+def test_conflicts_against_stored_reservations_and_series(db, sala):
+    crud.create_reserva(db, schemas.ReservaCreate(**reserva_payload(sala, DIA + timedelta(hours=2))), USER_EMAIL)
+    db.add(models.SerieReserva(
+        local_id=sala.local_id, sala_id=sala.id, local="Sede", sala=sala.nome, rrule="FREQ=DAILY;COUNT=3",
+        data_inicio=DIA + timedelta(hours=6), data_fim=DIA + timedelta(hours=7),
+        data_fim_serie=DIA + timedelta(days=2, hours=7), responsavel="Equipe"
+    ))
+    db.commit()
+
+    # Overlaps the reservation, adjacent to it, overlaps the series' second occurrence, free
+    lote = itens(sala, 2.5, 3, 24 + 6.5, 10)
+    resultados = crud.create_reservas_bulk(db, lote, USER_EMAIL, atomic=False)
+
+    assert status(resultados) == ["failed", "created", "failed", "created"]
+    assert all(resultados[index]["error"].startswith("Conflito de horário: já existe") for index in (0, 2))
+
+
+def test_invalid_items_are_reported_per_index(db, local, sala):
+    lote = itens(sala, 1, 2) + [
+        schemas.ReservaCreate(**{**reserva_payload(sala, DIA), "sala_id": 999}),
+        schemas.ReservaCreate(**{**reserva_payload(sala, DIA), "local_id": 999}),
+        schemas.ReservaCreate(**reserva_payload(sala, future(days=-1))),
+    ]
+    resultados = crud.create_reservas_bulk(db, lote, USER_EMAIL, atomic=False)
+
+    assert status(resultados) == ["created", "created", "failed", "failed", "failed"]
+    assert [resultado["error"] for resultado in resultados[2:]] == [
+        "Sala não encontrada ou inativa",
+        "Local não encontrado ou inativo",
+        "Não é permitido criar reservas no passado",
+    ]
+
+
+def test_atomic_batch_creates_nothing_when_an_item_fails(db, sala):
+    resultados = crud.create_reservas_bulk(db, itens(sala, 1, 3, (3.5, 1)), USER_EMAIL, atomic=True)
+
+    assert status(resultados) == ["skipped", "skipped", "failed"]
+    assert db.query(models.Reserva).count() == 0
+
+
+def test_bulk_route_modes(client, sala):
+    def payload(modo: str) -> dict:
+        reservas = [
+            {**reserva_payload(sala, inicio), "data_inicio": inicio.isoformat(), "data_fim": (inicio + timedelta(hours=1)).isoformat()}
+            for inicio in (DIA, DIA + timedelta(minutes=30), DIA + timedelta(hours=2))
+        ]
+        return {"reservas": reservas, "modo": modo}
+
+    response = client.post("/api/v1/reservas/bulk", json=payload("all_or_nothing"), headers=auth_headers())
+    assert response.status_code == 409
+    assert response.json()["created"] == 0
+    assert [item["status"] for item in response.json()["results"]] == ["skipped", "failed", "skipped"]
+
+    response = client.post("/api/v1/reservas/bulk", json=payload("best_effort"), headers=auth_headers())
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [item["reserva"]["criado_por_email"] for item in body["results"] if item["reserva"]] == [USER_EMAIL] * 2
@@ -0,0 +1,103 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import models
+
+from .conftest import auth_headers, future
+
+DIA = future(days=3, hour=0)
+
+
+def hora(h: float, dia: int = 0) -> datetime:
+    return DIA + timedelta(days=dia, hours=h)
+
+
+@pytest.fixture
+def agenda(db, local, sala):
+    """Reservations of Sala 1, a daily series in Auditório and rooms that are left out."""
+    auditorio = models.Sala(nome="Auditório", local_id=local.id)
+    inativa = models.Sala(nome="Sala 3", local_id=local.id, ativo=False)
+    excluida = models.Sala(nome="Sala 4", local_id=local.id, deleted_at=hora(0))
+    db.add_all([auditorio, inativa, excluida])
+    db.flush()
+
+    def reserva(sala_, inicio: float, fim: float, participantes=(), **extra) -> models.Reserva:
+        db_reserva = models.Reserva(
+            local_id=local.id, sala_id=sala_.id, local="Sede", sala=sala_.nome, data_inicio=hora(inicio),
+            data_fim=hora(fim), responsavel="Responsável", **extra
+        )
+        db_reserva.participantes = [models.Participante(nome_manual=nome) for nome in participantes]
+        db.add(db_reserva)
+        return db_reserva
+
+    reservas = {
+        # Started before the window
+        "antes": reserva(sala, 11, 13),
+        # Crosses UTC midnight: listed on the day it starts
+        "meia_noite": reserva(sala, 23, 25, participantes=["Ana", "Bia"]),
+        "sem_participantes": reserva(sala, 24 + 9, 24 + 10),
+    }
+    reserva(sala, 24 + 11, 24 + 12, deleted_at=hora(0))
+    reserva(inativa, 14, 15)
+    reserva(excluida, 14, 15)
+
+    serie = models.SerieReserva(
+        local_id=local.id, sala_id=auditorio.id, local="Sede", sala=auditorio.nome, rrule="FREQ=DAILY;COUNT=5",
+        data_inicio=hora(14), data_fim=hora(15), data_fim_serie=hora(15, dia=4), responsavel="Equipe"
+    )
+    db.add(serie)
+    db.commit()
+    return {"auditorio": auditorio.id, "serie": serie.id, **{nome: reserva.id for nome, reserva in reservas.items()}}
+
+
+def test_calendar_grid(client, local, sala, agenda):
+    response = client.get(
+        f"/api/v1/locais/{local.id}/calendario",
+        params={"inicio": hora(12).isoformat(), "fim": hora(12, dia=2).isoformat()},
+        headers=auth_headers()
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["local_id"], body["local"]) == (local.id, "Sede")
+    # Active, non-deleted rooms by name
+    assert [(item["id"], item["nome"]) for item in body["salas"]] == [(agenda["auditorio"], "Auditório"), (sala.id, "Sala 1")]
+
+    dias = [date.fromisoformat(dia["dia"]) for dia in body["salas"][0]["dias"]]
+    assert dias == [hora(0).date(), hora(0, dia=1).date(), hora(0, dia=2).date()]
+
+    def entradas(sala_index: int) -> list:
+        return [
+            [(entrada["id"], entrada["serie_id"], datetime.fromisoformat(entrada["data_inicio"]), entrada["participantes"])
+             for entrada in dia["reservas"]]
+            for dia in body["salas"][sala_index]["dias"]
+        ]
+
+    # Series occurrences merged into the grid; the third one is after the window
+    assert entradas(0) == [
+        [(None, agenda["serie"], hora(14), 0)],
+        [(None, agenda["serie"], hora(14, dia=1), 0)],
+        [],
+    ]
+    # Participant counts from the outer join, 0 when there are none
+    assert entradas(1) == [
+        [(agenda["antes"], None, hora(11), 0), (agenda["meia_noite"], None, hora(23), 2)],
+        [(agenda["sem_participantes"], None, hora(9, dia=1), 0)],
+        [],
+    ]
+
+
+def test_calendar_validation(client, local):
+    inicio = future(days=1)
+
+    def get(local_id: int, fim: datetime):
+        return client.get(
+            f"/api/v1/locais/{local_id}/calendario",
+            params={"inicio": inicio.isoformat(), "fim": fim.isoformat()},
+            headers=auth_headers()
+        )
+
+    assert get(local.id, inicio).status_code == 400
+    assert get(local.id, inicio + timedelta(days=32)).status_code == 400
+    assert get(999, inicio + timedelta(days=1)).status_code == 404
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from app import crud, models, schemas
+
+from .conftest import ADMIN_EMAIL, USER_EMAIL, auth_headers, future, received, reserva_payload
+
+DIA = future(days=2, hour=0)
+
+
+def hora(h: float):
+    return DIA + timedelta(hours=h)
+
+
+@pytest.mark.parametrize("dados, erro", [
+    ({"sala_id": 1, "data_inicio": hora(8)}, "data_inicio e data_fim devem ser informados juntos"),
+    ({"sala_id": 1, "data_fim": hora(8)}, "data_inicio e data_fim devem ser informados juntos"),
+    ({"sala_id": 1, "data_inicio": hora(8), "data_fim": hora(8)}, "data_fim deve ser posterior a data_inicio"),
+    ({"data_inicio": hora(8), "data_fim": hora(9)}, "Informe ids ou sala_id/local_id com data_inicio e data_fim"),
+    ({"sala_id": 1}, "Informe ids ou sala_id/local_id com data_inicio e data_fim"),
+    ({}, "Informe ids ou sala_id/local_id com data_inicio e data_fim"),
+])
+def test_filter_validation_rejects(dados, erro):
+    with pytest.raises(ValidationError, match=erro):
+        schemas.ReservaCancelamentoLote(**dados)
+
+
+@pytest.mark.parametrize("dados", [
+    {"ids": [1, 2]},
+    {"sala_id": 1, "data_inicio": hora(8), "data_fim": hora(9)},
+    {"local_id": 1, "data_inicio": hora(8), "data_fim": hora(9), "dry_run": True},
+    {"ids": [1], "sala_id": 1},
+])
+def test_filter_validation_accepts(dados):
+    schemas.ReservaCancelamentoLote(**dados)
+
+
+@pytest.fixture
+def reservas(db, local, sala):
+    """Sala 1 booked at 8, 10, 12 and 14h (the 14h one already cancelled); Sala 2 at 10h."""
+    outra = models.Sala(nome="Sala 2", local_id=local.id)
+    db.add(outra)
+    db.commit()
+
+    def criar(sala_, inicio) -> int:
+        return crud.create_reserva(db, schemas.ReservaCreate(**reserva_payload(sala_, hora(inicio))), USER_EMAIL).id
+
+    ids = {"8h": criar(sala, 8), "10h": criar(sala, 10), "12h": criar(sala, 12), "14h": criar(sala, 14)}
+    ids["outra"] = criar(outra, 10)
+    crud.delete_reserva(db, ids["14h"], USER_EMAIL)
+    return ids
+
+
+def ativas(db) -> set:
+    return {row.id for row in db.query(models.Reserva.id).filter(models.Reserva.deleted_at.is_(None))}
+
+
+def test_window_cancels_overlapping_reservations_of_the_room(db, sala, reservas):
+    # 8:30-12:00 overlaps 8h and 10h; 12h is adjacent
+    filtro = schemas.ReservaCancelamentoLote(sala_id=sala.id, data_inicio=hora(8.5), data_fim=hora(12))
+
+    assert crud.cancelar_reservas_em_lote(db, filtro) == (2, sorted([reservas["8h"], reservas["10h"]]))
+    assert ativas(db) == {reservas["12h"], reservas["outra"]}
+
+
+def test_dry_run_counts_without_cancelling(db, local, reservas):
+    filtro = schemas.ReservaCancelamentoLote(local_id=local.id, data_inicio=hora(0), data_fim=hora(24), dry_run=True)
+
+    assert crud.cancelar_reservas_em_lote(db, filtro) == (4, [])
+    assert len(ativas(db)) == 4
+    # Same count as the real run
+    assert crud.cancelar_reservas_em_lote(db, filtro.model_copy(update={"dry_run": False}))[0] == 4
+
+
+def test_ids_skip_cancelled_reservations_and_combine_with_filters(db, sala, reservas):
+    filtro = schemas.ReservaCancelamentoLote(ids=[reservas["12h"], reservas["14h"], reservas["outra"]], sala_id=sala.id)
+
+    assert crud.cancelar_reservas_em_lote(db, filtro) == (1, [reservas["12h"]])
+    assert ativas(db) == {reservas["8h"], reservas["10h"], reservas["outra"]}
+
+
+def test_bulk_cancel_emits_one_delete_event_per_reservation(db, sala, reservas, listener):
+    received(listener, timeout=0.1)
+    crud.cancelar_reservas_em_lote(db, schemas.ReservaCancelamentoLote(ids=[reservas["8h"], reservas["10h"]]))
+
+    eventos = received(listener)
+    assert sorted((evento["op"], evento["id"]) for evento in eventos) == [
+        ("delete", reservas["8h"]), ("delete", reservas["10h"])
+    ]
+
+
+def test_route_is_admin_only(client, sala, reservas):
+    body = {"sala_id": sala.id, "data_inicio": hora(0).isoformat(), "data_fim": hora(24).isoformat()}
+
+    assert client.post("/api/v1/reservas/cancelar-em-lote", json=body, headers=auth_headers()).status_code == 403
+    assert client.post("/api/v1/reservas/cancelar-em-lote", json={"sala_id": sala.id}, headers=auth_headers(ADMIN_EMAIL)).status_code == 400
+
+    response = client.post("/api/v1/reservas/cancelar-em-lote", json={**body, "dry_run": True}, headers=auth_headers(ADMIN_EMAIL))
+    assert response.json() == {"dry_run": True, "total": 3, "ids": []}
+
+    response = client.post("/api/v1/reservas/cancelar-em-lote", json=body, headers=auth_headers(ADMIN_EMAIL))
+    assert response.status_code == 200
+    assert response.json() == {"dry_run": False, "total": 3, "ids": sorted([reservas["8h"], reservas["10h"], reservas["12h"]])}
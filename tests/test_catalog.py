@@ -0,0 +1,172 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app import crud, schemas
+from app.services import catalog, events
+from app.services.catalog import Catalog, CatalogCache, catalog_cache
+
+from .conftest import ADMIN_EMAIL, auth_headers
+
+AGORA = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def local_out(id: int, nome: str, ativo: bool = True) -> schemas.LocalOut:
+    return schemas.LocalOut(id=id, nome=nome, ativo=ativo, created_at=AGORA, updated_at=AGORA)
+
+
+def sala_out(id: int, local_id: int, nome: str, capacidade=None, ativo: bool = True) -> schemas.SalaOut:
+    return schemas.SalaOut(
+        id=id, local_id=local_id, nome=nome, capacidade=capacidade, ativo=ativo, created_at=AGORA, updated_at=AGORA
+    )
+
+
+def test_listings_keep_the_database_order(monkeypatch):
+    # Loaded in pt_BR collation order, which differs from code point order
+    locais = [local_out(3, "Árvore"), local_out(1, "Beta", ativo=False), local_out(2, "sala b")]
+    salas = [sala_out(6, 3, "Ágata", 4), sala_out(4, 2, "auditório", 100), sala_out(5, 3, "Sala C", 10)]
+    monkeypatch.setattr(catalog, "load_catalog", lambda db, version=0: Catalog(version, locais, salas))
+    cache = CatalogCache()
+
+    assert [local.id for local in cache.list_locais(None)] == [3, 1, 2]
+    assert [local.id for local in cache.list_locais(None, ativo=True)] == [3, 2]
+    assert [local.id for local in cache.list_locais(None, skip=1, limit=1)] == [1]
+    assert [sala.id for sala in cache.list_salas(None, capacidade_minima=5)] == [4, 5]
+    assert [sala.id for sala in cache.list_salas(None, local_id=3, limit=1)] == [6]
+    assert [local.id for local in cache.get(None)] == [3, 2]
+
+
+def test_snapshot_loaded_during_an_invalidation_is_not_stored(monkeypatch):
+    cache = CatalogCache()
+    versions = []
+
+    def load(db, version=0):
+        versions.append(version)
+        if len(versions) == 1:
+            # A write lands while the first load is running
+            cache.invalidate()
+        return Catalog(version, [local_out(1, "Sede")], [])
+
+    monkeypatch.setattr(catalog, "load_catalog", load)
+
+    # The racing snapshot still answers its caller
+    assert [local.id for local in cache.list_locais(None)] == [1]
+    assert cache.stats()["cached"] is False
+
+    cache.list_locais(None)
+    cache.list_locais(None)
+    assert versions == [0, 1]
+    assert cache.stats()["cached"] is True
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_ttl_expiry_reloads(monkeypatch):
+    cache = CatalogCache(ttl=0.05)
+    loads = []
+    monkeypatch.setattr(catalog, "load_catalog", lambda db, version=0: loads.append(version) or Catalog(version, [], []))
+
+    cache.get(None)
+    cache.get(None)
+    time.sleep(0.06)
+    cache.get(None)
+
+    assert len(loads) == 2
+
+
+def test_location_and_room_writes_invalidate_the_cache(db, local, sala):
+    assert [item.nome for item in catalog_cache.list_salas(db)] == ["Sala 1"]
+    version = catalog_cache.version
+
+    outra = crud.create_sala(db, schemas.SalaCreate(local_id=local.id, nome="Sala 0"))
+    assert [item.nome for item in catalog_cache.list_salas(db)] == ["Sala 0", "Sala 1"]
+
+    crud.update_sala(db, sala.id, schemas.SalaUpdate(capacidade=20))
+    assert catalog_cache.get_sala(db, sala.id).capacidade == 20
+
+    crud.update_local(db, local.id, schemas.LocalUpdate(nome="Matriz"))
+    assert catalog_cache.get_local(db, local.id).nome == "Matriz"
+
+    crud.delete_sala(db, outra.id)
+    assert catalog_cache.get_sala(db, outra.id) is None
+
+    crud.delete_local(db, local.id)
+    assert catalog_cache.list_locais(db) == [] and catalog_cache.list_salas(db) == []
+    assert catalog_cache.version == version + 5
+
+
+def test_writes_by_other_workers_arrive_through_catalogo_changes(db, local, monkeypatch):
+    catalog_cache.list_locais(db)
+    broker = events.ReservaEventBroker()
+    broker.add_listener(catalog_cache.on_event, channel=events.CATALOG_CHANNEL)
+    broker._connection = broker._connect()
+    try:
+        version = catalog_cache.version
+        # A write that bypasses crud, as made by another worker
+        with db.get_bind().begin() as connection:
+            connection.execute(text("UPDATE locais SET nome = 'Matriz'"))
+
+        deadline = time.monotonic() + 2
+        while catalog_cache.version == version and time.monotonic() < deadline:
+            time.sleep(0.02)
+            broker._on_readable()
+    finally:
+        broker._drop_connection()
+
+    assert catalog_cache.version > version
+    assert catalog_cache.get_local(db, local.id).nome == "Matriz"
+
+
+@pytest.fixture
+def catalogo(db):
+    """Locations and rooms with varied names, states and capacities."""
+    locais = {}
+    for nome, ativo in (("Sede", True), ("Anexo", True), ("Filial", False), ("depósito", True)):
+        locais[nome] = crud.create_local(db, schemas.LocalCreate(nome=nome))
+        if not ativo:
+            crud.update_local(db, locais[nome].id, schemas.LocalUpdate(ativo=False))
+    salas = (
+        ("Sede", "Sala B", 8, True), ("Sede", "Sala A", 20, True), ("Sede", "auditório", 100, True),
+        ("Anexo", "Sala 2", None, True), ("Anexo", "Sala 1", 4, False), ("Filial", "Reunião", 6, True),
+    )
+    for local_nome, nome, capacidade, ativo in salas:
+        sala = crud.create_sala(db, schemas.SalaCreate(local_id=locais[local_nome].id, nome=nome, capacidade=capacidade))
+        if not ativo:
+            crud.update_sala(db, sala.id, schemas.SalaUpdate(ativo=False))
+    return {nome: local.id for nome, local in locais.items()}
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"ativo": True},
+    {"ativo": False},
+    {"skip": 1, "limit": 2},
+    {"ativo": True, "skip": 2, "limit": 5},
+])
+def test_locais_route_matches_the_sql_listing(client, db, catalogo, params):
+    response = client.get("/api/v1/locais", params=params, headers=auth_headers(ADMIN_EMAIL))
+
+    esperado = [schemas.LocalOut.model_validate(row).model_dump(mode="json") for row in crud.list_locais(db, **params)]
+    assert response.status_code == 200
+    assert response.json() == esperado
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"ativo": True},
+    {"local": "Sede"},
+    {"local": "Anexo", "ativo": False},
+    {"capacidade_minima": 10},
+    {"capacidade_minima": 5, "skip": 1, "limit": 1},
+    {"skip": 3, "limit": 2},
+])
+def test_salas_route_matches_the_sql_listing(client, db, catalogo, params):
+    params = dict(params)
+    if "local" in params:
+        params["local_id"] = catalogo[params.pop("local")]
+    response = client.get("/api/v1/salas", params=params, headers=auth_headers(ADMIN_EMAIL))
+
+    esperado = [schemas.SalaOut.model_validate(row).model_dump(mode="json") for row in crud.list_salas(db, **params)]
+    assert response.status_code == 200
+    assert response.json() == esperado
@@ -0,0 +1,131 @@
+from app import crud, models
+from app.services.database import SessionLocal
+
+from .conftest import future, received
+
+
+def add_reserva(db, sala, dias: int) -> models.Reserva:
+    inicio = future(days=dias)
+    reserva = models.Reserva(
+        local_id=sala.local_id,
+        sala_id=sala.id,
+        local="Sede",
+        sala=sala.nome,
+        data_inicio=inicio,
+        data_fim=inicio.replace(hour=11),
+        responsavel="Responsável"
+    )
+    db.add(reserva)
+    db.commit()
+    return reserva
+
+
+def sync(since: int):
+    """One client poll, on its own session like a separate request."""
+    db = SessionLocal()
+    try:
+        changes = crud.list_reservas_changes(db, since=since)
+        next_token = changes[-1].change_seq if changes else since
+        return [change.id for change in changes], next_token
+    finally:
+        db.close()
+
+
+def test_inserts_and_updates_bump_change_seq(db, sala):
+    a = add_reserva(db, sala, 1)
+    b = add_reserva(db, sala, 2)
+    assert a.change_seq < b.change_seq
+
+    a.responsavel = "Outro"
+    db.commit()
+    assert a.change_seq > b.change_seq
+
+    ids, token = sync(0)
+    assert ids == [b.id, a.id]
+    assert token == a.change_seq
+    assert sync(token) == ([], token)
+
+
+def test_change_committed_out_of_seq_order_is_not_skipped(db, sala):
+    a = add_reserva(db, sala, 1)
+    b = add_reserva(db, sala, 2)
+    _, token = sync(0)
+
+    lenta = SessionLocal()
+    rapida = SessionLocal()
+    try:
+        # The slow transaction draws the lower change_seq but commits last
+        lenta.get(models.Reserva, a.id).responsavel = "Lenta"
+        lenta.flush()
+        rapida.get(models.Reserva, b.id).responsavel = "Rápida"
+        rapida.commit()
+        seq_lenta = lenta.get(models.Reserva, a.id).change_seq
+        seq_rapida = rapida.get(models.Reserva, b.id).change_seq
+        assert seq_lenta < seq_rapida
+
+        # The fast change is withheld while a lower value may still commit
+        ids, token_meio = sync(token)
+        assert ids == []
+        assert token_meio < seq_lenta
+
+        lenta.commit()
+    finally:
+        lenta.close()
+        rapida.close()
+
+    ids, token_final = sync(token_meio)
+    assert ids == [a.id, b.id]
+    assert token_final == seq_rapida
+
+
+def test_rolled_back_transaction_releases_the_horizon(db, sala):
+    a = add_reserva(db, sala, 1)
+    b = add_reserva(db, sala, 2)
+    _, token = sync(0)
+
+    abortada = SessionLocal()
+    try:
+        abortada.get(models.Reserva, a.id).responsavel = "Abortada"
+        abortada.flush()
+        b.responsavel = "Confirmada"
+        db.commit()
+        assert sync(token)[0] == []
+        abortada.rollback()
+    finally:
+        abortada.close()
+
+    assert sync(token)[0] == [b.id]
+
+
+def test_changes_route_returns_next_token(client, db, sala):
+    a = add_reserva(db, sala, 1)
+    b = add_reserva(db, sala, 2)
+
+    body = client.get("/api/v1/reservas/changes", params={"limit": 1}).json()
+    assert [item["id"] for item in body["items"]] == [a.id]
+    assert body["has_more"] is True
+
+    body = client.get("/api/v1/reservas/changes", params={"since": body["next_token"]}).json()
+    assert [item["id"] for item in body["items"]] == [b.id]
+    assert body["has_more"] is False
+
+
+def test_participant_count_updates_enter_the_feed_without_events(db, sala, listener):
+    reserva = add_reserva(db, sala, 1)
+    received(listener)
+    seq = reserva.change_seq
+
+    db.add_all([models.Participante(reserva_id=reserva.id, nome_manual=nome) for nome in ("Ana", "Bia")])
+    db.commit()
+    db.refresh(reserva)
+
+    assert reserva.participantes_count == 2
+    # Clients syncing through the feed see the new count; SSE streams are not woken
+    assert sync(seq) == ([reserva.id], reserva.change_seq)
+    assert received(listener, timeout=0.2) == []
+
+    seq = reserva.change_seq
+    reserva.responsavel = "Outro"
+    db.commit()
+    assert reserva.change_seq > seq
+    assert [event["id"] for event in received(listener)] == [reserva.id]
@@ -0,0 +1,90 @@
+import asyncio
+
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request
+
+from app.services.coalescing import SingleFlight, get_coalescing_key
+
+from .conftest import auth_headers
+
+
+def make_request(path: str, query: str = "", method: str = "GET", headers: dict = None) -> Request:
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+def test_follower_gets_the_leader_status_headers_and_body():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def call_next(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+
+        async def body():
+            yield b'[{"id": 1,'
+            yield b' "nome": "Sala 1"}]'
+
+        # Like the responses of BaseHTTPMiddleware's call_next: headers only, no media_type
+        return StreamingResponse(
+            body(),
+            status_code=203,
+            headers={"Content-Type": "application/json", "X-Total-Count": "1"}
+        )
+
+    async def run():
+        request = make_request("/api/v1/salas")
+        return await asyncio.gather(*(single_flight.run("k", request, call_next) for _ in range(3)))
+
+    leader, *followers = asyncio.run(run())
+
+    assert calls == 1
+    assert single_flight.stats()["leaders"] == 1
+    assert single_flight.stats()["followers"] == 2
+    for response in [leader, *followers]:
+        assert response.status_code == 203
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["x-total-count"] == "1"
+        assert response.headers["content-length"] == str(len(b'[{"id": 1, "nome": "Sala 1"}]'))
+        assert response.body == b'[{"id": 1, "nome": "Sala 1"}]'
+    assert single_flight.stats()["in_flight"] == 0
+
+
+def test_leader_error_is_raised_to_followers_and_key_is_released():
+    single_flight = SingleFlight()
+
+    async def call_next(request):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("falhou")
+
+    async def run():
+        request = make_request("/api/v1/salas")
+        return await asyncio.gather(
+            *(single_flight.run("k", request, call_next) for _ in range(2)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert single_flight.stats()["in_flight"] == 0
+
+
+def test_coalescing_key_normalizes_the_query_string():
+    a = get_coalescing_key(make_request("/api/v1/reservas", "limit=10&skip=0"))
+    b = get_coalescing_key(make_request("/api/v1/reservas", "skip=0&limit=10"))
+    assert a == b
+    assert get_coalescing_key(make_request("/api/v1/reservas", method="POST")) is None
+    assert get_coalescing_key(make_request("/api/v1/usuarios")) is None
+
+
+def test_per_user_routes_are_keyed_by_token():
+    ana = get_coalescing_key(make_request("/api/v1/bootstrap", headers=auth_headers("ana@example.com")))
+    bia = get_coalescing_key(make_request("/api/v1/bootstrap", headers=auth_headers("bia@example.com")))
+    assert ana != bia
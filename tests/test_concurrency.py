@@ -0,0 +1,180 @@
+import random
+import threading
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app import crud, models, schemas
+from app.services import pipeline
+from app.services.database import SessionLocal
+
+from .conftest import USER_EMAIL, future, reserva_payload
+
+WORKERS = 8
+ALVO = future(days=3, hour=10)
+
+SOBREPOSTAS = text("""
+    SELECT count(*)
+    FROM reservas a
+    JOIN reservas b ON a.sala_id = b.sala_id AND a.id < b.id
+    WHERE a.deleted_at IS NULL AND b.deleted_at IS NULL
+      AND a.data_inicio < b.data_fim AND a.data_fim > b.data_inicio
+""")
+
+
+def congelar(sala: models.Sala) -> SimpleNamespace:
+    """Plain copy of a room, so worker threads never lazy-load through the test's session."""
+    return SimpleNamespace(id=sala.id, local_id=sala.local_id, nome=sala.nome)
+
+
+def em_paralelo(tarefa, n: int = WORKERS) -> list:
+    """
+    Runs tarefa(index, db) on n threads released together, each with its own
+    session. Returns each result or ValueError; any other error is re-raised.
+    """
+    barreira = threading.Barrier(n)
+    resultados = [None] * n
+    erros = []
+
+    def executar(index: int):
+        db = SessionLocal()
+        try:
+            barreira.wait()
+            resultados[index] = tarefa(index, db)
+        except ValueError as e:
+            resultados[index] = e
+            db.rollback()
+        except Exception as e:
+            erros.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=executar, args=(index,)) for index in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    if erros:
+        raise erros[0]
+    return resultados
+
+
+def alargar_janela(monkeypatch, nome: str, segundos: float = 0.05) -> None:
+    """Sleeps after crud.<nome> returns, widening the gap between the conflict check and the write."""
+    original = getattr(crud, nome)
+
+    def lento(*args, **kwargs):
+        resultado = original(*args, **kwargs)
+        time.sleep(segundos)
+        return resultado
+
+    monkeypatch.setattr(crud, nome, lento)
+
+
+def criar(sala):
+    def tarefa(index, db):
+        return crud.create_reserva(db, schemas.ReservaCreate(**reserva_payload(sala, ALVO)), USER_EMAIL)
+    return tarefa
+
+
+def criar_lote(sala):
+    def tarefa(index, db):
+        # Each batch also books a free slot of its own, so atomic batches fail as a whole
+        itens = [
+            schemas.ReservaCreate(**reserva_payload(sala, ALVO)),
+            schemas.ReservaCreate(**reserva_payload(sala, ALVO + timedelta(days=1, hours=index))),
+        ]
+        resultados = crud.create_reservas_bulk(db, itens, USER_EMAIL)
+        if resultados[0]["status"] != "created":
+            raise ValueError(resultados[0]["error"])
+        return resultados
+    return tarefa
+
+
+def mover(sala, db):
+    ids = []
+    for index in range(WORKERS):
+        inicio = ALVO + timedelta(days=2, hours=index)
+        ids.append(crud.create_reserva(db, schemas.ReservaCreate(**reserva_payload(sala, inicio)), USER_EMAIL).id)
+
+    def tarefa(index, db):
+        update = schemas.ReservaUpdate(data_inicio=ALVO, data_fim=ALVO + timedelta(hours=1))
+        return crud.update_reserva(db, ids[index], update, USER_EMAIL)
+    return tarefa
+
+
+OPERACOES = {
+    "create_reserva": (criar, "check_time_conflict"),
+    "create_reservas_bulk": (criar_lote, "_find_db_conflicts"),
+    "update_reserva": (mover, "_validar_atualizacao_reserva"),
+}
+
+
+def preparar(operacao: str, sala, db):
+    montar, _ = OPERACOES[operacao]
+    sala = congelar(sala)
+    return montar(sala, db) if operacao == "update_reserva" else montar(sala)
+
+
+@pytest.mark.parametrize("operacao, pipelined", [
+    ("create_reserva", True),
+    ("create_reservas_bulk", True),
+    ("update_reserva", True),
+    ("update_reserva", False),
+])
+def test_with_room_locks_only_one_overlapping_write_wins(db, sala, monkeypatch, operacao, pipelined):
+    monkeypatch.setattr(pipeline, "PIPELINE_ENABLED", pipelined)
+    monkeypatch.setattr(crud, "SALA_ADVISORY_LOCKS", True)
+    tarefa = preparar(operacao, sala, db)
+    alargar_janela(monkeypatch, OPERACOES[operacao][1])
+
+    resultados = em_paralelo(tarefa)
+
+    vencedores = [resultado for resultado in resultados if not isinstance(resultado, ValueError)]
+    assert len(vencedores) == 1
+    assert all("Conflito de horário" in str(resultado) for resultado in resultados if isinstance(resultado, ValueError))
+    assert db.execute(SOBREPOSTAS).scalar_one() == 0
+
+
+@pytest.mark.parametrize("operacao", list(OPERACOES))
+def test_without_room_locks_overlapping_writes_race(db, sala, monkeypatch, operacao):
+    """The check-then-write race the locks close (SALA_ADVISORY_LOCKS is off by default)."""
+    monkeypatch.setattr(crud, "SALA_ADVISORY_LOCKS", False)
+    tarefa = preparar(operacao, sala, db)
+    alargar_janela(monkeypatch, OPERACOES[operacao][1], segundos=0.2)
+
+    resultados = em_paralelo(tarefa)
+
+    assert len([resultado for resultado in resultados if not isinstance(resultado, ValueError)]) > 1
+    assert db.execute(SOBREPOSTAS).scalar_one() > 0
+
+
+def test_many_workers_on_a_few_rooms_never_double_book(db, local, monkeypatch):
+    monkeypatch.setattr(crud, "SALA_ADVISORY_LOCKS", True)
+    salas = [models.Sala(nome=f"Sala {i}", local_id=local.id) for i in range(3)]
+    db.add_all(salas)
+    db.commit()
+    salas = [congelar(sala) for sala in salas]
+    # One-hour bookings starting every half hour, so intervals partially overlap
+    horarios = [ALVO + timedelta(minutes=30 * slot) for slot in range(12)]
+
+    def tarefa(index, db):
+        sorteio = random.Random(index)
+        criadas = 0
+        for _ in range(15):
+            sala = sorteio.choice(salas)
+            try:
+                crud.create_reserva(db, schemas.ReservaCreate(**reserva_payload(sala, sorteio.choice(horarios))), USER_EMAIL)
+                criadas += 1
+            except ValueError:
+                db.rollback()
+        return criadas
+
+    criadas = sum(em_paralelo(tarefa))
+
+    assert criadas > 0
+    assert db.execute(text("SELECT count(*) FROM reservas")).scalar_one() == criadas
+    assert db.execute(SOBREPOSTAS).scalar_one() == 0
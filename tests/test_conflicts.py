@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+import pytest
+
+from app import crud, models, schemas
+
+from .conftest import USER_EMAIL, auth_headers, future, reserva_payload
+
+DIA = future(days=2, hour=0)
+
+
+def hora(h: float):
+    return DIA + timedelta(hours=h)
+
+
+def criar(db, sala, inicio: float, horas: float = 1) -> models.Reserva:
+    return crud.create_reserva(db, schemas.ReservaCreate(**reserva_payload(sala, hora(inicio), horas)), USER_EMAIL)
+
+
+@pytest.fixture
+def ocupada(db, sala):
+    """Sala 1 busy from 10:00 to 12:00 (two reservations) and with a series occurrence at 13:00."""
+    reservas = [criar(db, sala, 10), criar(db, sala, 11)]
+    db.add(models.SerieReserva(
+        local_id=sala.local_id, sala_id=sala.id, local="Sede", sala=sala.nome, rrule="FREQ=DAILY;COUNT=1",
+        data_inicio=hora(13), data_fim=hora(14), data_fim_serie=hora(14), responsavel="Equipe"
+    ))
+    db.commit()
+    return [reserva.id for reserva in reservas]
+
+
+def sugestoes(erro: crud.ConflitoHorarioError) -> list:
+    return [(sugestao["sala_id"], sugestao["data_inicio"], sugestao["data_fim"]) for sugestao in erro.sugestoes]
+
+
+def test_conflict_lists_the_conflicting_reservations_and_nearest_free_slots(db, sala, ocupada):
+    with pytest.raises(crud.ConflitoHorarioError) as erro:
+        criar(db, sala, 10.5)
+
+    assert [(conflito["reserva_id"], conflito["data_inicio"]) for conflito in erro.value.conflitos] == [
+        (ocupada[0], hora(10)), (ocupada[1], hora(11))
+    ]
+    # One placement per gap, nearest first: before 10:00, between 12:00 and the series, after it
+    assert sugestoes(erro.value) == [(sala.id, hora(9), hora(10)), (sala.id, hora(12), hora(13)), (sala.id, hora(14), hora(15))]
+
+
+def test_conflict_with_a_series_occurrence(db, sala, ocupada):
+    with pytest.raises(crud.ConflitoHorarioError) as erro:
+        criar(db, sala, 13.5, horas=0.5)
+
+    [conflito] = erro.value.conflitos
+    assert (conflito["reserva_id"], conflito["serie_id"] is not None) == (None, True)
+    assert sugestoes(erro.value)[0] == (sala.id, hora(14), hora(14.5))
+
+
+def test_suggestions_can_include_sibling_rooms(db, local, sala, ocupada):
+    outra = models.Sala(nome="Sala 2", local_id=local.id)
+    inativa = models.Sala(nome="Sala 3", local_id=local.id, ativo=False)
+    db.add_all([outra, inativa])
+    db.commit()
+
+    with pytest.raises(crud.ConflitoHorarioError) as erro:
+        crud.create_reserva(
+            db, schemas.ReservaCreate(**reserva_payload(sala, hora(10.5))), USER_EMAIL, sugerir_outras_salas=True
+        )
+
+    # The free room fits the requested time exactly; inactive rooms are not suggested
+    assert sugestoes(erro.value) == [
+        (outra.id, hora(10.5), hora(11.5)),
+        (sala.id, hora(9), hora(10)),
+        (sala.id, hora(12), hora(13)),
+        (sala.id, hora(14), hora(15)),
+    ]
+
+
+def test_update_conflict_ignores_the_reservation_being_moved(db, sala, ocupada):
+    movida = criar(db, sala, 14)
+
+    with pytest.raises(crud.ConflitoHorarioError) as erro:
+        crud.update_reserva(db, movida.id, schemas.ReservaUpdate(data_inicio=hora(11.5), data_fim=hora(12.5)), USER_EMAIL)
+
+    assert movida.id not in [conflito["reserva_id"] for conflito in erro.value.conflitos]
+    # Its current slot counts as free
+    assert (sala.id, hora(14), hora(15)) in sugestoes(erro.value)
+
+
+def test_conflict_response_body(client, sala, ocupada):
+    payload = reserva_payload(sala, hora(10.5))
+    payload.update(data_inicio=payload["data_inicio"].isoformat(), data_fim=payload["data_fim"].isoformat())
+
+    response = client.post("/api/v1/reservas", json=payload, params={"sugerir_outras_salas": True}, headers=auth_headers())
+
+    assert response.status_code == 409
+    body = schemas.ConflitoHorarioOut.model_validate(response.json())
+    assert body.detail.startswith("Conflito de horário")
+    assert [conflito.reserva_id for conflito in body.conflitos] == ocupada
+    assert body.sugestoes[0].data_inicio == hora(9)
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import tracemalloc
+
+import pytest
+
+from app.services import events
+from app.services.events import RESYNC_EVENT, ReservaEventBroker, format_sse
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = ReservaEventBroker(queue_size=3, max_subscribers=10)
+    monkeypatch.setattr(events, "broker", broker)
+    return broker
+
+
+def drain(queue: asyncio.Queue) -> list:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_events_are_routed_by_room_and_location(broker):
+    sala = broker.subscribe("sala", 1)
+    local = broker.subscribe("local", 7)
+    outra_sala = broker.subscribe("sala", 2)
+
+    broker.publish({"op": "insert", "id": 10, "sala_id": 1, "local_id": 7})
+    # A reservation moved from room 2 reaches the subscribers of the old room too
+    broker.publish({"op": "update", "id": 11, "sala_id": 1, "local_id": 7, "old_sala_id": 2, "old_local_id": 7})
+
+    assert [event["id"] for event in drain(sala)] == [10, 11]
+    assert [event["id"] for event in drain(local)] == [10, 11]
+    assert [event["id"] for event in drain(outra_sala)] == [11]
+    assert broker.stats()["events_received"] == 2
+
+
+def test_slow_subscriber_overflow_is_replaced_by_resync(broker):
+    lento = broker.subscribe("sala", 1)
+    rapido = broker.subscribe("sala", 1)
+
+    for i in range(3):
+        broker.publish({"op": "update", "id": i, "sala_id": 1})
+    drain(rapido)
+    broker.publish({"op": "update", "id": 3, "sala_id": 1})
+
+    # The full queue is emptied and only a resync is left; the other subscriber is unaffected
+    assert drain(lento) == [RESYNC_EVENT]
+    assert [event["id"] for event in drain(rapido)] == [3]
+    assert broker.stats()["events_dropped"] == 3
+
+    # After resyncing, the subscriber receives events again
+    broker.publish({"op": "update", "id": 4, "sala_id": 1})
+    assert [event["id"] for event in drain(lento)] == [4]
+
+
+def test_unsubscribe_removes_the_queue_and_empty_keys(broker):
+    queue = broker.subscribe("sala", 1)
+    other = broker.subscribe("sala", 1)
+
+    broker.unsubscribe("sala", 1, queue)
+    broker.unsubscribe("sala", 1, queue)
+    assert broker.stats()["subscribers"] == 1
+    assert broker.stats()["subscription_keys"] == 1
+
+    broker.unsubscribe("sala", 1, other)
+    assert broker.stats()["subscribers"] == 0
+    assert broker.stats()["subscription_keys"] == 0
+
+    broker.publish({"op": "update", "id": 1, "sala_id": 1})
+    assert queue.empty()
+
+
+def test_has_capacity_is_bounded_by_max_subscribers(broker):
+    queues = [broker.subscribe("sala", i) for i in range(10)]
+    assert not broker.has_capacity()
+    broker.unsubscribe("sala", 0, queues[0])
+    assert broker.has_capacity()
+
+
+def test_failing_listener_does_not_stop_the_others(broker):
+    received = []
+
+    def failing(event):
+        raise RuntimeError("falhou")
+
+    broker.add_listener(failing)
+    broker.add_listener(received.append)
+    broker.add_listener(lambda event: pytest.fail("catalog listener called"), channel=events.CATALOG_CHANNEL)
+
+    broker.publish({"op": "insert", "id": 1, "sala_id": 1})
+    assert received == [{"op": "insert", "id": 1, "sala_id": 1}]
+
+
+def test_format_sse():
+    message = format_sse({"op": "delete", "id": 5, "change_seq": 42})
+    assert message == 'event: reserva.delete\nid: 42\ndata: {"op": "delete", "id": 5, "change_seq": 42}\n\n'
+    assert format_sse(RESYNC_EVENT).startswith("event: resync\n")
+
+
+def test_stream_sends_keepalive_and_unsubscribes_on_disconnect(broker, monkeypatch):
+    monkeypatch.setattr(events, "SSE_KEEPALIVE_SECONDS", 0.01)
+
+    async def run():
+        stream = events.event_stream("sala", 1)
+        messages = [await stream.__anext__(), await stream.__anext__()]
+        assert broker.stats()["subscribers"] == 1
+
+        broker.publish({"op": "insert", "id": 9, "sala_id": 1})
+        messages.append(await stream.__anext__())
+        # Client disconnect: the response closes the generator
+        await stream.aclose()
+        return messages
+
+    retry, keepalive, event = asyncio.run(run())
+
+    assert retry.startswith("retry: ")
+    assert keepalive == ": keepalive\n\n"
+    assert json.loads(event.split("data: ")[1])["id"] == 9
+    assert broker.stats()["subscribers"] == 0
+    assert broker.stats()["subscription_keys"] == 0
+
+
+def test_idle_subscribers_memory_is_bounded(monkeypatch):
+    """
+    Each idle stream (task, generator, keepalive timer and empty queue) costs a
+    few KB, and every subscription is released when the clients go away.
+    """
+    broker = ReservaEventBroker(queue_size=100, max_subscribers=100000)
+    monkeypatch.setattr(events, "broker", broker)
+    subscribers = 2000
+    salas = 50
+
+    async def client(sala_id: int):
+        stream = events.event_stream("sala", sala_id)
+        async for message in stream:
+            if message.startswith("event:"):
+                await stream.aclose()
+                return
+
+    async def run():
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            tasks = [asyncio.create_task(client(i % salas)) for i in range(subscribers)]
+            await asyncio.sleep(0.2)
+            idle = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+
+        assert broker.stats()["subscribers"] == subscribers
+        for sala_id in range(salas):
+            broker.publish({"op": "update", "id": sala_id, "sala_id": sala_id})
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=10)
+        return idle
+
+    idle = asyncio.run(run())
+
+    assert idle / subscribers < 16 * 1024
+    assert broker.stats()["subscribers"] == 0
+    assert broker.stats()["subscription_keys"] == 0
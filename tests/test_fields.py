@@ -0,0 +1,57 @@
+import pytest
+
+from app import crud, models, schemas
+
+from .conftest import ADMIN_EMAIL, USER_EMAIL, auth_headers, future, reserva_payload, selects
+
+
+@pytest.fixture
+def dados(db, sala):
+    db.add(models.Usuario(google_id="g1", email=USER_EMAIL, nome="Usuário"))
+    db.commit()
+    for dias in (1, 2):
+        crud.create_reserva(
+            db, schemas.ReservaCreate(**reserva_payload(sala, future(days=dias), descricao="Reunião longa")), USER_EMAIL
+        )
+
+
+@pytest.mark.parametrize("path, fields, esperados", [
+    ("/api/v1/reservas", "data_inicio,sala,responsavel", ["id", "sala", "data_inicio", "responsavel"]),
+    ("/api/v1/salas", "nome, capacidade", ["id", "nome", "capacidade"]),
+    ("/api/v1/locais", "nome", ["id", "nome"]),
+    ("/api/v1/usuarios", "email,id", ["id", "email"]),
+])
+def test_fields_returns_only_the_requested_keys(client, dados, path, fields, esperados):
+    headers = auth_headers(ADMIN_EMAIL)
+    completos = client.get(path, headers=headers).json()
+    response = client.get(path, params={"fields": fields}, headers=headers)
+
+    assert response.status_code == 200
+    parciais = response.json()
+    assert parciais and all(set(item) == set(esperados) for item in parciais)
+    assert parciais == [{name: item[name] for name in esperados} for item in completos]
+
+
+@pytest.mark.parametrize("path, table", [("/api/v1/reservas", "reservas"), ("/api/v1/usuarios", "usuarios")])
+def test_fields_are_projected_in_the_select(client, dados, path, table):
+    with selects() as statements:
+        client.get(path, params={"fields": "id"}, headers=auth_headers(ADMIN_EMAIL))
+
+    [select] = [statement for statement in statements if f"FROM {table}" in statement]
+    assert select.split("FROM")[0].count(",") == 0
+    assert f"{table}.id" in select
+
+
+def test_fields_with_include_keeps_the_participants(client, dados):
+    response = client.get("/api/v1/reservas", params={"fields": "data_inicio", "include": "participantes"})
+
+    assert response.status_code == 200
+    assert all(set(item) == {"id", "data_inicio", "participantes"} for item in response.json())
+
+
+@pytest.mark.parametrize("path", ["/api/v1/reservas", "/api/v1/salas", "/api/v1/locais", "/api/v1/usuarios"])
+def test_unknown_field_is_a_400(client, dados, path):
+    response = client.get(path, params={"fields": "id,senha"}, headers=auth_headers(ADMIN_EMAIL))
+
+    assert response.status_code == 400
+    assert "fields inválido: senha" in response.json()["detail"]
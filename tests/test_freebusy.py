@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud, models
+
+from .conftest import auth_headers, future
+
+DIA = future(days=3, hour=0)
+ANA = "ana@example.com"
+BIA = "bia@example.com"
+
+
+def hora(h: float, dia: int = 0) -> datetime:
+    return DIA + timedelta(days=dia, hours=h)
+
+
+@pytest.fixture
+def usuarios(db, sala):
+    """Ana and Bia with their reservations and series; returns their IDs."""
+    ana = models.Usuario(google_id="g-ana", email=ANA, nome="Ana")
+    bia = models.Usuario(google_id="g-bia", email=BIA, nome="Bia")
+    db.add_all([ana, bia])
+
+    def reserva(inicio: float, fim: float, email: str, participantes=(), **extra) -> models.Reserva:
+        db_reserva = models.Reserva(
+            local_id=sala.local_id, sala_id=sala.id, local="Sede", sala=sala.nome, data_inicio=hora(inicio),
+            data_fim=hora(fim), responsavel="Responsável", criado_por_email=email, **extra
+        )
+        db_reserva.participantes = [models.Participante(usuario=usuario) for usuario in participantes]
+        db.add(db_reserva)
+        return db_reserva
+
+    # Ana: starts before the window, overlapping, adjacent and nested intervals, ends after the window
+    reserva(7, 8.5, ANA)
+    reserva(9, 10, ANA)
+    reserva(9.5, 11, ANA)
+    reserva(11, 12, ANA)
+    reserva(11.25, 11.75, ANA)
+    reserva(17, 19, ANA)
+    reserva(13, 14, ANA, deleted_at=hora(0))
+    # Bia: creator and participant of the same reservation, participant of one of Ana's
+    reserva(10, 11, BIA, participantes=[bia])
+    reserva(10.5, 12.5, ANA, participantes=[bia])
+
+    # Daily series of Ana at 15h with the second occurrence cancelled
+    serie = models.SerieReserva(
+        local_id=sala.local_id, sala_id=sala.id, local="Sede", sala=sala.nome, rrule="FREQ=DAILY;COUNT=3",
+        data_inicio=hora(15), data_fim=hora(16), data_fim_serie=hora(16, dia=2), responsavel="Equipe",
+        criado_por_email=ANA
+    )
+    serie.excecoes.append(models.SerieExcecao(data_original=hora(15, dia=1), cancelada=True))
+    db.add(serie)
+    db.commit()
+    return {"ana": ana.id, "bia": bia.id}
+
+
+def test_intervals_are_merged_and_clipped(db, usuarios):
+    busy = crud.get_freebusy(db, [usuarios["ana"], usuarios["bia"]], hora(8), hora(18))
+
+    assert busy[usuarios["ana"]] == [(hora(8), hora(8.5)), (hora(9), hora(12.5)), (hora(15), hora(16)), (hora(17), hora(18))]
+    # Her own reservation counts once, whether as creator or as participant
+    assert busy[usuarios["bia"]] == [(hora(10), hora(12.5))]
+
+
+def test_series_occurrences_are_busy(db, usuarios):
+    busy = crud.get_freebusy(db, [usuarios["ana"]], hora(13), hora(17, dia=2))
+
+    assert busy[usuarios["ana"]] == [(hora(15), hora(16)), (hora(17), hora(19)), (hora(15, dia=2), hora(16, dia=2))]
+
+
+def test_unknown_users_are_free(db, usuarios):
+    assert crud.get_freebusy(db, [999, usuarios["bia"]], hora(0), hora(9)) == {999: [], usuarios["bia"]: []}
+
+
+def test_route(client, usuarios):
+    body = {
+        "usuario_ids": [usuarios["bia"], 999, usuarios["bia"]],
+        # Times without an offset are UTC
+        "inicio": hora(10.5).replace(tzinfo=None).isoformat(),
+        "fim": hora(12).isoformat(),
+    }
+    response = client.post("/api/v1/usuarios/freebusy", json=body, headers=auth_headers())
+
+    assert response.status_code == 200, response.text
+    usuarios_out = response.json()["usuarios"]
+    assert [usuario["usuario_id"] for usuario in usuarios_out] == [usuarios["bia"], 999]
+    [intervalo] = usuarios_out[0]["ocupado"]
+    assert (datetime.fromisoformat(intervalo["data_inicio"]), datetime.fromisoformat(intervalo["data_fim"])) == (
+        hora(10.5), hora(12)
+    )
+    assert usuarios_out[1]["ocupado"] == []
+
+
+@pytest.mark.parametrize("inicio, fim", [(hora(10), hora(10)), (hora(0), hora(0, dia=32))])
+def test_route_rejects_invalid_windows(client, inicio, fim):
+    body = {"usuario_ids": [1], "inicio": inicio.isoformat(), "fim": fim.isoformat()}
+
+    assert client.post("/api/v1/usuarios/freebusy", json=body, headers=auth_headers()).status_code == 400
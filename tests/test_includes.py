@@ -0,0 +1,72 @@
+import re
+
+import pytest
+
+from app import models
+
+from .conftest import future, selects
+
+
+@pytest.fixture
+def pagina(db, sala):
+    """Creates `total` reservations, each with two users and one manual name as participants."""
+    usuarios = [models.Usuario(google_id=f"g{i}", email=f"u{i}@example.com", nome=f"Usuário {i}") for i in range(2)]
+    db.add_all(usuarios)
+
+    def criar(total: int) -> None:
+        for dias in range(1, total + 1):
+            inicio = future(days=dias)
+            reserva = models.Reserva(
+                local_id=sala.local_id, sala_id=sala.id, local="Sede", sala=sala.nome, data_inicio=inicio,
+                data_fim=inicio.replace(hour=11), responsavel="Responsável"
+            )
+            reserva.participantes = [models.Participante(usuario=usuario) for usuario in usuarios]
+            reserva.participantes.append(models.Participante(nome_manual="Visitante"))
+            db.add(reserva)
+        db.commit()
+
+    return criar
+
+
+def consultas(client, include: str, limit: int = 100):
+    """The page and the queries run to build it (besides the session's set_config)."""
+    with selects() as statements:
+        response = client.get("/api/v1/reservas", params={"include": include, "limit": limit})
+    assert response.status_code == 200, response.text
+    return response.json(), [statement for statement in statements if "set_config" not in statement]
+
+
+@pytest.mark.parametrize("include, tabelas", [
+    ("participantes", ["reservas", "participantes"]),
+    ("participantes.usuario", ["reservas", "participantes", "usuarios"]),
+])
+@pytest.mark.parametrize("total", [1, 25])
+def test_query_count_does_not_grow_with_the_page(client, pagina, include, tabelas, total):
+    pagina(total)
+
+    body, statements = consultas(client, include)
+
+    assert len(body) == total and all(len(item["participantes"]) == 3 for item in body)
+    assert [re.search(r"\bFROM\s+(\w+)", statement).group(1) for statement in statements] == tabelas
+
+
+def test_users_are_only_loaded_when_requested(client, pagina):
+    pagina(2)
+
+    body, statements = consultas(client, "participantes")
+    assert not any(re.search(r"\bFROM\s+usuarios\b", statement) for statement in statements)
+    assert all(participante["usuario"] is None for item in body for participante in item["participantes"])
+
+    body, _ = consultas(client, "participantes.usuario")
+    usuarios = [participante["usuario"] for participante in body[0]["participantes"]]
+    assert sorted(usuario["email"] for usuario in usuarios if usuario) == ["u0@example.com", "u1@example.com"]
+    assert usuarios.count(None) == 1
+
+
+def test_page_limit_applies_to_reservations_not_participants(client, pagina):
+    pagina(5)
+
+    body, statements = consultas(client, "participantes.usuario", limit=2)
+
+    assert len(body) == 2 and all(len(item["participantes"]) == 3 for item in body)
+    assert len(statements) == 3
@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import pytest
+
+from app import models
+
+from .conftest import USER_EMAIL, auth_headers, future
+
+OUTRO_EMAIL = "outro@example.com"
+
+
+@pytest.fixture
+def minhas(db, sala):
+    """
+    Reservations of USER_EMAIL (created, participating, or both) among others'
+    and deleted ones, with ties on data_inicio. Returns the expected IDs in order.
+    """
+    usuario = models.Usuario(google_id="g-usuario", email=USER_EMAIL, nome="Usuário")
+    db.add(usuario)
+
+    def reserva(dias: int, hora: int, email: str, participa: bool = False, **extra) -> models.Reserva:
+        inicio = future(days=dias, hour=hora)
+        db_reserva = models.Reserva(
+            local_id=sala.local_id, sala_id=sala.id, local="Sede", sala=sala.nome, data_inicio=inicio,
+            data_fim=inicio + timedelta(hours=1), responsavel="Responsável", criado_por_email=email, **extra
+        )
+        if participa:
+            db_reserva.participantes.append(models.Participante(usuario=usuario))
+        db.add(db_reserva)
+        return db_reserva
+
+    esperadas = [
+        reserva(-1, 9, USER_EMAIL),
+        reserva(1, 9, USER_EMAIL),
+        reserva(1, 9, OUTRO_EMAIL, participa=True),
+        reserva(1, 9, USER_EMAIL, participa=True),
+        reserva(2, 14, OUTRO_EMAIL, participa=True),
+        reserva(3, 8, USER_EMAIL),
+    ]
+    reserva(1, 10, OUTRO_EMAIL)
+    reserva(2, 9, USER_EMAIL, deleted_at=future(days=-1))
+    reserva(4, 9, OUTRO_EMAIL, participa=True, deleted_at=future(days=-1))
+    db.commit()
+    return [db_reserva.id for db_reserva in sorted(esperadas, key=lambda r: (r.data_inicio, r.id))]
+
+
+def paginas(client, limit: int, **params) -> list:
+    """Follows next_cursor until has_more is false; returns the item IDs of each page."""
+    resultado, cursor = [], None
+    while True:
+        query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/v1/me/reservas", params=query, headers=auth_headers()).json()
+        resultado.append([item["id"] for item in body["items"]])
+        cursor = body["next_cursor"]
+        assert body["has_more"] == (cursor is not None)
+        if cursor is None:
+            return resultado
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4, 6, 50])
+def test_cursor_round_trip_walks_every_reservation_once(client, minhas, limit):
+    pages = paginas(client, limit)
+
+    assert [reserva_id for page in pages for reserva_id in page] == minhas
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_only_unfinished_reservations(client, minhas):
+    assert [reserva_id for page in paginas(client, 2, apenas_futuras=True) for reserva_id in page] == minhas[1:]
+
+
+def test_cursor_is_a_stable_keyset_position(db, client, sala, minhas):
+    primeira = client.get("/api/v1/me/reservas", params={"limit": 3}, headers=auth_headers()).json()
+    # Rows inserted before the cursor position never show up in later pages; rows after it do
+    for dias in (0, 5):
+        inicio = future(days=dias, hour=9)
+        db.add(models.Reserva(
+            local_id=sala.local_id, sala_id=sala.id, local="Sede", sala=sala.nome, data_inicio=inicio,
+            data_fim=inicio + timedelta(hours=1), responsavel="Responsável", criado_por_email=USER_EMAIL
+        ))
+    db.commit()
+    nova = db.query(models.Reserva.id).filter(models.Reserva.data_inicio == future(days=5, hour=9)).scalar()
+
+    segunda = client.get(
+        "/api/v1/me/reservas", params={"limit": 10, "cursor": primeira["next_cursor"]}, headers=auth_headers()
+    ).json()
+
+    assert [item["id"] for item in primeira["items"]] == minhas[:3]
+    assert [item["id"] for item in segunda["items"]] == minhas[3:] + [nova]
+
+
+def test_invalid_cursor_is_a_400(client, minhas):
+    response = client.get("/api/v1/me/reservas", params={"cursor": "não-é-um-cursor"}, headers=auth_headers())
+
+    assert response.status_code == 400
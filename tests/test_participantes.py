@@ -0,0 +1,100 @@
+import pytest
+
+from app import crud, models, schemas
+
+from .conftest import USER_EMAIL, auth_headers, future, reserva_payload
+
+
+@pytest.fixture
+def reserva(db, sala) -> models.Reserva:
+    return crud.create_reserva(db, schemas.ReservaCreate(**reserva_payload(sala, future())), USER_EMAIL)
+
+
+@pytest.fixture
+def usuarios(db) -> list:
+    db_usuarios = [models.Usuario(google_id=f"g{i}", email=f"u{i}@example.com", nome=f"Usuário {i}") for i in range(3)]
+    db.add_all(db_usuarios)
+    db.commit()
+    return [usuario.id for usuario in db_usuarios]
+
+
+def adicionar(client, reserva, usuario_ids=(), nomes_manuais=(), email=USER_EMAIL):
+    return client.post(
+        f"/api/v1/reservas/{reserva.id}/participantes/bulk",
+        json={"usuario_ids": list(usuario_ids), "nomes_manuais": list(nomes_manuais)},
+        headers=auth_headers(email)
+    )
+
+
+def substituir(client, reserva, usuario_ids=(), nomes_manuais=()):
+    return client.put(
+        f"/api/v1/reservas/{reserva.id}/participantes",
+        json={"usuario_ids": list(usuario_ids), "nomes_manuais": list(nomes_manuais)},
+        headers=auth_headers()
+    )
+
+
+def conjunto(body: dict) -> set:
+    return {(participante["usuario_id"], participante["nome_manual"]) for participante in body["participantes"]}
+
+
+def test_add_mixes_users_and_manual_names(client, reserva, usuarios):
+    response = adicionar(client, reserva, usuarios[:2], ["Visitante", " Convidado "])
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["adicionados"], body["removidos"]) == (4, 0)
+    assert conjunto(body) == {(usuarios[0], None), (usuarios[1], None), (None, "Visitante"), (None, "Convidado")}
+    assert {participante["usuario"]["id"] for participante in body["participantes"] if participante["usuario"]} == set(
+        usuarios[:2]
+    )
+
+
+def test_existing_and_repeated_participants_are_skipped(client, reserva, usuarios):
+    adicionar(client, reserva, [usuarios[0]], ["Visitante"])
+
+    # Repeated in the request and already stored: only the new user is added
+    body = adicionar(client, reserva, [usuarios[0], usuarios[1], usuarios[1]], ["Visitante", "Visitante"]).json()
+
+    assert body["adicionados"] == 1
+    assert conjunto(body) == {(usuarios[0], None), (usuarios[1], None), (None, "Visitante")}
+
+
+def test_replace_reports_added_and_removed(db, client, reserva, usuarios):
+    adicionar(client, reserva, usuarios[:2], ["Visitante", "Convidado"])
+
+    body = substituir(client, reserva, usuarios[1:], ["Convidado", "Outro"]).json()
+
+    assert (body["adicionados"], body["removidos"]) == (2, 2)
+    assert conjunto(body) == {(usuarios[1], None), (usuarios[2], None), (None, "Convidado"), (None, "Outro")}
+    db.refresh(reserva)
+    assert reserva.participantes_count == 4
+
+
+def test_replace_with_an_empty_set_removes_everything(db, client, reserva, usuarios):
+    adicionar(client, reserva, usuarios, ["Visitante"])
+
+    body = substituir(client, reserva).json()
+
+    assert (body["adicionados"], body["removidos"], body["participantes"]) == (0, 4, [])
+    db.refresh(reserva)
+    assert reserva.participantes_count == 0
+
+
+@pytest.mark.parametrize("metodo", [adicionar, substituir])
+def test_unknown_users_are_a_400_and_change_nothing(client, reserva, usuarios, metodo):
+    adicionar(client, reserva, [usuarios[0]])
+
+    response = metodo(client, reserva, [usuarios[1], 998, 999], ["Visitante"])
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Usuários não encontrados: 998, 999"
+    participantes = client.get(f"/api/v1/reservas/{reserva.id}/participantes").json()
+    assert [participante["usuario_id"] for participante in participantes] == [usuarios[0]]
+
+
+def test_only_the_creator_can_change_participants(client, reserva, usuarios):
+    assert adicionar(client, reserva, [usuarios[0]], email="outro@example.com").status_code == 403
+    assert client.put(
+        "/api/v1/reservas/999/participantes", json={"usuario_ids": [usuarios[0]]}, headers=auth_headers()
+    ).status_code == 404
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+import pytest
+
+from app import crud, models, schemas
+from app.services import pipeline
+
+from .conftest import USER_EMAIL, future, truncate_all
+
+DIA = future(days=2, hour=0)
+
+
+def hora(h: float, dias: int = 0):
+    return DIA + timedelta(days=dias, hours=h)
+
+
+def criar_dados(db) -> dict:
+    """Two locations, three rooms, two reservations and a daily series (same IDs on every run)."""
+    sede = models.Local(nome="Sede")
+    filial = models.Local(nome="Filial")
+    db.add_all([sede, filial])
+    db.flush()
+    sala1 = models.Sala(nome="Sala 1", local_id=sede.id)
+    sala2 = models.Sala(nome="Sala 2", local_id=sede.id)
+    sala3 = models.Sala(nome="Sala 3", local_id=filial.id)
+    db.add_all([sala1, sala2, sala3])
+    db.flush()
+
+    def reserva(inicio, fim, **extra) -> models.Reserva:
+        db_reserva = models.Reserva(
+            local_id=sede.id, sala_id=sala1.id, local="Sede", sala="Sala 1", data_inicio=inicio, data_fim=fim,
+            responsavel="Responsável", criado_por_email=USER_EMAIL, **extra
+        )
+        db.add(db_reserva)
+        return db_reserva
+
+    r1 = reserva(hora(10), hora(11))
+    r2 = reserva(hora(12), hora(13), cafe=True, quantidade_cafe=2)
+    db.add(models.SerieReserva(
+        local_id=sede.id, sala_id=sala2.id, local="Sede", sala="Sala 2", rrule="FREQ=DAILY;COUNT=3",
+        data_inicio=hora(14), data_fim=hora(15), data_fim_serie=hora(15, dias=2), responsavel="Equipe"
+    ))
+    db.commit()
+    return {"r1": r1.id, "r2": r2.id, "sala2": sala2.id, "sala3": sala3.id}
+
+
+CENARIOS = {
+    "responsavel": ("r1", lambda ids: {"responsavel": "Outro"}),
+    "sem_mudanca": ("r1", lambda ids: {"responsavel": "Responsável"}),
+    "mover_sem_conflito": ("r1", lambda ids: {"data_inicio": hora(16), "data_fim": hora(17)}),
+    "conflito_reserva": ("r1", lambda ids: {"data_inicio": hora(12.5), "data_fim": hora(13.5)}),
+    "conflito_serie": ("r1", lambda ids: {"sala_id": ids["sala2"], "data_inicio": hora(14.5, 1), "data_fim": hora(15.5, 1)}),
+    "sala_da_serie_livre": ("r1", lambda ids: {"sala_id": ids["sala2"], "data_inicio": hora(16, 1), "data_fim": hora(17, 1)}),
+    "sala_de_outro_local": ("r1", lambda ids: {"sala_id": ids["sala3"]}),
+    "passado": ("r1", lambda ids: {"data_inicio": future(days=-1), "data_fim": future(days=-1) + timedelta(hours=1)}),
+    "fim_antes_do_inicio": ("r1", lambda ids: {"data_fim": hora(9)}),
+    "cafe_sem_quantidade": ("r2", lambda ids: {"quantidade_cafe": None}),
+    "cafe_desligado": ("r2", lambda ids: {"cafe": False}),
+    "sem_permissao": ("r1", lambda ids: {"responsavel": "Intruso", "_email": "outro@example.com"}),
+    "inexistente": (None, lambda ids: {"responsavel": "Ninguém"}),
+}
+
+SEM_TIMESTAMPS = {"created_at", "updated_at"}
+
+
+def executar(db, cenario: str):
+    """Runs one scenario on fresh data; returns the outcome and the stored reservation."""
+    truncate_all()
+    ids = criar_dados(db)
+    chave, montar = CENARIOS[cenario]
+    dados = montar(ids)
+    email = dados.pop("_email", USER_EMAIL)
+    reserva_id = ids[chave] if chave else 999
+
+    try:
+        resultado = crud.update_reserva(db, reserva_id, schemas.ReservaUpdate(**dados), email)
+    except ValueError as e:
+        desfecho = (type(e).__name__, str(e), getattr(e, "conflitos", None), getattr(e, "sugestoes", None))
+    else:
+        desfecho = None if resultado is None else schemas.ReservaOut.model_validate(resultado).model_dump(exclude=SEM_TIMESTAMPS)
+
+    db.rollback()
+    armazenada = crud.get_reserva_row(db, reserva_id)
+    if armazenada is not None:
+        armazenada = schemas.ReservaOut.model_validate(armazenada).model_dump(exclude=SEM_TIMESTAMPS)
+    db.rollback()
+    return desfecho, armazenada
+
+
+@pytest.mark.parametrize("advisory_locks", [False, True])
+@pytest.mark.parametrize("cenario", list(CENARIOS))
+def test_pipelined_update_matches_the_sequential_path(db, monkeypatch, cenario, advisory_locks):
+    monkeypatch.setattr(crud, "SALA_ADVISORY_LOCKS", advisory_locks)
+
+    monkeypatch.setattr(pipeline, "PIPELINE_ENABLED", True)
+    if not pipeline.is_available(db):
+        pytest.skip("pipeline mode needs psycopg 3 with libpq 14+")
+    pipelined = executar(db, cenario)
+
+    monkeypatch.setattr(pipeline, "PIPELINE_ENABLED", False)
+    sequencial = executar(db, cenario)
+
+    assert pipelined == sequencial
@@ -0,0 +1,132 @@
+import jwt
+import pytest
+from starlette.requests import Request
+
+from app.services import rate_limit
+from app.services.auth import decode_token_email
+from app.services.rate_limit import ConcurrencyLimiter, RateLimiter
+
+from .conftest import auth_headers
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def make_request(method: str = "GET", path: str = "/api/v1/reservas", headers: dict = None) -> Request:
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": ("203.0.113.7", 50000),
+    })
+
+
+def test_bucket_starts_full_and_rejects_when_empty(clock):
+    limiter = RateLimiter(capacity=3, refill_rate=1)
+
+    assert [limiter.consume("k") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.consume("k") == pytest.approx(1.0)
+    assert limiter.stats()["allowed"] == 3
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_tokens_refill_with_time_up_to_capacity(clock):
+    limiter = RateLimiter(capacity=4, refill_rate=2)
+    for _ in range(4):
+        limiter.consume("k")
+
+    clock.now += 0.5
+    assert limiter.consume("k") == 0.0
+    assert limiter.consume("k") > 0
+
+    # A long idle period never fills the bucket above its capacity
+    clock.now += 3600
+    assert [limiter.consume("k") for _ in range(5)][-1] == pytest.approx(0.5)
+
+
+def test_cost_weights_consume_more_tokens(clock):
+    limiter = RateLimiter(capacity=10, refill_rate=1)
+
+    assert limiter.consume("k", cost=5) == 0.0
+    assert limiter.consume("k", cost=5) == 0.0
+    assert limiter.consume("k", cost=5) == pytest.approx(5.0)
+    # A cost above the capacity is capped, so the request is not rejected forever
+    clock.now += 10
+    assert limiter.consume("k", cost=50) == 0.0
+
+
+def test_without_refill_retry_is_infinite(clock):
+    limiter = RateLimiter(capacity=1, refill_rate=0)
+    limiter.consume("k")
+
+    wait = limiter.consume("k")
+    assert wait == float("inf")
+    assert rate_limit.retry_after_header(wait) == "60"
+    assert rate_limit.retry_after_header(0.2) == "1"
+    assert rate_limit.retry_after_header(2.1) == "3"
+
+
+def test_least_recently_used_keys_are_evicted(clock):
+    limiter = RateLimiter(capacity=1, refill_rate=0, max_keys=2)
+    limiter.consume("a")
+    limiter.consume("b")
+    # Touching "a" makes "b" the least recently used key
+    limiter.consume("a")
+    limiter.consume("c")
+
+    assert limiter.stats()["tracked_keys"] == 2
+    # "b" was evicted and starts again with a full bucket; "a" is still empty
+    assert limiter.consume("b") == 0.0
+    assert limiter.consume("c") == float("inf")
+
+
+def test_request_cost_weights():
+    assert rate_limit.get_request_cost(make_request("GET")) == rate_limit.RATE_LIMIT_READ_COST
+    for method in ("POST", "PUT", "PATCH", "DELETE"):
+        assert rate_limit.get_request_cost(make_request(method)) == rate_limit.RATE_LIMIT_WRITE_COST
+    auth = make_request("POST", "/api/v1/auth/google")
+    assert rate_limit.get_request_cost(auth) == rate_limit.RATE_LIMIT_AUTH_COST
+
+
+def test_rate_limit_key_uses_token_email_or_client_ip():
+    assert rate_limit.get_rate_limit_key(make_request(headers=auth_headers("Ana@Example.com"))) == "user:ana@example.com"
+    assert rate_limit.get_rate_limit_key(make_request(headers={"Authorization": "Bearer lixo"})) == "ip:203.0.113.7"
+    assert rate_limit.get_rate_limit_key(make_request()) == "ip:203.0.113.7"
+
+
+def test_decode_token_email_rejects_invalid_tokens():
+    assert decode_token_email("not-a-jwt") is None
+    assert decode_token_email(jwt.encode({"email": "a@example.com"}, "other-secret", algorithm="HS256")) is None
+
+
+def test_exempt_paths():
+    assert rate_limit.is_exempt(make_request(path="/health"))
+    assert rate_limit.is_exempt(make_request("OPTIONS"))
+    assert not rate_limit.is_exempt(make_request())
+
+
+def test_concurrency_limiter_sheds_above_max_in_flight():
+    limiter = ConcurrencyLimiter(max_in_flight=2)
+
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    assert limiter.stats() == {"max_in_flight": 2, "in_flight": 2, "shed": 1}
+
+    limiter.release()
+    assert limiter.try_acquire()
+    assert limiter.stats()["shed"] == 1
@@ -0,0 +1,134 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app import crud
+from app.services.recurrence import expand, parse_rrule
+
+UTC = timezone.utc
+HORA = timedelta(hours=1)
+
+
+def dt(year: int, month: int, day: int, hour: int = 9) -> datetime:
+    return datetime(year, month, day, hour, tzinfo=UTC)
+
+
+def days(rule: str, dtstart: datetime, **kwargs) -> list:
+    return [occurrence.date() for occurrence in expand(parse_rrule(rule), dtstart, HORA, **kwargs)]
+
+
+def test_daily_with_interval_and_weekday_filter():
+    # 2026-10-05 is a Monday
+    assert days("FREQ=DAILY;COUNT=3", dt(2026, 10, 5)) == [date(2026, 10, 5), date(2026, 10, 6), date(2026, 10, 7)]
+    assert days("FREQ=DAILY;INTERVAL=2;COUNT=3", dt(2026, 10, 5)) == [date(2026, 10, 5), date(2026, 10, 7), date(2026, 10, 9)]
+    assert days("FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR;COUNT=6", dt(2026, 10, 8)) == [
+        date(2026, 10, 8), date(2026, 10, 9), date(2026, 10, 12), date(2026, 10, 13), date(2026, 10, 14), date(2026, 10, 15)
+    ]
+
+
+def test_weekly_by_day_and_interval():
+    assert days("FREQ=WEEKLY;COUNT=3", dt(2026, 10, 5)) == [date(2026, 10, 5), date(2026, 10, 12), date(2026, 10, 19)]
+    assert days("FREQ=WEEKLY;BYDAY=MO,WE;COUNT=4", dt(2026, 10, 5)) == [
+        date(2026, 10, 5), date(2026, 10, 7), date(2026, 10, 12), date(2026, 10, 14)
+    ]
+    assert days("FREQ=WEEKLY;INTERVAL=2;BYDAY=FR;COUNT=3", dt(2026, 10, 9)) == [
+        date(2026, 10, 9), date(2026, 10, 23), date(2026, 11, 6)
+    ]
+
+
+def test_monthly_by_month_day_skips_invalid_days():
+    assert days("FREQ=MONTHLY;COUNT=3", dt(2026, 10, 15)) == [date(2026, 10, 15), date(2026, 11, 15), date(2026, 12, 15)]
+    # The 31st only exists in some months
+    assert days("FREQ=MONTHLY;COUNT=3", dt(2026, 10, 31)) == [date(2026, 10, 31), date(2026, 12, 31), date(2027, 1, 31)]
+    assert days("FREQ=MONTHLY;BYMONTHDAY=-1;COUNT=3", dt(2026, 10, 31)) == [date(2026, 10, 31), date(2026, 11, 30), date(2026, 12, 31)]
+
+
+def test_monthly_by_day_expands_every_weekday_of_the_month():
+    assert days("FREQ=MONTHLY;BYDAY=MO;COUNT=7", dt(2026, 10, 5)) == [
+        date(2026, 10, 5), date(2026, 10, 12), date(2026, 10, 19), date(2026, 10, 26),
+        date(2026, 11, 2), date(2026, 11, 9), date(2026, 11, 16)
+    ]
+
+
+def test_monthly_by_day_with_ordinals():
+    assert days("FREQ=MONTHLY;BYDAY=1MO;COUNT=3", dt(2026, 10, 5)) == [date(2026, 10, 5), date(2026, 11, 2), date(2026, 12, 7)]
+    assert days("FREQ=MONTHLY;BYDAY=-1FR;COUNT=3", dt(2026, 10, 30)) == [date(2026, 10, 30), date(2026, 11, 27), date(2026, 12, 25)]
+    assert days("FREQ=MONTHLY;BYDAY=2TU,-2TU;COUNT=4", dt(2026, 10, 13)) == [
+        date(2026, 10, 13), date(2026, 10, 20), date(2026, 11, 10), date(2026, 11, 17)
+    ]
+
+
+def test_monthly_by_set_pos_and_by_day_limiting_month_days():
+    # Last weekday of the month
+    assert days("FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=-1;COUNT=3", dt(2026, 10, 30)) == [
+        date(2026, 10, 30), date(2026, 11, 30), date(2026, 12, 31)
+    ]
+    # Friday the 13th
+    assert days("FREQ=MONTHLY;BYMONTHDAY=13;BYDAY=FR;COUNT=2", dt(2026, 11, 13)) == [date(2026, 11, 13), date(2027, 8, 13)]
+
+
+def test_count_includes_dtstart():
+    assert len(days("FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=10", dt(2026, 10, 5))) == 10
+    assert days("FREQ=DAILY;COUNT=1", dt(2026, 10, 5)) == [date(2026, 10, 5)]
+
+
+def test_until_is_inclusive():
+    assert days("FREQ=DAILY;UNTIL=20261007T090000Z", dt(2026, 10, 5)) == [date(2026, 10, 5), date(2026, 10, 6), date(2026, 10, 7)]
+    assert days("FREQ=DAILY;UNTIL=20261007T085959Z", dt(2026, 10, 5)) == [date(2026, 10, 5), date(2026, 10, 6)]
+    assert days("FREQ=WEEKLY;UNTIL=20261019", dt(2026, 10, 5)) == [date(2026, 10, 5), date(2026, 10, 12)]
+
+
+def test_window_expansion_of_unbounded_rule():
+    occurrences = days("FREQ=WEEKLY;BYDAY=TU", dt(2026, 1, 6), window_start=dt(2027, 3, 1, 0), window_end=dt(2027, 3, 15, 0))
+    assert occurrences == [date(2027, 3, 2), date(2027, 3, 9)]
+    # An occurrence that started before the window but is still running overlaps it
+    assert days("FREQ=DAILY", dt(2026, 10, 5), window_start=dt(2026, 10, 6, 9) + timedelta(minutes=30), window_end=dt(2026, 10, 7, 0)) == [
+        date(2026, 10, 6)
+    ]
+    assert days("FREQ=DAILY", dt(2026, 10, 5), limit=2) == [date(2026, 10, 5), date(2026, 10, 6)]
+
+
+@pytest.mark.parametrize("rule", [
+    "FREQ=YEARLY",
+    "FREQ=DAILY;COUNT=0",
+    "FREQ=DAILY;COUNT=2;UNTIL=20261010",
+    "FREQ=WEEKLY;BYDAY=XX",
+    "FREQ=WEEKLY;BYDAY=1MO",
+    "FREQ=MONTHLY;BYDAY=6MO",
+    "FREQ=WEEKLY;BYMONTHDAY=1",
+    "FREQ=MONTHLY;BYSETPOS=1",
+    "FREQ=MONTHLY;BYDAY=MO;BYSETPOS=0",
+    "FREQ=DAILY;BYHOUR=9",
+    "FREQ=DAILY;UNTIL=amanhã",
+])
+def test_invalid_rules_are_rejected(rule):
+    with pytest.raises(ValueError, match="RRULE inválida"):
+        parse_rrule(rule)
+
+
+def test_rrule_prefix_and_case_are_accepted():
+    rule = parse_rrule("RRULE:freq=weekly;byday=mo;wkst=mo")
+    assert rule.freq == "WEEKLY"
+    assert rule.weekdays == [0]
+
+
+def test_exceptions_cancel_and_reschedule_occurrences():
+    serie = SimpleNamespace(
+        id=1, local_id=1, sala_id=1, responsavel="Equipe",
+        rrule="FREQ=DAILY;COUNT=4", data_inicio=dt(2026, 10, 5), data_fim=dt(2026, 10, 5, 10)
+    )
+    excecoes = [
+        SimpleNamespace(data_original=dt(2026, 10, 6), cancelada=True, data_inicio=None, data_fim=None),
+        SimpleNamespace(data_original=dt(2026, 10, 7), cancelada=False, data_inicio=dt(2026, 10, 7, 14), data_fim=dt(2026, 10, 7, 15)),
+    ]
+
+    ocorrencias = crud._expand_serie(serie, excecoes, dt(2026, 10, 1, 0), dt(2026, 10, 31, 0))
+
+    assert [(item["data_inicio"], item["modificada"]) for item in ocorrencias] == [
+        (dt(2026, 10, 5), False),
+        (dt(2026, 10, 7, 14), True),
+        (dt(2026, 10, 8), False),
+    ]
+    # A rescheduled occurrence is returned for the window it moved into
+    assert crud._expand_serie(serie, excecoes, dt(2026, 10, 7, 13), dt(2026, 10, 7, 16))[0]["data_original"] == dt(2026, 10, 7)
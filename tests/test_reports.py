@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from app import crud, models, schemas
+
+from .conftest import USER_EMAIL, future
+
+
+def add_reserva_com_cafe(db, sala, inicio) -> models.Reserva:
+    reserva = models.Reserva(
+        local_id=sala.local_id,
+        sala_id=sala.id,
+        local="Sede",
+        sala=sala.nome,
+        data_inicio=inicio,
+        data_fim=inicio + timedelta(hours=1),
+        responsavel="Responsável",
+        cafe=True,
+        quantidade_cafe=2
+    )
+    db.add(reserva)
+    db.commit()
+    return reserva
+
+
+def add_serie_com_cafe(db, sala, inicio) -> models.SerieReserva:
+    serie = schemas.SerieReservaCreate(
+        local_id=sala.local_id,
+        sala_id=sala.id,
+        data_inicio=inicio,
+        data_fim=inicio + timedelta(hours=1),
+        rrule="FREQ=DAILY;COUNT=3",
+        responsavel="Equipe",
+        cafe=True,
+        quantidade_cafe=5
+    )
+    return crud.create_serie_reserva(db, serie, USER_EMAIL)
+
+
+def test_occupancy_report_includes_series_occurrences(db, sala):
+    primeiro_dia = future(days=1, hour=10)
+    add_reserva_com_cafe(db, sala, primeiro_dia.replace(hour=14))
+    serie = add_serie_com_cafe(db, sala, primeiro_dia)
+    # A cancelled occurrence does not count
+    crud.create_serie_excecao(
+        db, serie.id, schemas.SerieExcecaoCreate(data_original=primeiro_dia + timedelta(days=2), cancelada=True), USER_EMAIL
+    )
+    dias = dict(data_inicio=primeiro_dia.date(), data_fim=primeiro_dia.date() + timedelta(days=2))
+
+    [por_sala] = crud.get_relatorio_ocupacao(db, **dias)
+    assert por_sala["horas_reservadas"] == 3
+    assert por_sala["horas_disponiveis"] == 72
+
+    por_hora = {item["chave"]: item["horas_reservadas"] for item in crud.get_relatorio_ocupacao(db, agrupar_por="hora", **dias)}
+    assert por_hora[10] == 2
+    assert por_hora[14] == 1
+
+    # Occurrences are clipped to the hours and days of the report
+    [manha] = crud.get_relatorio_ocupacao(db, hora_inicio=10, hora_fim=11, **dias)
+    assert manha["horas_reservadas"] == 2
+    [segundo_dia] = crud.get_relatorio_ocupacao(
+        db, data_inicio=dias["data_inicio"] + timedelta(days=1), data_fim=dias["data_fim"]
+    )
+    assert segundo_dia["horas_reservadas"] == 1
+
+
+def test_coffee_report_includes_series_occurrences(db, sala):
+    primeiro_dia = future(days=1, hour=10)
+    add_reserva_com_cafe(db, sala, primeiro_dia.replace(hour=14))
+    add_serie_com_cafe(db, sala, primeiro_dia)
+
+    itens = crud.get_relatorio_cafe(db, data_inicio=primeiro_dia.date(), data_fim=primeiro_dia.date() + timedelta(days=3))
+
+    assert [(item["dia"], item["reservas"], item["quantidade_cafe"]) for item in itens] == [
+        (primeiro_dia.date(), 2, 7),
+        (primeiro_dia.date() + timedelta(days=1), 1, 5),
+        (primeiro_dia.date() + timedelta(days=2), 1, 5),
+    ]
+    assert {item["local"] for item in itens} == {"Sede"}
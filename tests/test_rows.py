@@ -0,0 +1,82 @@
+from datetime import timedelta
+from typing import List
+
+import pytest
+
+from app import crud, models, schemas
+from app.services import serialization
+
+from .conftest import future
+
+
+def dump(schema, content) -> bytes:
+    return serialization.dump_json(schema, content)
+
+
+@pytest.fixture
+def dados(db, local, sala):
+    """A few rows per table, with NULLs and soft-deleted rows that must stay out."""
+    db.add_all([
+        models.Local(nome="Filial", descricao=None, ativo=False),
+        models.Local(nome="Antigo", deleted_at=future(days=-1)),
+        models.Sala(nome="Sala 2", local_id=local.id, capacidade=None, recursos="TV"),
+        models.Usuario(google_id="g1", email="ana@example.com", nome="Ana", foto_url=None),
+        models.Usuario(google_id="g2", email="bia@example.com", nome="Bia", foto_url="https://example.com/bia.png",
+                       last_login_at=future(days=-2)),
+    ])
+    for dias, cafe in ((1, True), (2, False), (3, True)):
+        inicio = future(days=dias)
+        db.add(models.Reserva(
+            local_id=local.id, sala_id=sala.id, local="Sede", sala=sala.nome, data_inicio=inicio,
+            data_fim=inicio + timedelta(hours=1), responsavel="Responsável", cafe=cafe,
+            quantidade_cafe=4 if cafe else None, descricao="Reunião" if cafe else None, criado_por_email=None
+        ))
+    db.add(models.Reserva(
+        local_id=local.id, sala_id=sala.id, local="Sede", sala=sala.nome, data_inicio=future(days=4),
+        data_fim=future(days=4, hour=11), responsavel="Excluída", deleted_at=future(days=-1)
+    ))
+    db.commit()
+    db.expire_all()
+
+
+def test_reservation_rows_match_the_orm_entities(db, dados):
+    orm = db.query(models.Reserva).filter(models.Reserva.deleted_at.is_(None)).order_by(models.Reserva.data_inicio).all()
+    rows = crud.list_reservas(db)
+
+    assert len(rows) == 3
+    assert dump(List[schemas.ReservaOut], rows) == dump(List[schemas.ReservaOut], orm)
+    for entity in orm:
+        row = crud.get_reserva_row(db, entity.id)
+        assert dump(schemas.ReservaOut, row) == dump(schemas.ReservaOut, crud.get_reserva_by_id(db, entity.id))
+
+    excluida = db.query(models.Reserva).filter(models.Reserva.deleted_at.isnot(None)).one()
+    assert crud.get_reserva_row(db, excluida.id) is None
+    assert crud.get_reserva_by_id(db, excluida.id) is None
+
+
+def test_sparse_rows_match_the_projection_of_the_orm_entities(db, dados):
+    fields = ("id", "data_inicio", "quantidade_cafe")
+    schema = List[serialization.project(schemas.ReservaOut, fields)]
+    orm = db.query(models.Reserva).filter(models.Reserva.deleted_at.is_(None)).order_by(models.Reserva.data_inicio).all()
+    rows = crud.list_reservas(db, fields=fields)
+
+    assert set(rows[0]._fields) == set(fields)
+    assert dump(schema, rows) == dump(schema, orm)
+
+
+def test_catalog_and_user_rows_match_the_orm_entities(db, dados):
+    def ativos(model, order):
+        query = db.query(model)
+        if hasattr(model, "deleted_at"):
+            query = query.filter(model.deleted_at.is_(None))
+        return query.order_by(order).all()
+
+    assert dump(List[schemas.LocalOut], crud.list_locais(db)) == dump(
+        List[schemas.LocalOut], ativos(models.Local, models.Local.nome)
+    )
+    assert dump(List[schemas.SalaOut], crud.list_salas(db)) == dump(
+        List[schemas.SalaOut], ativos(models.Sala, models.Sala.nome)
+    )
+    assert dump(List[schemas.UsuarioOut], crud.list_usuarios(db)) == dump(
+        List[schemas.UsuarioOut], ativos(models.Usuario, models.Usuario.nome)
+    )
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import models, schemas
+from app.services import serialization
+
+BRT = timezone(timedelta(hours=-3))
+CRIADO = datetime(2026, 10, 19, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def local() -> models.Local:
+    return models.Local(id=1, nome="Sede São Paulo", descricao=None, ativo=True, created_at=CRIADO, updated_at=CRIADO)
+
+
+def salas() -> list:
+    return [
+        models.Sala(
+            id=1, local_id=1, nome="Sala Açaí", capacidade=None, recursos=None, ativo=True,
+            created_at=CRIADO, updated_at=CRIADO + timedelta(seconds=1)
+        ),
+        # Plain objects are read from attributes too
+        SimpleNamespace(
+            id=2, local_id=1, nome="Sala 2", capacidade=8, recursos="TV, \"quadro\"\n", ativo=False,
+            created_at=CRIADO.astimezone(BRT), updated_at=CRIADO
+        ),
+    ]
+
+
+def reservas() -> list:
+    inicio = datetime(2026, 10, 20, 9, 0, tzinfo=timezone.utc)
+    return [
+        models.Reserva(
+            id=1, local_id=1, sala_id=1, local="Sede", sala="Sala 1", data_inicio=inicio, data_fim=inicio + timedelta(hours=1),
+            responsavel="José", cafe=True, quantidade_cafe=3, descricao="Reunião 👋", criado_por_email="jose@example.com",
+            participantes_count=2, created_at=CRIADO, updated_at=CRIADO
+        ),
+        models.Reserva(
+            id=2, local_id=1, sala_id=1, local="Sede", sala="Sala 1", data_inicio=inicio.astimezone(BRT),
+            data_fim=inicio.astimezone(BRT) + timedelta(minutes=30, microseconds=1), responsavel="Ana", cafe=False,
+            quantidade_cafe=None, descricao=None, criado_por_email=None, participantes_count=0,
+            created_at=CRIADO, updated_at=CRIADO
+        ),
+    ]
+
+
+@pytest.mark.parametrize("type_, content", [
+    (schemas.LocalOut, local),
+    (List[schemas.SalaOut], salas),
+    (List[schemas.ReservaOut], reservas),
+    (schemas.ReservasUsuarioOut, lambda: {"items": reservas(), "next_cursor": None, "has_more": False}),
+])
+def test_fast_path_is_byte_identical_to_fastapi_serialization(type_, content):
+    app = FastAPI()
+
+    @app.get("/fastapi", response_model=type_)
+    def fastapi_path():
+        return content()
+
+    @app.get("/render", response_model=type_)
+    def render_path():
+        return serialization.render(type_, content())
+
+    client = TestClient(app)
+    esperado = client.get("/fastapi")
+    obtido = client.get("/render")
+
+    assert obtido.content == esperado.content
+    assert obtido.headers["content-type"] == esperado.headers["content-type"]
+    assert obtido.headers["content-length"] == esperado.headers["content-length"]
+
+
+def test_projection_keeps_only_the_requested_fields():
+    schema = serialization.project(schemas.ReservaOut, ("id", "data_inicio", "descricao"))
+    body = serialization.dump_json(List[schema], reservas())
+    assert body == (
+        b'[{"id":1,"data_inicio":"2026-10-20T09:00:00Z","descricao":"Reuni\xc3\xa3o \xf0\x9f\x91\x8b"},'
+        b'{"id":2,"data_inicio":"2026-10-20T06:00:00-03:00","descricao":null}]'
+    )
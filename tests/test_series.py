@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from app import crud, models, schemas
+from app.services.availability import SlotIndex
+
+from .conftest import USER_EMAIL, future, received
+
+
+def create_serie(db, sala) -> models.SerieReserva:
+    inicio = future(days=1)
+    serie = schemas.SerieReservaCreate(
+        local_id=sala.local_id,
+        sala_id=sala.id,
+        data_inicio=inicio,
+        data_fim=inicio + timedelta(hours=1),
+        rrule="FREQ=DAILY;COUNT=3",
+        responsavel="Equipe"
+    )
+    return crud.create_serie_reserva(db, serie, USER_EMAIL)
+
+
+def test_series_writes_are_notified(db, sala, listener):
+    serie = create_serie(db, sala)
+    [event] = received(listener)
+    assert event["op"] == "create"
+    assert event["id"] is None
+    assert (event["serie_id"], event["sala_id"], event["local_id"]) == (serie.id, sala.id, sala.local_id)
+
+    segunda = serie.data_inicio + timedelta(days=1)
+    excecao = schemas.SerieExcecaoCreate(
+        data_original=segunda,
+        data_inicio=segunda + timedelta(hours=4),
+        data_fim=segunda + timedelta(hours=5)
+    )
+    crud.create_serie_excecao(db, serie.id, excecao, USER_EMAIL)
+    [event] = received(listener)
+    assert event["serie_id"] == serie.id
+    # The original occurrence is freed and the new times are taken
+    assert event["old_data_inicio"].startswith(segunda.strftime("%Y-%m-%dT%H:%M"))
+    assert event["data_inicio"].startswith((segunda + timedelta(hours=4)).strftime("%Y-%m-%dT%H:%M"))
+
+    crud.delete_serie_reserva(db, serie.id, USER_EMAIL)
+    [event] = received(listener)
+    assert event["op"] == "delete"
+
+
+def test_series_event_invalidates_other_workers_bitmaps(db, sala, listener):
+    # Another worker's index is only reached through the notification
+    outro_worker = SlotIndex()
+    dia = future(days=1).date()
+    outro_dia = future(days=10).date()
+    assert outro_worker.get_bitmaps(db, [sala.id], [dia, outro_dia])[(sala.id, dia)] == 0
+
+    create_serie(db, sala)
+    [event] = received(listener)
+    outro_worker.on_event(event)
+
+    assert outro_worker.stats()["entries"] == 1
+    assert outro_worker.get_bitmaps(db, [sala.id], [dia])[(sala.id, dia)] != 0
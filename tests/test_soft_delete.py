@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import crud, models, schemas
+from app.services import recurrence
+
+from .conftest import USER_EMAIL, future, reserva_payload
+
+JANELA = (future(days=-5), future(days=30))
+
+
+@pytest.fixture
+def agenda(db, sala):
+    """A future reservation, a series not started yet and an ongoing one with a future rescheduled occurrence."""
+    reserva = crud.create_reserva(db, schemas.ReservaCreate(**reserva_payload(sala, future(days=2))), USER_EMAIL)
+
+    def serie(inicio: datetime, rrule: str) -> models.SerieReserva:
+        db_serie = models.SerieReserva(
+            local_id=sala.local_id, sala_id=sala.id, local="Sede", sala=sala.nome, rrule=rrule,
+            data_inicio=inicio, data_fim=inicio + timedelta(hours=1), data_fim_serie=inicio + timedelta(days=10, hours=1),
+            responsavel="Equipe"
+        )
+        db.add(db_serie)
+        return db_serie
+
+    futura = serie(future(days=3, hour=14), "FREQ=DAILY;COUNT=5")
+    em_andamento = serie(future(days=-2, hour=8), "COUNT=10;FREQ=DAILY")
+    db.flush()
+    db.add(models.SerieExcecao(
+        serie_id=em_andamento.id, data_original=future(days=4, hour=8),
+        data_inicio=future(days=4, hour=16), data_fim=future(days=4, hour=17)
+    ))
+    db.commit()
+    return {"reserva": reserva.id, "futura": futura.id, "em_andamento": em_andamento.id}
+
+
+def ocorrencias(db, serie_id: int) -> list:
+    return [ocorrencia["data_inicio"] for ocorrencia in crud.list_serie_ocorrencias(db, *JANELA, serie_id=serie_id)]
+
+
+def test_cancelling_future_reservations_also_ends_the_room_series(db, local, sala, agenda):
+    antes = ocorrencias(db, agenda["em_andamento"])
+    now = datetime.now(timezone.utc)
+
+    excluidos = crud.delete_local(db, local.id, cancelar_reservas_futuras=True)
+    db.expire_all()
+
+    assert excluidos == {"salas": 1, "reservas": 1, "series": 2}
+    assert crud.get_serie_by_id(db, agenda["futura"]) is None
+    assert ocorrencias(db, agenda["futura"]) == []
+
+    # The ongoing series keeps its past occurrences only, rescheduled ones included
+    em_andamento = crud.get_serie_by_id(db, agenda["em_andamento"])
+    assert em_andamento is not None
+    recurrence.parse_rrule(em_andamento.rrule)
+    # No longer matched by range queries after the deletion
+    assert now <= em_andamento.data_fim_serie <= datetime.now(timezone.utc)
+    restantes = ocorrencias(db, agenda["em_andamento"])
+    assert restantes and all(inicio < now for inicio in restantes)
+    assert restantes == [inicio for inicio in antes if inicio < now]
+    excecao = db.query(models.SerieExcecao).filter_by(serie_id=agenda["em_andamento"]).one()
+    assert excecao.cancelada and excecao.data_inicio is None
+
+    assert all(inicio < now for _, inicio, _ in crud.list_ocupacao(db, [sala.id], now, JANELA[1]))
+
+
+def test_ongoing_series_without_room_for_until_is_deleted(db, sala):
+    # Unbounded rule that only fits the column without the UNTIL part
+    rrule = "FREQ=DAILY;BYDAY=" + ",".join(["MO", "TU", "WE", "TH", "FR"] * 32)[:482]
+    inicio = future(days=-2, hour=8)
+    db.add(models.SerieReserva(
+        local_id=sala.local_id, sala_id=sala.id, local="Sede", sala=sala.nome, rrule=rrule,
+        data_inicio=inicio, data_fim=inicio + timedelta(hours=1), responsavel="Equipe"
+    ))
+    db.commit()
+
+    excluidos = crud.delete_sala(db, sala.id, cancelar_reservas_futuras=True)
+
+    assert excluidos == {"salas": 1, "reservas": 0, "series": 1}
+    assert db.query(models.SerieReserva).filter(models.SerieReserva.deleted_at.is_(None)).count() == 0
+
+
+def test_deleting_a_room_without_the_flag_keeps_its_series(db, sala, agenda):
+    antes = {serie_id: ocorrencias(db, serie_id) for serie_id in (agenda["futura"], agenda["em_andamento"])}
+
+    excluidos = crud.delete_sala(db, sala.id)
+    db.expire_all()
+
+    assert excluidos == {"salas": 1, "reservas": 0, "series": 0}
+    assert {serie_id: ocorrencias(db, serie_id) for serie_id in antes} == antes
+
+
+def test_delete_routes_report_the_ended_series(client, sala, agenda):
+    response = client.delete(f"/api/v1/salas/{sala.id}", params={"cancelar_reservas_futuras": True})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["reservas_canceladas"] == 1
+    assert response.json()["series_encerradas"] == 2
@@ -0,0 +1,70 @@
+import re
+
+import pytest
+from sqlalchemy import text
+
+from app import crud, schemas
+from app.services import database, pipeline
+from app.services.database import engine
+
+from .conftest import USER_EMAIL, auth_headers, future, reserva_payload
+
+TIMEOUT_MS = 200
+
+
+@pytest.fixture
+def reserva(db, sala):
+    return crud.create_reserva(db, schemas.ReservaCreate(**reserva_payload(sala, future())), USER_EMAIL)
+
+
+@pytest.fixture
+def reservas_travadas(reserva, monkeypatch):
+    """Short statement_timeout on the reservation routes while another transaction blocks writes to reservas."""
+    monkeypatch.setattr(database, "STATEMENT_TIMEOUT_ROUTES", [(re.compile(r"^/api/v1/reservas"), TIMEOUT_MS)])
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Blocks INSERT/UPDATE/DELETE, not plain reads
+    connection.execute(text("LOCK TABLE reservas IN EXCLUSIVE MODE"))
+    try:
+        yield
+    finally:
+        transaction.rollback()
+        connection.close()
+
+
+def assert_query_timeout(response) -> None:
+    assert response.status_code == 504, response.text
+    body = response.json()
+    assert body["code"] == "QUERY_TIMEOUT"
+    assert body["details"] == {"statement_timeout_ms": TIMEOUT_MS}
+
+
+@pytest.mark.parametrize("method", ["put", "patch"])
+@pytest.mark.parametrize("pipelined", [True, False])
+def test_update_timeout_is_a_504_not_a_400(client, reserva, reservas_travadas, monkeypatch, method, pipelined):
+    monkeypatch.setattr(pipeline, "PIPELINE_ENABLED", pipelined)
+
+    request = getattr(client, method)
+    response = request(f"/api/v1/reservas/{reserva.id}", json={"responsavel": "Outro"}, headers=auth_headers())
+
+    assert_query_timeout(response)
+
+
+def test_create_and_delete_timeouts_are_504s(client, sala, reserva, reservas_travadas):
+    payload = reserva_payload(sala, future(days=2))
+    payload.update(data_inicio=payload["data_inicio"].isoformat(), data_fim=payload["data_fim"].isoformat())
+
+    assert_query_timeout(client.post("/api/v1/reservas", json=payload, headers=auth_headers()))
+    assert_query_timeout(client.delete(f"/api/v1/reservas/{reserva.id}", headers=auth_headers()))
+
+
+def test_bootstrap_queries_run_under_the_route_timeout(db, client, reserva, monkeypatch):
+    monkeypatch.setattr(database, "STATEMENT_TIMEOUT_ROUTES", [(re.compile(r"^/api/v1/bootstrap$"), TIMEOUT_MS)])
+    # Ends the fixture session's read transaction, which would hold up the lock below
+    db.rollback()
+    with engine.connect() as connection, connection.begin():
+        # Blocks reads too
+        connection.execute(text("LOCK TABLE reservas IN ACCESS EXCLUSIVE MODE"))
+        response = client.get("/api/v1/bootstrap", headers=auth_headers())
+
+    assert_query_timeout(response)